@@ -19,25 +19,87 @@ def create_app(config_name=None):
         config_name = os.environ.get('FLASK_ENV', 'development')
     app.config.from_object(f'config.{config_name.capitalize()}Config')
     
-    # 初始化擴充套件
+    # 初始化擴充套件（連線池需在建立 engine 前設定）
+    from services.db_pool import configure_engine_options, db_pool
+    configure_engine_options(app)
     db.init_app(app)
+    db_pool.init_app(app, db)
     jwt.init_app(app)
     CORS(app)
-    socketio.init_app(app, cors_allowed_origins="*")
+    
+    # 請求延遲與 SQL 查詢指標
+    from services.metrics import request_metrics
+    request_metrics.init_app(app, db)
+    
+    # 導入 WebSocket 事件（需在 init_app 之前註冊，重複建立應用程式時處理器才會保留）
+    import socket_events
+    
+    # 多個 worker 時經由訊息佇列轉送廣播（未設定 SOCKETIO_MESSAGE_QUEUE 時僅限本行程）
+    from services.fanout import create_client_manager
+    socketio.init_app(app, cors_allowed_origins="*", client_manager=create_client_manager(app.config))
+    
+    # 依連線協商 JSON / MessagePack 傳輸格式
+    from services.wire_format import wire_formats
+    wire_formats.init_app(app, socketio.server)
+    
+    # 初始化房間狀態引擎
+    from services.room_state import room_states
+    room_states.init_app(app)
+    
+    # 初始化答案批改引擎
+    from services.grading import grader
+    grader.init_app(app)
+    
+    # 初始化題目回應快取
+    from services.payloads import question_payloads
+    question_payloads.init_app(app)
+    
+    # 初始化密碼雜湊執行緒池
+    from services.password_hasher import password_hasher
+    password_hasher.init_app(app)
+    
+    # 初始化房間事件合併廣播
+    from services.room_events import room_events
+    room_events.init_app(app)
+    
+    # 初始化房間快照
+    from services.room_snapshots import room_snapshots
+    room_snapshots.init_app(app)
+    
+    # 初始化回合計時排程器
+    from services.round_scheduler import round_scheduler
+    round_scheduler.init_app(app)
+    
+    # 初始化使用者資料快取
+    from services.user_cache import user_cache
+    user_cache.init_app(app)
+    
+    # 初始化題庫抽題索引
+    from services.question_pool import question_pool
+    question_pool.init_app(app)
+    
+    # 初始化分類目錄快取
+    from services.catalog import category_catalog
+    category_catalog.init_app(app)
+    
+    # 初始化目錄端點的回應快取
+    from services.http_cache import catalog_responses
+    catalog_responses.init_app(app)
     
     # 註冊藍圖
     from blueprints.auth_routes import auth_bp
     from blueprints.question_routes import question_bp
     from blueprints.room_routes import room_bp
     from blueprints.game_routes import game_bp
+    from blueprints.stats_routes import stats_bp
+    from blueprints.metrics_routes import metrics_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(question_bp, url_prefix='/api/questions')
     app.register_blueprint(room_bp, url_prefix='/api/rooms')
     app.register_blueprint(game_bp, url_prefix='/api/game')
-    
-    # 導入 WebSocket 事件
-    import socket_events
+    app.register_blueprint(stats_bp, url_prefix='/api/_stats')
+    app.register_blueprint(metrics_bp, url_prefix='/api/_metrics')
     
     # 靜態檔案路由
     @app.route('/<path:filename>')
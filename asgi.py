@@ -0,0 +1,193 @@
+"""
+asyncio 模式的 ASGI 應用程式（與 Flask／gevent 模式並存的選用部署方式）
+
+- WebSocket：python-socketio 的 AsyncServer，事件與資料格式與 socket_events.py 相同
+- 遊戲中常用的讀取端點（房間資訊、排名）以非同步 engine 原生處理
+- 其他 API 交給原本的 Flask 藍圖，在執行緒池中執行（ASYNC_WSGI_THREADS）
+
+API 路徑、回應格式與錯誤訊息都與 Flask 模式相同。需安裝非同步資料庫驅動
+（aiosqlite 或 aiomysql）與 ASGI 伺服器：
+
+    uvicorn --factory asgi:create_asgi_app --host 0.0.0.0 --port 5000
+
+注意：此模式的 WebSocket 廣播只送達同一個行程的連線（不經過 SOCKETIO_MESSAGE_QUEUE），
+也不支援 MessagePack 傳輸格式，請以單一 worker 執行。
+"""
+import asyncio
+import re
+from urllib.parse import parse_qs
+
+import socketio
+from flask import Flask
+from flask_jwt_extended import decode_token
+
+import async_socket_events
+from app import create_app, socketio as flask_socketio
+from models import GameRoom, GameSession
+from services.async_db import async_db
+from services.asgi_bridge import ThreadsafeServer, WsgiBridge
+from services.leaderboard import slice_rankings
+from services.room_state import room_states
+from services.wire_format import wire_formats
+
+
+class AsyncRoutes:
+    """原生非同步的 HTTP 端點，未符合的請求交給 fallback（Flask 藍圖）"""
+
+    def __init__(self, app: Flask, fallback):
+        self.app = app
+        self.fallback = fallback
+        self.routes = []
+
+    def route(self, pattern: str, method: str = 'GET'):
+        regex = re.compile('^' + re.sub(r'<(\w+)>', r'(?P<\1>[^/]+)', pattern) + '$')
+
+        def decorator(handler):
+            self.routes.append((method, regex, handler))
+            return handler
+        return decorator
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope['type'] == 'http':
+            for method, regex, handler in self.routes:
+                match = regex.match(scope['path'])
+                if match and scope['method'] == method:
+                    request = AsyncRequest(scope)
+                    body, status = await handler(request, **match.groupdict())
+                    await self.respond(send, body, status)
+                    return
+        await self.fallback(scope, receive, send)
+
+    async def respond(self, send, data, status: int) -> None:
+        """與 jsonify 相同的 JSON 回應"""
+        with self.app.app_context():
+            response = self.app.json.response(data)
+        headers = [(name.lower().encode('latin1'), value.encode('latin1'))
+                   for name, value in response.headers.items()]
+        headers.append((b'access-control-allow-origin', b'*'))  # 與 flask-cors 的預設一致
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': response.get_data()})
+
+
+class AsyncRequest:
+    """原生處理器使用的請求資訊"""
+
+    def __init__(self, scope):
+        self.args = {key: values[0] for key, values in
+                     parse_qs(scope.get('query_string', b'').decode('latin1')).items()}
+        self.headers = {name.decode('latin1').lower(): value.decode('latin1')
+                        for name, value in scope.get('headers', [])}
+
+    def int_arg(self, name: str, default: int) -> int:
+        try:
+            return int(self.args[name])
+        except (KeyError, ValueError):
+            return default
+
+
+def register_routes(routes: AsyncRoutes, app: Flask) -> None:
+    """與藍圖相同契約的非同步端點"""
+
+    @routes.route('/api/rooms/<room_id>')
+    async def get_room(request, room_id):
+        """取得房間詳細資訊"""
+        try:
+            async with async_db.session() as session:
+                room = await session.get(GameRoom, room_id)
+                if not room:
+                    return {'error': '房間不存在'}, 404
+
+                rows = (await session.execute(GameSession.room_players_query(room_id))).all()
+                players = GameSession.players_from_rows(rows)
+
+            room_data = room.to_dict(player_count=len(players))
+            room_data['players'] = players
+            return {'room': room_data}, 200
+
+        except Exception as e:
+            return {'error': '取得房間資訊失敗'}, 500
+
+    @routes.route('/api/game/<room_id>/rankings')
+    async def get_rankings(request, room_id):
+        """取得房間排名（mode=top_k&k=10 或 mode=around_me&radius=2）"""
+        try:
+            mode = request.args.get('mode', 'all')
+            k = request.int_arg('k', 10)
+            radius = request.int_arg('radius', 2)
+
+            if mode not in ('all', 'top_k', 'around_me'):
+                return {'error': '不支援的排名模式'}, 400
+
+            user_id = None
+            if mode == 'around_me':
+                user_id = bearer_identity(app, request)
+                if not user_id:
+                    return {'error': '需要登入'}, 401
+
+            # 進行中的房間直接讀取記憶體中的排行榜
+            state = room_states.get(room_id)
+            if state:
+                return {'rankings': state.rankings(mode, k, user_id, radius)}, 200
+
+            async with async_db.session() as session:
+                room = await session.get(GameRoom, room_id)
+                if not room:
+                    return {'error': '房間不存在'}, 404
+                rows = (await session.execute(GameSession.room_players_query(room_id))).all()
+
+            rankings = GameSession.players_from_rows(rows)
+            rankings.sort(key=lambda x: (-x['score'], x['time_taken'], x['user_id']))
+            for i, ranking in enumerate(rankings):
+                ranking['rank'] = i + 1
+
+            return {'rankings': slice_rankings(rankings, mode, k, user_id, radius)}, 200
+
+        except Exception as e:
+            return {'error': '取得排名失敗'}, 500
+
+
+def bearer_identity(app: Flask, request: AsyncRequest):
+    """由 Authorization 標頭取得使用者 id，無效時回傳 None"""
+    scheme, _, token = request.headers.get('authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not token:
+        return None
+    try:
+        with app.app_context():
+            return decode_token(token)['sub']
+    except Exception:
+        return None
+
+
+class LoopBinding:
+    """第一次收到 ASGI 呼叫時記錄事件迴圈，供同步程式排入廣播"""
+
+    def __init__(self, asgi_app, server: ThreadsafeServer):
+        self.asgi_app = asgi_app
+        self.server = server
+
+    async def __call__(self, scope, receive, send) -> None:
+        if self.server.loop is None:
+            self.server.bind(asyncio.get_running_loop())
+        await self.asgi_app(scope, receive, send)
+
+
+def create_asgi_app(config_name=None):
+    """建立 asyncio 模式的 ASGI 應用程式"""
+    app = create_app(config_name)
+    async_db.init_app(app)
+
+    sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*')
+    async_socket_events.register(sio, app)
+
+    # 藍圖與背景任務的 socketio.emit() 改由 AsyncServer 廣播
+    server = ThreadsafeServer(sio)
+    flask_socketio.server = server
+    wire_formats.enabled = False
+
+    routes = AsyncRoutes(app, WsgiBridge(app, app.config.get('ASYNC_WSGI_THREADS', 32)))
+    register_routes(routes, app)
+
+    asgi_app = LoopBinding(socketio.ASGIApp(sio, other_asgi_app=routes, on_shutdown=async_db.dispose), server)
+    asgi_app.flask_app = app
+    asgi_app.sio = sio
+    return asgi_app
@@ -0,0 +1,167 @@
+"""
+WebSocket 事件（asyncio 模式）
+
+與 socket_events.py 相同的事件與資料格式，註冊在 python-socketio 的 AsyncServer 上；
+身分與房間成員以非同步 session 查詢，廣播沿用 room_events 的合併機制。
+"""
+from flask_jwt_extended import decode_token
+from sqlalchemy import select
+
+from models import GameSession
+from services.async_db import async_db
+from services.room_events import room_events
+from services.room_state import room_states
+from services.user_cache import user_cache
+from socket_events import SocketIdentity
+
+
+def register(sio, app) -> None:
+    """在 AsyncServer 上註冊事件處理器"""
+
+    async def authenticate_token(token):
+        try:
+            with app.app_context():
+                user_id = decode_token(token)['sub']
+        except Exception:
+            return None
+
+        async with async_db.session() as session:
+            username = await user_cache.aget_username(user_id, session)
+        if username is None:
+            return None
+
+        return SocketIdentity(user_id, username)
+
+    async def current_identity(sid, data):
+        """取得目前連線的使用者身分（舊版客戶端在第一次帶 token 的事件中綁定）"""
+        session = await sio.get_session(sid)
+        identity = session.get('identity')
+        if identity:
+            return identity
+
+        token = (data or {}).get('token')
+        if not token:
+            return None
+
+        identity = await authenticate_token(token)
+        if identity:
+            await sio.save_session(sid, {'identity': identity})
+        return identity
+
+    async def error(sid, message):
+        await sio.emit('error', {'message': message}, to=sid)
+
+    @sio.on('connect')
+    async def handle_connect(sid, environ, auth=None):
+        """處理連線事件"""
+        token = (auth or {}).get('token')
+
+        if token:
+            identity = await authenticate_token(token)
+            if not identity:
+                raise ConnectionRefusedError('無效的 token')
+            await sio.save_session(sid, {'identity': identity})
+
+    @sio.on('join_room')
+    async def handle_join_room(sid, data):
+        """處理加入房間事件"""
+        try:
+            room_id = data.get('room_id')
+
+            if not room_id:
+                await error(sid, '缺少必要參數')
+                return
+
+            identity = await current_identity(sid, data)
+            if not identity:
+                await error(sid, '無效的 token')
+                return
+
+            # 檢查使用者是否在房間中（進行中的房間直接查記憶體狀態）
+            state = room_states.get(room_id)
+            if state:
+                is_member = identity.user_id in state.players
+            else:
+                async with async_db.session() as session:
+                    is_member = await session.scalar(select(GameSession.id).where(
+                        GameSession.user_id == identity.user_id,
+                        GameSession.room_id == room_id
+                    ).limit(1)) is not None
+
+            if not is_member:
+                await error(sid, '不在房間中')
+                return
+
+            await sio.enter_room(sid, room_id)
+            room_events.emit('player_joined_socket', identity._asdict(), room=room_id, skip_sid=sid)
+
+        except Exception as e:
+            await error(sid, '加入房間失敗')
+            app.logger.error(f'Error joining room: {e}')
+
+    @sio.on('leave_room')
+    async def handle_leave_room(sid, data):
+        """處理離開房間事件"""
+        try:
+            room_id = data.get('room_id')
+
+            if not room_id:
+                await error(sid, '缺少必要參數')
+                return
+
+            identity = await current_identity(sid, data)
+            if not identity:
+                await error(sid, '無效的 token')
+                return
+
+            await sio.leave_room(sid, room_id)
+            room_events.emit('player_left_socket', identity._asdict(), room=room_id, skip_sid=sid)
+
+        except Exception as e:
+            await error(sid, '離開房間失敗')
+            app.logger.error(f'Error leaving room: {e}')
+
+    @sio.on('submit_answer_socket')
+    async def handle_submit_answer(sid, data):
+        """處理答案提交事件（WebSocket 版本）"""
+        try:
+            room_id = data.get('room_id')
+            answer = data.get('answer')
+            time_taken = data.get('time_taken')
+
+            if not all([room_id, answer, time_taken is not None]):
+                await error(sid, '缺少必要參數')
+                return
+
+            identity = await current_identity(sid, data)
+            if not identity:
+                await error(sid, '無效的 token')
+                return
+
+            room_events.emit('answer_submitted_socket', dict(identity._asdict(), time_taken=time_taken),
+                             room=room_id, skip_sid=sid)
+
+        except Exception as e:
+            await error(sid, '提交答案失敗')
+            app.logger.error(f'Error submitting answer: {e}')
+
+    @sio.on('ready_for_next')
+    async def handle_ready_for_next(sid, data):
+        """處理準備下一題事件"""
+        try:
+            room_id = data.get('room_id')
+
+            if not room_id:
+                await error(sid, '缺少必要參數')
+                return
+
+            identity = await current_identity(sid, data)
+            if not identity:
+                await error(sid, '無效的 token')
+                return
+
+            room_events.emit('player_ready', identity._asdict(), room=room_id, skip_sid=sid)
+
+        except Exception as e:
+            await error(sid, '準備下一題失敗')
+            app.logger.error(f'Error ready for next: {e}')
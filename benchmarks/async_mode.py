@@ -0,0 +1,267 @@
+"""
+Flask/gevent 模式對 asyncio 模式的基準測試
+
+兩種模式以相同的資料與工作負載各自在獨立行程中執行（gevent 需要 monkey patch）：
+C 個用戶端以固定總速率（--rate req/s，開放迴路）請求 GET /api/rooms/<id> 與
+GET /api/game/<id>/rankings，同時 S 個背景工作不斷執行一個慢查詢（遞迴 CTE，
+模擬報表或未命中索引的查詢）。延遲由排定的送出時間起算，包含等待被排程的時間。
+
+- sync：gevent 協程直接呼叫 Flask WSGI 應用程式（與 Gunicorn gevent worker 相同），
+  慢查詢在 C 擴充中阻塞整個 hub
+- async：asyncio 直接呼叫 ASGI 應用程式（asgi.py），查詢經由非同步 engine（aiosqlite）
+
+    python -m benchmarks.async_mode --clients 50 --requests 20 --rate 500 --slow 2 --output async_mode.json
+
+回報每種模式的請求延遲 p50/p95/p99、吞吐量與慢查詢完成數。
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.load import git_commit, percentile
+
+SLOW_SQL = ('WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < :n) '
+            'SELECT count(*) FROM c')
+
+
+def testing_app(factory, database_path: str):
+    """以檔案 SQLite 建立測試設定的應用程式（非同步 engine 需與同步 engine 共用資料）"""
+    from config import TestingConfig
+    TestingConfig.SQLALCHEMY_DATABASE_URI = f'sqlite:///{database_path}'
+    return factory('testing')
+
+
+def seed(rooms: int, players: int) -> List[str]:
+    """建立房間與玩家，回傳房間 id"""
+    from app import db
+    from models import GameRoom, GameSession, User
+
+    users = [User(username=f'user{i}', email=f'user{i}@example.com', password_hash='x')
+             for i in range(rooms * players)]
+    db.session.add_all(users)
+    db.session.flush()
+    room_list = [GameRoom(name=f'Room {r}', created_by=users[r * players].id, total_rounds=3,
+                          categories=['Benchmark'])
+                 for r in range(rooms)]
+    db.session.add_all(room_list)
+    db.session.flush()
+    db.session.add_all(GameSession(user_id=users[r * players + p].id, room_id=room.id, score=p * 10)
+                       for r, room in enumerate(room_list) for p in range(players))
+    db.session.commit()
+    return [room.id for room in room_list]
+
+
+def arrival(args, client: int, index: int) -> float:
+    """第 client 個用戶端第 index 個請求的排定送出時間（秒，各用戶端錯開）"""
+    interval = args.clients / args.rate
+    return (index + client / args.clients) * interval
+
+
+def request_paths(room_ids: List[str], count: int, offset: int) -> List[str]:
+    paths = []
+    for i in range(count):
+        room_id = room_ids[(offset + i) % len(room_ids)]
+        paths.append(f'/api/rooms/{room_id}' if i % 2 == 0 else f'/api/game/{room_id}/rankings')
+    return paths
+
+
+async def asgi_request(app, method: str, path: str, headers: Optional[Dict[str, str]] = None,
+                       body: bytes = b'') -> Tuple[int, Any]:
+    """在同一個行程內呼叫 ASGI 應用程式，回傳 (狀態碼, JSON 內容)"""
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': method,
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'root_path': '',
+        'query_string': query.encode(), 'server': ('localhost', 80), 'client': ('127.0.0.1', 0),
+        'headers': [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()]
+    }
+    if body:
+        scope['headers'].append((b'content-type', b'application/json'))
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    response: Dict[str, Any] = {'body': b''}
+
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+        elif message['type'] == 'http.response.body':
+            response['body'] += message.get('body', b'')
+
+    await app(scope, receive, send)
+    return response['status'], json.loads(response['body']) if response['body'] else None
+
+
+def run_sync(args, database_path: str) -> Dict[str, Any]:
+    """gevent 模式：每個用戶端一個協程，直接呼叫 WSGI 應用程式"""
+    from gevent import monkey
+    monkey.patch_all()
+    import gevent
+    from sqlalchemy import text
+
+    from app import create_app, db
+
+    app = testing_app(create_app, database_path)
+    with app.app_context():
+        db.create_all()
+        room_ids = seed(args.rooms, args.players)
+    latencies: List[float] = []
+    errors = [0]
+    slow_done = [0]
+    running = [True]
+
+    def client(index: int, start: float) -> None:
+        http = app.test_client()
+        for i, path in enumerate(request_paths(room_ids, args.requests, index)):
+            scheduled = start + arrival(args, index, i)
+            gevent.sleep(max(scheduled - time.perf_counter(), 0))
+            response = http.get(path)
+            latencies.append(time.perf_counter() - scheduled)
+            errors[0] += response.status_code != 200
+
+    def slow_worker() -> None:
+        with app.app_context():
+            while running[0]:
+                db.session.execute(text(SLOW_SQL), {'n': args.slow_rows}).scalar()
+                db.session.remove()
+                slow_done[0] += 1
+                gevent.sleep(0)
+
+    slow = [gevent.spawn(slow_worker) for _ in range(args.slow)]
+    start = time.perf_counter()
+    gevent.joinall([gevent.spawn(client, i, start) for i in range(args.clients)])
+    elapsed = time.perf_counter() - start
+    running[0] = False
+    gevent.joinall(slow)
+    return summarize('sync', latencies, errors[0], slow_done[0], elapsed)
+
+
+def run_async(args, database_path: str) -> Dict[str, Any]:
+    """asyncio 模式：每個用戶端一個 task，直接呼叫 ASGI 應用程式"""
+    import asyncio
+    from sqlalchemy import text
+
+    from app import db
+    from asgi import create_asgi_app
+    from services.async_db import async_db
+
+    asgi_app = testing_app(create_asgi_app, database_path)
+    with asgi_app.flask_app.app_context():
+        db.create_all()
+        room_ids = seed(args.rooms, args.players)
+
+    async def main() -> Dict[str, Any]:
+        latencies: List[float] = []
+        errors = 0
+        slow_done = 0
+        running = True
+
+        async def client(index: int, start: float) -> None:
+            nonlocal errors
+            for i, path in enumerate(request_paths(room_ids, args.requests, index)):
+                scheduled = start + arrival(args, index, i)
+                await asyncio.sleep(max(scheduled - time.perf_counter(), 0))
+                status, _ = await asgi_request(asgi_app, 'GET', path)
+                latencies.append(time.perf_counter() - scheduled)
+                errors += status != 200
+
+        async def slow_worker() -> None:
+            nonlocal slow_done
+            while running:
+                async with async_db.session() as session:
+                    await session.scalar(text(SLOW_SQL), {'n': args.slow_rows})
+                slow_done += 1
+
+        slow = [asyncio.create_task(slow_worker()) for _ in range(args.slow)]
+        start = time.perf_counter()
+        await asyncio.gather(*(client(i, start) for i in range(args.clients)))
+        elapsed = time.perf_counter() - start
+        running = False
+        await asyncio.gather(*slow)
+        await async_db.dispose()
+        return summarize('async', latencies, errors, slow_done, elapsed)
+
+    return asyncio.run(main())
+
+
+def summarize(mode: str, latencies: List[float], errors: int, slow_done: int, elapsed: float) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    return {
+        'mode': mode,
+        'requests': len(ordered),
+        'errors': errors,
+        'elapsed_seconds': round(elapsed, 3),
+        'throughput_rps': round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(ordered, 50) * 1000, 3),
+        'p95_ms': round(percentile(ordered, 95) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3) if ordered else 0.0,
+        'slow_queries': slow_done
+    }
+
+
+def run_worker(mode: str, args) -> Dict[str, Any]:
+    """在獨立行程中執行單一模式（gevent 的 monkey patch 不可與 asyncio 共用行程）"""
+    command = [sys.executable, '-m', 'benchmarks.async_mode', '--worker', mode,
+               '--rooms', str(args.rooms), '--players', str(args.players), '--clients', str(args.clients),
+               '--requests', str(args.requests), '--rate', str(args.rate), '--slow', str(args.slow), '--slow-rows', str(args.slow_rows)]
+    completed = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Flask/gevent 模式對 asyncio 模式的基準測試')
+    parser.add_argument('--rooms', type=int, default=20)
+    parser.add_argument('--players', type=int, default=4)
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=20, help='每個用戶端的請求數')
+    parser.add_argument('--rate', type=float, default=500, help='所有用戶端合計的請求速率（req/s）')
+    parser.add_argument('--slow', type=int, default=2, help='並行執行慢查詢的背景工作數')
+    parser.add_argument('--slow-rows', type=int, default=200000, help='慢查詢的遞迴列數')
+    parser.add_argument('--modes', default='sync,async')
+    parser.add_argument('--worker', choices=['sync', 'async'], help=argparse.SUPPRESS)
+    parser.add_argument('--output', help='將結果寫入 JSON 檔案')
+    args = parser.parse_args()
+
+    if args.worker:
+        with tempfile.TemporaryDirectory() as directory:
+            database_path = os.path.join(directory, f'{uuid.uuid4().hex}.db')
+            runner = run_sync if args.worker == 'sync' else run_async
+            print(json.dumps(runner(args, database_path)))
+        return
+
+    results = [run_worker(mode, args) for mode in args.modes.split(',')]
+    print(f'房間 {args.rooms} × 玩家 {args.players}，並行用戶端 {args.clients} × {args.requests} 次請求，'
+          f'{args.rate:g} req/s，慢查詢工作 {args.slow}（{args.slow_rows} 列）')
+    print(f"{'模式':<6} {'請求':>6} {'錯誤':>4} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'max ms':>9} {'慢查詢':>6}")
+    for r in results:
+        print(f"{r['mode']:<6} {r['requests']:>6} {r['errors']:>4} {r['throughput_rps']:>9.1f} "
+              f"{r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f} {r['p99_ms']:>9.3f} {r['max_ms']:>9.3f} "
+              f"{r['slow_queries']:>6}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'benchmark': 'async_mode',
+                'commit': git_commit(),
+                'rooms': args.rooms,
+                'players': args.players,
+                'clients': args.clients,
+                'requests': args.requests,
+                'rate': args.rate,
+                'slow': args.slow,
+                'slow_rows': args.slow_rows,
+                'modes': results
+            }, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+答案批改基準測試
+
+比較原本的批改方式（每次提交都載入 Question 並比對原始 JSON）與
+編譯後答案鍵的單筆、批次批改：
+
+    python -m benchmarks.grading --questions 200 --submissions 20000
+"""
+import argparse
+import random
+import time
+
+from app import create_app, db
+from models import Category, Question
+from services.grading import grader
+
+OPTIONS = ['go', 'goes', 'going', 'gone', 'went']
+
+
+def seed(question_count: int) -> list:
+    """建立測試題目（單選與多格填空各半）"""
+    category = Category(name='benchmark', display_name='Benchmark')
+    db.session.add(category)
+    db.session.flush()
+
+    questions = []
+    for i in range(question_count):
+        multi = i % 2 == 1
+        questions.append(Question(
+            category_id=category.id,
+            difficulty='easy',
+            question_type='multi_blank' if multi else 'multiple_choice',
+            question_text=f'Question {i} ___.',
+            options=OPTIONS,
+            answer=random.sample(OPTIONS, 2) if multi else random.choice(OPTIONS)
+        ))
+    db.session.add_all(questions)
+    db.session.commit()
+    return [(q.id, q.question_type) for q in questions]
+
+
+def make_submissions(questions: list, count: int) -> list:
+    submissions = []
+    for _ in range(count):
+        question_id, question_type = random.choice(questions)
+        if question_type == 'multi_blank':
+            submissions.append((question_id, random.sample(OPTIONS, 2)))
+        else:
+            submissions.append((question_id, random.choice(OPTIONS)))
+    return submissions
+
+
+def legacy(submissions: list) -> int:
+    """原本的方式：每次提交載入 Question 並以 == 比對"""
+    correct = 0
+    for question_id, answer in submissions:
+        question = db.session.get(Question, question_id)
+        correct += answer == question.answer
+        db.session.expunge_all()  # 每個請求使用新的 session
+    return correct
+
+
+def compiled(submissions: list) -> int:
+    return sum(grader.grade(question_id, answer) for question_id, answer in submissions)
+
+
+def batch(submissions: list) -> int:
+    return sum(grader.grade_batch(submissions))
+
+
+def timed(label: str, fn, submissions: list) -> int:
+    start = time.perf_counter()
+    correct = fn(submissions)
+    elapsed = time.perf_counter() - start
+    per_call = elapsed / len(submissions) * 1e6
+    print(f'{label:<12} {elapsed * 1000:>10.1f} ms {per_call:>10.2f} µs/筆  正確 {correct}')
+    return correct
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='答案批改基準測試')
+    parser.add_argument('--questions', type=int, default=200)
+    parser.add_argument('--submissions', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        submissions = make_submissions(seed(args.questions), args.submissions)
+
+        print(f'題目 {args.questions} 題，提交 {args.submissions} 筆')
+        timed('legacy', legacy, submissions)
+        grader.clear()
+        start = time.perf_counter()
+        grader.load({question_id for question_id, _ in submissions})
+        print(f'{"compile":<12} {(time.perf_counter() - start) * 1000:>10.1f} ms')
+        timed('compiled', compiled, submissions)
+        timed('batch', batch, submissions)
+        db.drop_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+"""
+多人遊戲端對端負載基準測試
+
+以應用程式工廠建立測試用應用程式（記憶體 SQLite），使用 Flask 測試用戶端與
+Socket.IO 測試用戶端模擬 N 個房間 × M 名玩家的完整流程：
+註冊 → 登入 → 建立／加入房間 → 開始遊戲 → 每回合取得題目並作答 → 排名。
+各房間依回合交錯進行，回報整體吞吐量與每個端點、Socket 事件的 p50/p95/p99。
+
+    python -m benchmarks.load --rooms 10 --players 4 --rounds 5 --output load.json
+    python -m benchmarks.load --compare load.json
+
+--output 輸出 JSON（含 git commit），--compare 與先前的結果比較。
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import random
+import subprocess
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+from app import create_app, db, socketio
+from models import Category, Question
+
+OPTIONS = ['go', 'goes', 'going', 'gone', 'went']
+PASSWORD = 'benchmark-password'
+
+
+class Recorder:
+    """依操作名稱記錄延遲與錯誤數"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def call(self, label: str, fn: Callable[[], Any], ok: Callable[[Any], bool] = None) -> Any:
+        start = time.perf_counter()
+        result = fn()
+        self.samples[label].append(time.perf_counter() - start)
+        if ok is not None and not ok(result):
+            self.errors[label] += 1
+        return result
+
+    def http(self, label: str, fn: Callable[[], Any], expected: int = 200) -> Any:
+        return self.call(label, fn, lambda response: response.status_code == expected)
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        operations = {}
+        for label, samples in sorted(self.samples.items()):
+            ordered = sorted(samples)
+            operations[label] = {
+                'count': len(ordered),
+                'errors': self.errors.get(label, 0),
+                'mean_ms': round(sum(ordered) / len(ordered) * 1000, 3),
+                'p50_ms': round(percentile(ordered, 50) * 1000, 3),
+                'p95_ms': round(percentile(ordered, 95) * 1000, 3),
+                'p99_ms': round(percentile(ordered, 99) * 1000, 3)
+            }
+        return operations
+
+
+def percentile(ordered: List[float], p: float) -> float:
+    """最近排名法百分位數（輸入需已排序）"""
+    if not ordered:
+        return 0.0
+    rank = max(math.ceil(p / 100 * len(ordered)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def seed(question_count: int) -> None:
+    """建立基準測試分類與單選題"""
+    category = Category(name='benchmark', display_name='Benchmark')
+    db.session.add(category)
+    db.session.flush()
+    db.session.add_all(Question(
+        category_id=category.id,
+        difficulty='easy',
+        question_type='multiple_choice',
+        question_text=f'Question {i} ___.',
+        options=OPTIONS,
+        answer=random.choice(OPTIONS)
+    ) for i in range(question_count))
+    db.session.commit()
+
+
+class Player:
+    """一名模擬玩家（HTTP 與 Socket.IO 用戶端）"""
+
+    def __init__(self, app, name: str):
+        self.name = name
+        self.http = app.test_client()
+        self.socket = None
+        self.headers: Dict[str, str] = {}
+
+
+def run(app, recorder: Recorder, rooms: int, players: int, rounds: int) -> None:
+    """執行整個模擬流程"""
+    tables: List[Dict[str, Any]] = []
+
+    # 註冊、登入、建立／加入房間並連線
+    for r in range(rooms):
+        members = [Player(app, f'room{r}_player{p}') for p in range(players)]
+        for player in members:
+            recorder.http('POST /api/auth/register', lambda: player.http.post('/api/auth/register', json={
+                'username': player.name, 'email': f'{player.name}@example.com', 'password': PASSWORD
+            }), expected=201)
+            response = recorder.http('POST /api/auth/login', lambda: player.http.post('/api/auth/login', json={
+                'username': player.name, 'password': PASSWORD
+            }))
+            token = response.get_json()['access_token']
+            player.headers = {'Authorization': f'Bearer {token}'}
+            player.socket = recorder.call('socket connect', lambda: socketio.test_client(
+                app, flask_test_client=player.http, auth={'token': token}
+            ), lambda client: client.is_connected())
+
+        host = members[0]
+        response = recorder.http('POST /api/rooms', lambda: host.http.post('/api/rooms/', json={
+            'name': f'Benchmark room {r}', 'max_players': max(players, 2),
+            'total_rounds': rounds, 'categories': ['Benchmark']
+        }, headers=host.headers), expected=201)
+        room_id = response.get_json()['room']['id']
+
+        for player in members[1:]:
+            recorder.http('POST /api/rooms/<id>/join', lambda: player.http.post(
+                f'/api/rooms/{room_id}/join', headers=player.headers))
+        for player in members:
+            recorder.call('socket join_room', lambda: player.socket.emit('join_room', {'room_id': room_id}))
+        recorder.http('GET /api/rooms', lambda: host.http.get('/api/rooms/'))
+        tables.append({'id': room_id, 'players': members})
+
+    for table in tables:
+        host = table['players'][0]
+        recorder.http('POST /api/rooms/<id>/start', lambda: host.http.post(
+            f"/api/rooms/{table['id']}/start", headers=host.headers))
+
+    # 各房間依回合交錯作答
+    for _ in range(rounds):
+        for table in tables:
+            room_id = table['id']
+            for player in table['players']:
+                recorder.http('GET /api/game/<id>/current-question', lambda: player.http.get(
+                    f'/api/game/{room_id}/current-question', headers=player.headers))
+                recorder.http('POST /api/game/<id>/submit-answer', lambda: player.http.post(
+                    f'/api/game/{room_id}/submit-answer', headers=player.headers,
+                    json={'answer': random.choice(OPTIONS), 'time_taken': random.uniform(1, 10)}))
+                recorder.call('socket submit_answer_socket', lambda: player.socket.emit('submit_answer_socket', {
+                    'room_id': room_id, 'answer': 'go', 'time_taken': 1.0
+                }))
+            host = table['players'][0]
+            recorder.http('POST /api/game/<id>/next-round', lambda: host.http.post(
+                f'/api/game/{room_id}/next-round', headers=host.headers))
+            for player in table['players']:
+                player.socket.get_received()
+
+    for table in tables:
+        for player in table['players']:
+            recorder.http('GET /api/game/<id>/rankings', lambda: player.http.get(
+                f"/api/game/{table['id']}/rankings"))
+            player.socket.disconnect()
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(result: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    print(f"房間 {result['rooms']} × 玩家 {result['players']} × 回合 {result['rounds']}，"
+          f"共 {result['operations_total']} 次操作，{result['elapsed_seconds']:.2f} 秒，"
+          f"{result['throughput_ops']:.1f} ops/s")
+    header = f"{'操作':<40} {'次數':>6} {'錯誤':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    if baseline:
+        header += f" {'p95 變化':>9}"
+    print(header)
+    for label, stats in result['operations'].items():
+        line = (f"{label:<40} {stats['count']:>6} {stats['errors']:>4} "
+                f"{stats['p50_ms']:>9.3f} {stats['p95_ms']:>9.3f} {stats['p99_ms']:>9.3f}")
+        before = (baseline or {}).get('operations', {}).get(label)
+        if before and before['p95_ms']:
+            line += f" {(stats['p95_ms'] / before['p95_ms'] - 1) * 100:>+8.1f}%"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='多人遊戲端對端負載基準測試')
+    parser.add_argument('--rooms', type=int, default=10)
+    parser.add_argument('--players', type=int, default=4)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--questions', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='將結果寫入 JSON 檔案')
+    parser.add_argument('--compare', help='與先前輸出的 JSON 結果比較')
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    app = create_app('testing')
+    recorder = Recorder()
+    with app.app_context():
+        db.create_all()
+        seed(max(args.questions, args.rounds))
+
+        start = time.perf_counter()
+        # 隱藏 WebSocket 事件處理器的除錯輸出
+        with contextlib.redirect_stdout(io.StringIO()):
+            run(app, recorder, args.rooms, args.players, args.rounds)
+        elapsed = time.perf_counter() - start
+        db.session.remove()
+        db.drop_all()
+
+    operations = recorder.report()
+    total = sum(stats['count'] for stats in operations.values())
+    result = {
+        'benchmark': 'load',
+        'commit': git_commit(),
+        'rooms': args.rooms,
+        'players': args.players,
+        'rounds': args.rounds,
+        'elapsed_seconds': round(elapsed, 3),
+        'operations_total': total,
+        'errors_total': sum(stats['errors'] for stats in operations.values()),
+        'throughput_ops': round(total / elapsed, 1) if elapsed else 0.0,
+        'operations': operations
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
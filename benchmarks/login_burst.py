@@ -0,0 +1,203 @@
+"""
+登入尖峰期間的 Socket 廣播延遲基準測試
+
+模擬整班同時登入：在 gevent 下同時送出 N 個登入請求，同一段時間內一個進行中的
+房間每隔 --tick 毫秒廣播一次事件給 --listeners 個 Socket.IO 用戶端。廣播延遲為
+實際送出完成的時間減去排定時間，反映 hub 被密碼雜湊阻塞的程度。
+
+比較兩種設定（各自在獨立行程中執行，gevent 需要 monkey patch）：
+
+- inline：PASSWORD_HASH_WORKERS=0，雜湊在請求的 greenlet 中計算
+- pool：雜湊交給執行緒池（--workers）
+
+    python -m benchmarks.login_burst --users 500 --method pbkdf2:sha256:20000 --output login_burst.json
+
+--method 預設使用低成本參數以縮短執行時間；以 scrypt:32768:8:1（正式設定）執行時差距更大。
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from typing import Any, Dict, List
+
+from benchmarks.async_mode import testing_app
+from benchmarks.load import git_commit, percentile
+
+PASSWORD = 'benchmark-password'
+
+
+def latency_summary(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        'count': len(ordered),
+        'p50_ms': round(percentile(ordered, 50) * 1000, 3),
+        'p95_ms': round(percentile(ordered, 95) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3) if ordered else 0.0
+    }
+
+
+def seed(users: int, listeners: int, method: str):
+    """建立登入用的使用者（共用一個預先計算的雜湊）與一個進行中的房間"""
+    from werkzeug.security import generate_password_hash
+
+    from app import db
+    from models import GameRoom, GameSession, User
+
+    password_hash = generate_password_hash(PASSWORD, method=method)
+    db.session.add_all(User(username=f'student{i}', email=f'student{i}@example.com', password_hash=password_hash)
+                       for i in range(users))
+    players = [User(username=f'player{i}', email=f'player{i}@example.com', password_hash=password_hash)
+               for i in range(listeners)]
+    db.session.add_all(players)
+    db.session.flush()
+    room = GameRoom(name='Running game', status='in_progress', categories=['Benchmark'],
+                    created_by=players[0].id)
+    db.session.add(room)
+    db.session.flush()
+    db.session.add_all(GameSession(user_id=player.id, room_id=room.id) for player in players)
+    db.session.commit()
+    return room.id, [player.id for player in players]
+
+
+def run_worker(args, workers: int, database_path: str) -> Dict[str, Any]:
+    from gevent import monkey
+    monkey.patch_all()
+    import gevent
+    from flask_jwt_extended import create_access_token
+
+    from app import create_app, db, socketio
+    from config import TestingConfig
+    from services.password_hasher import password_hasher
+
+    TestingConfig.PASSWORD_HASH_METHOD = args.method
+    TestingConfig.PASSWORD_HASH_WORKERS = workers
+    TestingConfig.PASSWORD_HASH_MAX_QUEUE = args.users
+    app = testing_app(create_app, database_path)
+    with app.app_context():
+        db.create_all()
+        room_id, player_ids = seed(args.users, args.listeners, args.method)
+        tokens = [create_access_token(identity=player_id) for player_id in player_ids]
+
+    listeners = []
+    for token in tokens:
+        listener = socketio.test_client(app, auth={'token': token})
+        listener.emit('join_room', {'room_id': room_id})
+        listeners.append(listener)
+
+    tick = args.tick / 1000
+    running = [True]
+
+    def ticker(lags: List[float]) -> None:
+        """每個 tick 廣播一次，記錄實際完成時間與排定時間的差"""
+        scheduled = time.perf_counter()
+        while running[0]:
+            scheduled += tick
+            gevent.sleep(max(scheduled - time.perf_counter(), 0))
+            with app.app_context():
+                socketio.emit('tick', {'scheduled': scheduled}, room=room_id)
+            lags.append(time.perf_counter() - scheduled)
+            for listener in listeners:
+                listener.get_received()
+
+    def login(index: int, start: float, samples: List[float], failures: List[int]) -> None:
+        response = app.test_client().post('/api/auth/login', json={
+            'username': f'student{index}', 'password': PASSWORD
+        })
+        samples.append(time.perf_counter() - start)
+        failures[0] += response.status_code != 200
+
+    # 沒有登入時的基準延遲
+    idle_lags: List[float] = []
+    idle = gevent.spawn(ticker, idle_lags)
+    gevent.sleep(args.idle)
+    running[0] = False
+    idle.join()
+
+    burst_lags: List[float] = []
+    logins: List[float] = []
+    failures = [0]
+    running[0] = True
+    burst_ticker = gevent.spawn(ticker, burst_lags)
+    start = time.perf_counter()
+    gevent.joinall([gevent.spawn(login, i, start, logins, failures) for i in range(args.users)])
+    burst_seconds = time.perf_counter() - start
+    running[0] = False
+    burst_ticker.join()
+
+    for listener in listeners:
+        listener.disconnect()
+    return {
+        'mode': 'pool' if workers else 'inline',
+        'workers': workers,
+        'burst_seconds': round(burst_seconds, 3),
+        'login_failures': failures[0],
+        'login': latency_summary(logins),
+        'socket_lag_idle': latency_summary(idle_lags),
+        'socket_lag_burst': latency_summary(burst_lags),
+        'hasher': password_hasher.stats()
+    }
+
+
+def run_mode(args, workers: int) -> Dict[str, Any]:
+    """在獨立行程中執行（gevent 的 monkey patch 需在匯入其他模組之前）"""
+    command = [sys.executable, '-m', 'benchmarks.login_burst', '--worker', str(workers),
+               '--users', str(args.users), '--listeners', str(args.listeners), '--tick', str(args.tick),
+               '--idle', str(args.idle), '--method', args.method]
+    completed = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='登入尖峰期間的 Socket 廣播延遲基準測試')
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--listeners', type=int, default=8, help='進行中房間的 Socket 用戶端數')
+    parser.add_argument('--tick', type=float, default=10, help='廣播間隔（毫秒）')
+    parser.add_argument('--idle', type=float, default=0.5, help='量測基準延遲的時間（秒）')
+    parser.add_argument('--workers', type=int, default=4, help='pool 模式的執行緒數')
+    parser.add_argument('--method', default='pbkdf2:sha256:20000', help='Werkzeug 雜湊方法與參數')
+    parser.add_argument('--worker', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--output', help='將結果寫入 JSON 檔案')
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        with tempfile.TemporaryDirectory() as directory:
+            database_path = os.path.join(directory, f'{uuid.uuid4().hex}.db')
+            # 隱藏 WebSocket 事件處理器的除錯輸出
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = run_worker(args, args.worker, database_path)
+        print(json.dumps(result))
+        return
+
+    results = [run_mode(args, 0), run_mode(args, args.workers)]
+    print(f'{args.users} 名使用者同時登入（{args.method}），房間 {args.listeners} 個 Socket 用戶端，'
+          f'每 {args.tick:g} ms 廣播一次')
+    print(f"{'模式':<8} {'尖峰秒數':>8} {'登入 p50':>10} {'登入 p99':>10} {'廣播 p50':>10} "
+          f"{'廣播 p99':>10} {'廣播 max':>10} {'閒置 p99':>10} {'最大佇列':>8}")
+    for r in results:
+        print(f"{r['mode']:<8} {r['burst_seconds']:>8.2f} {r['login']['p50_ms']:>10.1f} "
+              f"{r['login']['p99_ms']:>10.1f} {r['socket_lag_burst']['p50_ms']:>10.2f} "
+              f"{r['socket_lag_burst']['p99_ms']:>10.2f} {r['socket_lag_burst']['max_ms']:>10.2f} "
+              f"{r['socket_lag_idle']['p99_ms']:>10.2f} {r['hasher']['max_queue_depth']:>8}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'benchmark': 'login_burst',
+                'commit': git_commit(),
+                'users': args.users,
+                'listeners': args.listeners,
+                'tick_ms': args.tick,
+                'method': args.method,
+                'modes': results
+            }, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,267 @@
+"""
+模型序列化基準測試
+
+以合成資料量測各模型 to_dict() 的耗時、序列化期間觸發的延遲載入查詢數
+與輸出的 JSON 位元組數，並與快速路徑比較：以欄位 tuple 投影一次查詢取得
+所需欄位（關聯欄位以 JOIN 或子查詢帶出），再以快速 JSON 編碼器輸出
+（已安裝 orjson 時使用 orjson，否則使用緊湊格式的標準 json）。
+
+    python -m benchmarks.serialization --rows 2000 --output serialization.json
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+from flask import current_app
+from sqlalchemy import event, func, select
+
+from app import create_app, db
+from benchmarks.load import git_commit
+from models import Category, GameRoom, GameSession, PlayerAnswer, Question, RoomQuestion, User
+from services.payloads import encode
+
+try:
+    import orjson
+except ImportError:  # 選用套件
+    orjson = None
+
+OPTIONS = ['go', 'goes', 'going', 'gone', 'went']
+
+
+def fast_encode(value) -> bytes:
+    return orjson.dumps(value) if orjson else encode(value)
+
+
+def iso(value: datetime):
+    return value.isoformat() if value else None
+
+
+def seed(rows: int, categories: int = 10, players_per_room: int = 4) -> None:
+    """建立合成資料：使用者、分類、題目、房間、遊戲會話與答案各約 rows 筆"""
+    base = datetime(2024, 1, 1)
+    users = [User(username=f'user{i}', email=f'user{i}@example.com', password_hash='x',
+                  created_at=base + timedelta(seconds=i)) for i in range(rows)]
+    cats = [Category(name=f'category{i}', display_name=f'分類 {i}', description='合成分類')
+            for i in range(categories)]
+    db.session.add_all(users + cats)
+    db.session.flush()
+
+    questions = [Question(
+        category_id=cats[i % categories].id, difficulty='easy', question_type='multiple_choice',
+        question_text=f'Question {i} ___ to school.', options=OPTIONS, answer=random.choice(OPTIONS),
+        explanation='合成題目'
+    ) for i in range(rows)]
+    rooms = [GameRoom(
+        name=f'Room {i}', status='in_progress', categories=[cats[i % categories].display_name],
+        created_by=users[i % rows].id, created_at=base + timedelta(seconds=i), started_at=base
+    ) for i in range(max(rows // players_per_room, 1))]
+    db.session.add_all(questions + rooms)
+    db.session.flush()
+
+    sessions = [GameSession(
+        user_id=users[i % rows].id, room_id=rooms[i // players_per_room % len(rooms)].id,
+        score=random.randint(0, 100), correct_answers=3, total_answers=5
+    ) for i in range(rows)]
+    room_questions = [RoomQuestion(room_id=room.id, question_id=questions[i % rows].id,
+                                   round_number=1, order_in_round=1) for i, room in enumerate(rooms)]
+    db.session.add_all(sessions + room_questions)
+    db.session.flush()
+
+    db.session.add_all(PlayerAnswer(
+        session_id=session.id, room_question_id=room_questions[i // players_per_room % len(rooms)].id,
+        answer=random.choice(OPTIONS), is_correct=random.random() < 0.5, time_taken=random.uniform(1, 30)
+    ) for i, session in enumerate(sessions))
+    db.session.commit()
+
+
+# 快速路徑：欄位 tuple 投影 → 與 to_dict() 相同的字典
+
+def fast_users() -> List[dict]:
+    rows = db.session.execute(select(User.id, User.username, User.email, User.created_at)).all()
+    return [{'id': id_, 'username': username, 'email': email, 'created_at': created_at.isoformat()}
+            for id_, username, email, created_at in rows]
+
+
+def fast_categories() -> List[dict]:
+    counts = select(Question.category_id, func.count(Question.id).label('n')).group_by(
+        Question.category_id).subquery()
+    rows = db.session.execute(select(
+        Category.id, Category.name, Category.display_name, Category.description,
+        func.coalesce(counts.c.n, 0)
+    ).outerjoin(counts, counts.c.category_id == Category.id)).all()
+    return [{'id': id_, 'name': name, 'display_name': display_name, 'description': description,
+             'question_count': count} for id_, name, display_name, description, count in rows]
+
+
+def fast_questions() -> List[dict]:
+    rows = db.session.execute(select(
+        Question.id, Category.display_name, Question.category_id, Question.difficulty,
+        Question.question_type, Question.question_text, Question.options, Question.answer,
+        Question.explanation
+    ).outerjoin(Category, Category.id == Question.category_id)).all()
+    return [{'id': row[0], 'category': row[1], 'category_id': row[2], 'difficulty': row[3],
+             'type': row[4], 'question': row[5], 'options': row[6], 'answer': row[7],
+             'explanation': row[8]} for row in rows]
+
+
+def fast_rooms() -> List[dict]:
+    player_count = select(func.count(GameSession.id)).where(
+        GameSession.room_id == GameRoom.id).scalar_subquery()
+    rows = db.session.execute(select(
+        GameRoom.id, GameRoom.name, GameRoom.status, GameRoom.max_players, GameRoom.current_round,
+        GameRoom.total_rounds, GameRoom.categories, GameRoom.created_by, GameRoom.created_at,
+        GameRoom.started_at, GameRoom.ended_at, player_count
+    )).all()
+    return [{'id': row[0], 'name': row[1], 'status': row[2], 'max_players': row[3],
+             'current_round': row[4], 'total_rounds': row[5], 'categories': row[6],
+             'created_by': row[7], 'created_at': row[8].isoformat(), 'started_at': iso(row[9]),
+             'ended_at': iso(row[10]), 'player_count': row[11]} for row in rows]
+
+
+def fast_sessions() -> List[dict]:
+    rows = db.session.execute(select(
+        GameSession.id, GameSession.user_id, GameSession.room_id, GameSession.score,
+        GameSession.correct_answers, GameSession.total_answers, GameSession.joined_at,
+        GameSession.left_at
+    )).all()
+    return [{'id': row[0], 'user_id': row[1], 'room_id': row[2], 'score': row[3],
+             'correct_answers': row[4], 'total_answers': row[5],
+             'accuracy': round(row[4] / row[5] * 100, 2) if row[5] > 0 else 0,
+             'joined_at': row[6].isoformat(), 'left_at': iso(row[7])} for row in rows]
+
+
+def fast_answers() -> List[dict]:
+    rows = db.session.execute(select(
+        PlayerAnswer.id, PlayerAnswer.session_id, PlayerAnswer.room_question_id, PlayerAnswer.answer,
+        PlayerAnswer.is_correct, PlayerAnswer.time_taken, PlayerAnswer.answered_at
+    )).all()
+    return [{'id': row[0], 'session_id': row[1], 'room_question_id': row[2], 'answer': row[3],
+             'is_correct': row[4], 'time_taken': row[5], 'answered_at': row[6].isoformat()}
+            for row in rows]
+
+
+SERIALIZERS = {
+    'User': (User, fast_users),
+    'Category': (Category, fast_categories),
+    'Question': (Question, fast_questions),
+    'GameRoom': (GameRoom, fast_rooms),
+    'GameSession': (GameSession, fast_sessions),
+    'PlayerAnswer': (PlayerAnswer, fast_answers)
+}
+
+
+class QueryCounter:
+    """計算期間內執行的 SQL 次數"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _count(self, *args) -> None:
+        self.count += 1
+
+    def __enter__(self) -> 'QueryCounter':
+        event.listen(self.engine, 'before_cursor_execute', self._count)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        event.remove(self.engine, 'before_cursor_execute', self._count)
+
+
+def timed(fn: Callable[[], Any]):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def measure(name: str, repeat: int) -> Dict[str, Any]:
+    """量測單一模型的 ORM 與快速路徑（各重複 repeat 次取最佳值）"""
+    model, fast = SERIALIZERS[name]
+    engine = db.engine
+    orm = {'load': [], 'to_dict': [], 'encode': []}
+    fast_times = {'query': [], 'encode': []}
+
+    for _ in range(repeat):
+        db.session.expunge_all()  # 每次都從新的 session 開始，與一般請求相同
+        objects, elapsed = timed(lambda: model.query.all())
+        orm['load'].append(elapsed)
+        with QueryCounter(engine) as lazy:
+            data, elapsed = timed(lambda: [obj.to_dict() for obj in objects])
+        orm['to_dict'].append(elapsed)
+        body, elapsed = timed(lambda: current_app.json.response(data).get_data())  # 與 jsonify 相同
+        orm['encode'].append(elapsed)
+
+        db.session.expunge_all()
+        fast_data, elapsed = timed(fast)
+        fast_times['query'].append(elapsed)
+        fast_body, elapsed = timed(lambda: fast_encode(fast_data))
+        fast_times['encode'].append(elapsed)
+
+    rows = len(data)
+    per_row = lambda seconds: round(min(seconds) / rows * 1e6, 3) if rows else 0.0
+    orm_total = min(orm['load']) + min(orm['to_dict']) + min(orm['encode'])
+    fast_total = min(fast_times['query']) + min(fast_times['encode'])
+    return {
+        'rows': rows,
+        'lazy_loads': lazy.count,
+        'same_output': sorted(map(json.dumps, data)) == sorted(map(json.dumps, fast_data)),
+        'orm': {
+            'load_us_per_row': per_row(orm['load']),
+            'to_dict_us_per_row': per_row(orm['to_dict']),
+            'encode_us_per_row': per_row(orm['encode']),
+            'total_ms': round(orm_total * 1000, 3),
+            'bytes': len(body)
+        },
+        'fast': {
+            'query_us_per_row': per_row(fast_times['query']),
+            'encode_us_per_row': per_row(fast_times['encode']),
+            'total_ms': round(fast_total * 1000, 3),
+            'bytes': len(fast_body)
+        },
+        'speedup': round(orm_total / fast_total, 2) if fast_total else None
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='模型序列化基準測試')
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='將結果寫入 JSON 檔案')
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        seed(args.rows)
+        results = {name: measure(name, args.repeat) for name in SERIALIZERS}
+        db.session.remove()
+        db.drop_all()
+
+    print(f"每筆微秒（µs/row），{args.rows} 筆，JSON 編碼器：{'orjson' if orjson else 'json'}")
+    print(f"{'模型':<14} {'筆數':>6} {'延遲載入':>8} {'load':>8} {'to_dict':>8} {'encode':>8} "
+          f"{'bytes':>9} │ {'query':>8} {'encode':>8} {'bytes':>9} {'加速':>6}")
+    for name, r in results.items():
+        orm, fast = r['orm'], r['fast']
+        print(f"{name:<14} {r['rows']:>6} {r['lazy_loads']:>8} {orm['load_us_per_row']:>8.2f} "
+              f"{orm['to_dict_us_per_row']:>8.2f} {orm['encode_us_per_row']:>8.2f} {orm['bytes']:>9} │ "
+              f"{fast['query_us_per_row']:>8.2f} {fast['encode_us_per_row']:>8.2f} {fast['bytes']:>9} "
+              f"{r['speedup']:>5}x{'' if r['same_output'] else ' ≠'}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'benchmark': 'serialization',
+                'commit': git_commit(),
+                'rows': args.rows,
+                'encoder': 'orjson' if orjson else 'json',
+                'models': results
+            }, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
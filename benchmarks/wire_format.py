@@ -0,0 +1,170 @@
+"""
+Socket.IO 傳輸格式基準測試（JSON 對 MessagePack）
+
+以實際遊戲事件（player_joined、game_started、answer_submitted、next_round、
+game_finished）組成 N 個房間 × M 名玩家 × R 回合的事件串流，量測每種事件
+的封包大小、廣播後的總傳輸量（每個事件送給房間內所有玩家），以及編碼、
+解碼與伺服器轉換（JSON 封包轉 MessagePack，混合房間時的額外成本）的 CPU 時間。
+
+    python -m benchmarks.wire_format --rooms 100 --players 8 --rounds 10 --output wire.json
+"""
+import argparse
+import json
+import random
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Tuple
+
+from socketio import packet
+
+from benchmarks.load import git_commit
+
+try:
+    from socketio.msgpack_packet import MsgPackPacket
+except ImportError:  # 選用套件
+    MsgPackPacket = None
+
+
+def game_events(players: int, rounds: int) -> List[Tuple[str, Any]]:
+    """一場遊戲依序廣播的事件"""
+    room_id = str(uuid.uuid4())
+    users = [(str(uuid.uuid4()), f'player_{i:02d}') for i in range(players)]
+    events: List[Tuple[str, Any]] = [
+        ('player_joined', {'user_id': user_id, 'username': username}) for user_id, username in users
+    ]
+    ends_at = time.time() + 30
+    events.append(('game_started', {'room_id': room_id, 'total_rounds': rounds, 'time_limit': 30,
+                                    'ends_at': ends_at}))
+
+    scores = {user_id: 0 for user_id, _ in users}
+    for current_round in range(1, rounds + 1):
+        for user_id, username in users:
+            is_correct = random.random() < 0.6
+            scores[user_id] += 10 if is_correct else 0
+            events.append(('answer_submitted', {'user_id': user_id, 'username': username,
+                                                'is_correct': is_correct,
+                                                'time_taken': round(random.uniform(1, 30), 3)}))
+        if current_round < rounds:
+            ends_at += 33
+            events.append(('next_round', {'current_round': current_round + 1, 'total_rounds': rounds,
+                                          'time_limit': 30, 'ends_at': ends_at}))
+
+    joined_at = datetime.utcnow().isoformat()
+    ranked = sorted(users, key=lambda user: -scores[user[0]])
+    events.append(('game_finished', {'rankings': [{
+        'id': str(uuid.uuid4()), 'user_id': user_id, 'room_id': room_id, 'score': scores[user_id],
+        'correct_answers': scores[user_id] // 10, 'total_answers': rounds,
+        'accuracy': round(scores[user_id] / 10 / rounds * 100, 2), 'joined_at': joined_at,
+        'left_at': None, 'username': username, 'time_taken': round(random.uniform(10, 300), 2),
+        'rank': rank
+    } for rank, (user_id, username) in enumerate(ranked, 1)]}))
+    return events
+
+
+def wire_size(encoded) -> int:
+    """WebSocket 訊息內容大小：JSON 為文字訊息（加上 Engine.IO 類型字元），MessagePack 為二進位訊息"""
+    if isinstance(encoded, bytes):
+        return len(encoded)
+    return len(encoded.encode()) + 1
+
+
+def timed(fn: Callable[[], Any], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure(events: List[Tuple[str, Any]], repeat: int) -> Dict[str, Any]:
+    """依事件類型量測兩種格式"""
+    by_event: Dict[str, List[Any]] = defaultdict(list)
+    for name, data in events:
+        by_event[name].append([name, data])
+
+    results = {}
+    for name, payloads in by_event.items():
+        json_packets = [packet.Packet(packet.EVENT, data=data).encode() for data in payloads]
+        row = {
+            'events': len(payloads),
+            'json_bytes': sum(map(wire_size, json_packets)) // len(payloads),
+            'json_encode_us': timed(lambda: [packet.Packet(packet.EVENT, data=data).encode()
+                                             for data in payloads], repeat) / len(payloads) * 1e6,
+            'json_decode_us': timed(lambda: [packet.Packet(encoded_packet=encoded)
+                                             for encoded in json_packets], repeat) / len(payloads) * 1e6
+        }
+        if MsgPackPacket:
+            msgpack_packets = [MsgPackPacket(packet.EVENT, data=data).encode() for data in payloads]
+            row.update({
+                'msgpack_bytes': sum(map(wire_size, msgpack_packets)) // len(payloads),
+                'msgpack_encode_us': timed(lambda: [MsgPackPacket(packet.EVENT, data=data).encode()
+                                                    for data in payloads], repeat) / len(payloads) * 1e6,
+                'msgpack_decode_us': timed(lambda: [MsgPackPacket(encoded_packet=encoded)
+                                                    for encoded in msgpack_packets], repeat) / len(payloads) * 1e6,
+                # 混合房間：伺服器把已編碼的 JSON 封包轉成 MessagePack
+                'translate_us': timed(lambda: [MsgPackPacket(packet.EVENT, data=packet.Packet(
+                    encoded_packet=encoded).data).encode() for encoded in json_packets],
+                    repeat) / len(payloads) * 1e6
+            })
+        results[name] = {key: round(value, 3) if isinstance(value, float) else value
+                         for key, value in row.items()}
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Socket.IO 傳輸格式基準測試')
+    parser.add_argument('--rooms', type=int, default=100)
+    parser.add_argument('--players', type=int, default=8)
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='將結果寫入 JSON 檔案')
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    events = [event for _ in range(args.rooms) for event in game_events(args.players, args.rounds)]
+    per_event = measure(events, args.repeat)
+
+    # 每個事件廣播給房間內所有玩家
+    totals = {'events': len(events), 'deliveries': len(events) * args.players}
+    for fmt in ('json', 'msgpack') if MsgPackPacket else ('json',):
+        totals[f'{fmt}_bytes'] = sum(r['events'] * r[f'{fmt}_bytes'] for r in per_event.values()) * args.players
+        totals[f'{fmt}_encode_ms'] = round(sum(r['events'] * r[f'{fmt}_encode_us'] for r in per_event.values()) / 1000, 3)
+        totals[f'{fmt}_decode_ms'] = round(sum(r['events'] * r[f'{fmt}_decode_us'] for r in per_event.values())
+                                           * args.players / 1000, 3)
+
+    print(f'房間 {args.rooms} × 玩家 {args.players} × 回合 {args.rounds}，'
+          f"事件 {totals['events']}，送達 {totals['deliveries']} 次")
+    if not MsgPackPacket:
+        print('未安裝 msgpack，只量測 JSON')
+    print(f"{'事件':<18} {'數量':>6} {'JSON B':>8} {'MsgPack B':>10} {'JSON 編碼µs':>12} "
+          f"{'MsgPack 編碼µs':>15} {'JSON 解碼µs':>12} {'MsgPack 解碼µs':>15} {'轉換µs':>8}")
+    for name, r in per_event.items():
+        print(f"{name:<18} {r['events']:>6} {r['json_bytes']:>8} {r.get('msgpack_bytes', '-'):>10} "
+              f"{r['json_encode_us']:>12.2f} {r.get('msgpack_encode_us', 0):>15.2f} "
+              f"{r['json_decode_us']:>12.2f} {r.get('msgpack_decode_us', 0):>15.2f} {r.get('translate_us', 0):>8.2f}")
+    if MsgPackPacket:
+        saved = 1 - totals['msgpack_bytes'] / totals['json_bytes']
+        print(f"總傳輸量 JSON {totals['json_bytes'] / 1024:.1f} KiB，MessagePack "
+              f"{totals['msgpack_bytes'] / 1024:.1f} KiB（減少 {saved * 100:.1f}%）")
+        print(f"伺服器編碼 JSON {totals['json_encode_ms']} ms，MessagePack {totals['msgpack_encode_ms']} ms；"
+              f"客戶端解碼 JSON {totals['json_decode_ms']} ms，MessagePack {totals['msgpack_decode_ms']} ms")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'benchmark': 'wire_format',
+                'commit': git_commit(),
+                'rooms': args.rooms,
+                'players': args.players,
+                'rounds': args.rounds,
+                'events': per_event,
+                'totals': totals
+            }, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,8 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from app import db
 from models import User
+from services.password_hasher import password_hasher, PasswordHashBusy
 from marshmallow import Schema, fields, ValidationError
 
 auth_bp = Blueprint('auth', __name__)
@@ -49,6 +50,8 @@ def register():
         
     except ValidationError as e:
         return jsonify({'error': '驗證錯誤', 'details': e.messages}), 400
+    except PasswordHashBusy:
+        return jsonify({'error': '伺服器忙碌中，請稍後再試'}), 503
     except Exception as e:
         db.session.rollback()
         print(f'註冊失敗錯誤: {e}')
@@ -67,6 +70,17 @@ def login():
         if not user or not user.check_password(data['password']):
             return jsonify({'error': '使用者名稱或密碼錯誤'}), 401
         
+        # 雜湊參數變更後，以這次登入的密碼重新計算雜湊；
+        # 失敗（佇列已滿或寫入失敗）時仍讓使用者登入，下次登入再試
+        if user.password_needs_rehash():
+            try:
+                user.set_password(data['password'])
+                db.session.commit()
+                password_hasher.record_rehash()
+            except Exception as e:
+                db.session.rollback()
+                current_app.logger.warning(f'重新雜湊密碼失敗: {e}')
+        
         # 建立 JWT token
         access_token = create_access_token(identity=user.id)
         
@@ -78,7 +92,10 @@ def login():
         
     except ValidationError as e:
         return jsonify({'error': '驗證錯誤', 'details': e.messages}), 400
+    except PasswordHashBusy:
+        return jsonify({'error': '伺服器忙碌中，請稍後再試'}), 503
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': '登入失敗'}), 500
 
 @auth_bp.route('/me', methods=['GET'])
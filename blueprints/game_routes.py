@@ -1,10 +1,16 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from app import db, socketio
-from models import GameRoom, GameSession, RoomQuestion, PlayerAnswer, Question, User
+from flask import Blueprint, Response, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
+from app import db
+from models import GameRoom, GameSession
+from services.user_cache import user_cache
+from services.room_state import room_states, RoomState, RoomStateError
+from services.leaderboard import slice_rankings
+from services.payloads import current_question_body
+from services.round_scheduler import round_scheduler, advance_round
+from services.wire_format import wire_formats
+from services.room_snapshots import room_snapshots, player_fields
+from services.room_events import room_events
 from marshmallow import Schema, fields, ValidationError
-from datetime import datetime
-import time
 
 game_bp = Blueprint('game', __name__)
 
@@ -19,39 +25,31 @@ def get_current_question(room_id):
     """取得當前題目"""
     try:
         user_id = get_jwt_identity()
-        room = GameRoom.query.get(room_id)
+        state = room_states.get_or_load(room_id)
         
-        if not room:
-            return jsonify({'error': '房間不存在'}), 404
-        
-        if room.status != 'in_progress':
+        if not state:
+            if not GameRoom.query.get(room_id):
+                return jsonify({'error': '房間不存在'}), 404
             return jsonify({'error': '遊戲未進行中'}), 400
         
+        if user_id not in state.players:
+            return jsonify({'error': '不在遊戲中'}), 400
+        
         # 取得當前題目
-        current_question = RoomQuestion.query.filter_by(
-            room_id=room_id,
-            round_number=room.current_round
-        ).first()
+        current_question = state.current_round_state()
         
         if not current_question:
             return jsonify({'error': '題目不存在'}), 404
         
-        # 檢查是否已回答
-        existing_answer = PlayerAnswer.query.filter_by(
-            session_id=GameSession.query.filter_by(user_id=user_id, room_id=room_id).first().id,
-            room_question_id=current_question.id
-        ).first()
-        
-        question_data = current_question.question.to_dict()
-        question_data['room_question_id'] = current_question.id
-        question_data['time_limit'] = current_question.time_limit
-        question_data['answered'] = existing_answer is not None
-        
-        return jsonify({
-            'question': question_data,
-            'current_round': room.current_round,
-            'total_rounds': room.total_rounds
-        }), 200
+        # 題目部分使用 start_game 時預先編碼的 JSON
+        body = current_question_body(
+            current_question,
+            answered=user_id in current_question.answered,
+            ends_at=state.round_ends_at,
+            current_round=state.current_round,
+            total_rounds=state.total_rounds
+        )
+        return Response(body, 200, mimetype='application/json')
         
     except Exception as e:
         return jsonify({'error': '取得題目失敗'}), 500
@@ -65,64 +63,25 @@ def submit_answer(room_id):
         schema = AnswerSubmitSchema()
         data = schema.load(request.get_json())
         
-        room = GameRoom.query.get(room_id)
-        if not room or room.status != 'in_progress':
+        state = room_states.get_or_load(room_id)
+        if not state:
             return jsonify({'error': '遊戲未進行中'}), 400
         
-        session = GameSession.query.filter_by(user_id=user_id, room_id=room_id).first()
-        if not session:
-            return jsonify({'error': '不在遊戲中'}), 400
-        
-        # 取得當前題目
-        current_question = RoomQuestion.query.filter_by(
-            room_id=room_id,
-            round_number=room.current_round
-        ).first()
-        
-        if not current_question:
-            return jsonify({'error': '題目不存在'}), 404
-        
-        # 檢查是否已回答
-        existing_answer = PlayerAnswer.query.filter_by(
-            session_id=session.id,
-            room_question_id=current_question.id
-        ).first()
-        
-        if existing_answer:
-            return jsonify({'error': '已回答此題'}), 400
-        
-        # 驗證答案
-        question = current_question.question
-        is_correct = False
-        
-        if question.question_type == 'multiple_choice':
-            is_correct = data['answer'] == question.answer
-        elif question.question_type == 'multi_blank':
-            is_correct = data['answer'] == question.answer
-        
-        # 儲存答案
-        player_answer = PlayerAnswer(
-            session_id=session.id,
-            room_question_id=current_question.id,
-            answer=data['answer'],
-            is_correct=is_correct,
-            time_taken=data['time_taken']
-        )
-        
-        db.session.add(player_answer)
+        # 批改答案並排入背景寫入
+        result = room_states.record_answer(state, user_id, data['answer'], data['time_taken'])
+        current_question = result['round']
+        is_correct = result['is_correct']
         
-        # 更新會話統計
-        session.total_answers += 1
-        if is_correct:
-            session.correct_answers += 1
-            session.score += max(1, int(30 - data['time_taken']))  # 根據答題時間給分
+        room_snapshots.apply(room_id, players={user_id: player_fields(result['player'])})
         
-        db.session.commit()
+        # 所有玩家都已作答時提前結束回合
+        if state.all_answered():
+            round_scheduler.close_early(state)
         
         # 透過 WebSocket 通知其他玩家
-        socketio.emit('answer_submitted', {
+        room_events.emit('answer_submitted', {
             'user_id': user_id,
-            'username': User.query.get(user_id).username,
+            'username': user_cache.get_username(user_id),
             'is_correct': is_correct,
             'time_taken': data['time_taken']
         }, room=room_id)
@@ -130,12 +89,14 @@ def submit_answer(room_id):
         return jsonify({
             'message': '答案提交成功',
             'is_correct': is_correct,
-            'correct_answer': question.answer,
-            'explanation': question.explanation
+            'correct_answer': current_question.answer,
+            'explanation': current_question.explanation
         }), 200
         
     except ValidationError as e:
         return jsonify({'error': '驗證錯誤', 'details': e.messages}), 400
+    except RoomStateError as e:
+        return jsonify({'error': e.message}), e.status_code
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': '提交答案失敗'}), 500
@@ -146,76 +107,70 @@ def next_round(room_id):
     """進入下一回合"""
     try:
         user_id = get_jwt_identity()
-        room = GameRoom.query.get(room_id)
+        state = room_states.get_or_load(room_id)
         
-        if not room or room.created_by != user_id:
-            return jsonify({'error': '權限不足'}), 403
-        
-        if room.status != 'in_progress':
+        if not state:
+            room = GameRoom.query.get(room_id)
+            if not room or room.created_by != user_id:
+                return jsonify({'error': '權限不足'}), 403
             return jsonify({'error': '遊戲未進行中'}), 400
         
-        # 檢查所有玩家是否都已答題
-        current_question = RoomQuestion.query.filter_by(
-            room_id=room_id,
-            round_number=room.current_round
-        ).first()
+        if state.created_by != user_id:
+            return jsonify({'error': '權限不足'}), 403
         
-        if not current_question:
+        if not state.current_round_state():
             return jsonify({'error': '題目不存在'}), 404
         
-        answered_count = PlayerAnswer.query.filter_by(
-            room_question_id=current_question.id
-        ).count()
-        
-        if answered_count < len(room.players):
-            return jsonify({'error': '還有玩家未答題'}), 400
-        
-        # 進入下一回合或結束遊戲
-        if room.current_round >= room.total_rounds:
-            # 遊戲結束
-            room.status = 'finished'
-            room.ended_at = datetime.utcnow()
-            db.session.commit()
-            
-            # 計算最終排名
-            rankings = get_room_rankings(room_id)
-            
-            socketio.emit('game_finished', {
-                'rankings': rankings
-            }, room=room_id)
-            
+        # 檢查所有玩家是否都已答題，並進入下一回合或結束遊戲（同時廣播事件）
+        result = advance_round(state)
+        
+        if result['finished']:
             return jsonify({
                 'message': '遊戲結束',
-                'rankings': rankings
-            }), 200
-        else:
-            # 下一回合
-            room.current_round += 1
-            db.session.commit()
-            
-            socketio.emit('next_round', {
-                'current_round': room.current_round,
-                'total_rounds': room.total_rounds
-            }, room=room_id)
-            
-            return jsonify({
-                'message': '進入下一回合',
-                'current_round': room.current_round
+                'rankings': result['rankings']
             }), 200
         
+        return jsonify({
+            'message': '進入下一回合',
+            'current_round': result['current_round']
+        }), 200
+        
+    except RoomStateError as e:
+        return jsonify({'error': e.message}), e.status_code
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': '進入下一回合失敗'}), 500
 
 @game_bp.route('/<room_id>/rankings', methods=['GET'])
 def get_rankings(room_id):
-    """取得房間排名"""
+    """取得房間排名（mode=top_k&k=10 或 mode=around_me&radius=2）"""
     try:
+        mode = request.args.get('mode', 'all')
+        k = request.args.get('k', type=int, default=10)
+        radius = request.args.get('radius', type=int, default=2)
+        
+        if mode not in ('all', 'top_k', 'around_me'):
+            return jsonify({'error': '不支援的排名模式'}), 400
+        
+        user_id = None
+        if mode == 'around_me':
+            verify_jwt_in_request(optional=True)
+            user_id = get_jwt_identity()
+            if not user_id:
+                return jsonify({'error': '需要登入'}), 401
+        
+        # 進行中的房間直接讀取記憶體中的排行榜
+        state = room_states.get(room_id)
+        if state:
+            return jsonify({
+                'rankings': state.rankings(mode, k, user_id, radius)
+            }), 200
+        
         room = GameRoom.query.get(room_id)
         if not room:
             return jsonify({'error': '房間不存在'}), 404
         
-        rankings = get_room_rankings(room_id)
+        rankings = slice_rankings(get_room_rankings(room_id), mode, k, user_id, radius)
         
         return jsonify({
             'rankings': rankings
@@ -224,23 +179,25 @@ def get_rankings(room_id):
     except Exception as e:
         return jsonify({'error': '取得排名失敗'}), 500
 
-def get_room_rankings(room_id: str) -> list:
+def get_room_rankings(room_id: str, state: RoomState = None) -> list:
     """取得房間排名（內部函式）"""
-    sessions = GameSession.query.filter_by(room_id=room_id).all()
-    rankings = []
+    if state:
+        return state.rankings()
     
-    for session in sessions:
-        user = User.query.get(session.user_id)
-        if user:
-            ranking_info = session.to_dict()
-            ranking_info['username'] = user.username
-            rankings.append(ranking_info)
+    rankings = GameSession.room_players(room_id)
     
-    # 按分數排序
-    rankings.sort(key=lambda x: (x['score'], -x['time_taken']), reverse=True)
+    # 按分數排序，同分時累計答題時間較短者優先
+    rankings.sort(key=lambda x: (-x['score'], x['time_taken'], x['user_id']))
     
     # 添加排名
     for i, ranking in enumerate(rankings):
         ranking['rank'] = i + 1
     
-    return rankings 
\ No newline at end of file
+    return rankings
+
+@game_bp.route('/wire-formats', methods=['GET'])
+def get_wire_formats():
+    """取得 WebSocket 支援的傳輸格式（客戶端連線前協商）"""
+    return jsonify({
+        'formats': wire_formats.formats()
+    }), 200
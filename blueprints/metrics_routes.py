@@ -0,0 +1,11 @@
+from flask import Blueprint, Response
+from services.admin import admin_required
+from services.metrics import request_metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('', methods=['GET'])
+@admin_required
+def get_metrics():
+    """以 Prometheus 文字格式匯出此 worker 的請求與 SQL 查詢指標"""
+    return Response(request_metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
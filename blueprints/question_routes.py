@@ -1,84 +1,136 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
-from models import Question, User
-from marshmallow import Schema, fields, ValidationError
+from services.admin import admin_required
+from models import Question, Category, User
+from services.question_pool import question_pool
+from services.catalog import category_catalog
+from services.http_cache import catalog_responses
+from services.importer import read_rows, import_questions
+from services.pagination import encode_cursor, decode_cursor, after_cursor
+from sqlalchemy.orm import joinedload
+from marshmallow import ValidationError
+from schemas import QuestionSchema, answer_error
+import io
 import random
 
 question_bp = Blueprint('questions', __name__)
 
-class QuestionSchema(Schema):
-    """題目驗證 Schema"""
-    category_id = fields.Str(required=True)
-    difficulty = fields.Str(required=True, validate=lambda x: x in ['easy', 'medium', 'hard'])
-    question_type = fields.Str(required=True, validate=lambda x: x in ['multiple_choice', 'multi_blank'])
-    question_text = fields.Str(required=True)
-    options = fields.List(fields.Str(), required=True)
-    answer = fields.Raw(required=True)  # 可以是字串或列表
-    explanation = fields.Str(required=False)
+MAX_QUESTION_PAGE_SIZE = 500
+
+# fields 參數可選的欄位（名稱與 Question.to_dict() 相同）
+QUESTION_FIELDS = {
+    'id': Question.id,
+    'category': Category.display_name,
+    'category_id': Question.category_id,
+    'difficulty': Question.difficulty,
+    'type': Question.question_type,
+    'question': Question.question_text,
+    'options': Question.options,
+    'answer': Question.answer,
+    'explanation': Question.explanation
+}
 
 @question_bp.route('/', methods=['GET'])
 def get_questions():
-    """取得題目列表"""
+    """取得題目列表
+    
+    非隨機查詢依建立時間由新到舊做 keyset 分頁（cursor 為上一頁的 next_cursor），
+    fields 可指定只回傳部分欄位，例如 fields=id,question。
+    """
     try:
         # 取得查詢參數
         categories = request.args.get('categories', '').split(',') if request.args.get('categories') else []
         difficulties = request.args.get('difficulties', '').split(',') if request.args.get('difficulties') else []
         question_types = request.args.get('types', '').split(',') if request.args.get('types') else []
-        limit = request.args.get('limit', type=int, default=10)
+        limit = min(max(request.args.get('limit', type=int, default=10), 1), MAX_QUESTION_PAGE_SIZE)
         shuffle = request.args.get('shuffle', type=bool, default=False)
         
-        # 建立查詢
-        query = Question.query
+        selected_fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()]
+        unknown_fields = [f for f in selected_fields if f not in QUESTION_FIELDS]
+        if unknown_fields:
+            return jsonify({'error': '無效的欄位', 'details': unknown_fields}), 400
         
-        # 套用篩選條件
-        if categories and categories[0]:
-            # 根據分類名稱找到對應的 category_id
-            from models import Category
-            category_ids = []
-            for cat_name in categories:
-                category = Category.query.filter_by(display_name=cat_name).first()
-                if category:
-                    category_ids.append(category.id)
-            
-            if category_ids:
-                query = query.filter(Question.category_id.in_(category_ids))
+        after = None
+        if request.args.get('cursor'):
+            after = decode_cursor(request.args['cursor'])
+            if not after:
+                return jsonify({'error': '無效的分頁游標'}), 400
         
-        if difficulties and difficulties[0]:
-            query = query.filter(Question.difficulty.in_(difficulties))
+        # 根據分類 ID、名稱或顯示名稱找到對應的 category_id（使用分類目錄快取）
+        category_ids = category_catalog.resolve_ids(categories)
         
+        # 套用篩選條件
+        filters = []
+        if category_ids:
+            filters.append(Question.category_id.in_(category_ids))
+        if difficulties and difficulties[0]:
+            filters.append(Question.difficulty.in_(difficulties))
         if question_types and question_types[0]:
-            query = query.filter(Question.question_type.in_(question_types))
+            filters.append(Question.question_type.in_(question_types))
         
-        # 隨機排序
+        # 隨機抽題：由題庫索引分層抽樣，只查詢抽中的題目
+        next_cursor = None
         if shuffle:
-            query = query.order_by(db.func.random())
+            question_ids = question_pool.sample(
+                limit,
+                category_ids=category_ids or None,
+                difficulties=difficulties if difficulties and difficulties[0] else None,
+                question_types=question_types if question_types and question_types[0] else None
+            )
+            rows = _select_questions(selected_fields, [Question.id.in_(question_ids)]).all()
+            rows_by_id = {row.id: row for row in rows}
+            rows = [rows_by_id[qid] for qid in question_ids if qid in rows_by_id]
         else:
-            query = query.order_by(Question.created_at.desc())
-        
-        # 限制數量
-        questions = query.limit(limit).all()
+            if after:
+                filters.append(after_cursor(Question.created_at, Question.id, after))
+            rows = _select_questions(selected_fields, filters).order_by(
+                Question.created_at.desc(), Question.id.desc()
+            ).limit(limit + 1).all()
+            if len(rows) > limit:
+                rows = rows[:limit]
+                last = rows[-1]
+                next_cursor = encode_cursor(last.created_at, last.id)
         
         return jsonify({
-            'questions': [q.to_dict() for q in questions],
-            'total': len(questions)
+            'questions': [_question_data(row, selected_fields) for row in rows],
+            'total': len(rows),
+            'next_cursor': next_cursor
         }), 200
         
     except Exception as e:
         return jsonify({'error': '取得題目失敗'}), 500
 
+def _select_questions(selected_fields: list, filters: list):
+    """建立題目查詢：未指定欄位時載入完整題目，否則只查詢需要的欄位"""
+    if not selected_fields:
+        return Question.query.options(joinedload(Question.category)).filter(*filters)
+    
+    # 分頁需要 created_at 與 id
+    columns = [Question.id, Question.created_at]
+    columns += [QUESTION_FIELDS[f].label(f'f_{f}') for f in selected_fields]
+    query = db.session.query(*columns)
+    if 'category' in selected_fields:
+        query = query.outerjoin(Category, Category.id == Question.category_id)
+    return query.filter(*filters)
+
+def _question_data(row, selected_fields: list) -> dict:
+    """轉換查詢結果為回應資料"""
+    if not selected_fields:
+        return row.to_dict()
+    return {f: getattr(row, f'f_{f}') for f in selected_fields}
+
 @question_bp.route('/<question_id>', methods=['GET'])
 def get_question(question_id):
     """取得指定題目"""
     try:
-        question = Question.query.get(question_id)
+        def build():
+            question = Question.query.get(question_id)
+            if not question:
+                return {'error': '題目不存在'}, 404
+            return {'question': question.to_dict()}, 200
         
-        if not question:
-            return jsonify({'error': '題目不存在'}), 404
-        
-        return jsonify({
-            'question': question.to_dict()
-        }), 200
+        return catalog_responses.respond(f'question:{question_id}', build)
         
     except Exception as e:
         return jsonify({'error': '取得題目失敗'}), 500
@@ -92,14 +144,9 @@ def create_question():
         data = schema.load(request.get_json())
         
         # 驗證答案格式
-        if data['question_type'] == 'multiple_choice':
-            if not isinstance(data['answer'], str) or data['answer'] not in data['options']:
-                return jsonify({'error': '單選題答案必須是選項之一'}), 400
-        elif data['question_type'] == 'multi_blank':
-            if not isinstance(data['answer'], list):
-                return jsonify({'error': '多選題答案必須是列表'}), 400
-            if not all(ans in data['options'] for ans in data['answer']):
-                return jsonify({'error': '多選題答案必須都是選項之一'}), 400
+        error = answer_error(data)
+        if error:
+            return jsonify({'error': error}), 400
         
         # 建立新題目
         question = Question(**data)
@@ -107,6 +154,9 @@ def create_question():
         db.session.add(question)
         db.session.commit()
         
+        # 更新題庫抽題索引（分類目錄於交易提交時自動失效）
+        question_pool.add(question)
+        
         return jsonify({
             'message': '題目建立成功',
             'question': question.to_dict()
@@ -118,16 +168,52 @@ def create_question():
         db.session.rollback()
         return jsonify({'error': '建立題目失敗'}), 500
 
+@question_bp.route('/import', methods=['POST'])
+@admin_required
+def import_question_file():
+    """批次匯入題目（管理用途）
+    
+    上傳 file 欄位或直接以請求內容傳送 JSONL / CSV，格式依 format 參數、
+    副檔名或 Content-Type 判斷，預設為 JSONL。
+    """
+    try:
+        upload = request.files.get('file')
+        if upload:
+            raw, filename = upload.stream, upload.filename or ''
+        else:
+            raw, filename = request.stream, ''
+        
+        fmt = request.args.get('format')
+        if not fmt:
+            fmt = 'csv' if filename.lower().endswith('.csv') or request.mimetype == 'text/csv' else 'jsonl'
+        
+        rows = read_rows(io.TextIOWrapper(raw, encoding='utf-8-sig'), fmt)
+        report = import_questions(rows, batch_size=current_app.config.get('IMPORT_BATCH_SIZE', 1000))
+        
+        return jsonify({
+            'message': '匯入完成',
+            'report': report.to_dict()
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': '匯入題目失敗'}), 500
+
 @question_bp.route('/categories', methods=['GET'])
 def get_categories():
     """取得所有題目分類"""
     try:
-        # 從 Category 表格取得所有分類
-        from models import Category
-        categories = Category.query.all()
-        return jsonify({
-            'categories': [cat.display_name for cat in categories]
-        }), 200
+        # 從分類目錄快取取得分類與題數
+        def build():
+            categories = category_catalog.all()
+            return {
+                'categories': [cat['display_name'] for cat in categories],
+                'details': categories
+            }, 200
+        
+        return catalog_responses.respond('categories', build)
         
     except Exception as e:
         return jsonify({'error': '取得分類失敗'}), 500
@@ -136,10 +222,11 @@ def get_categories():
 def get_difficulties():
     """取得所有難度等級"""
     try:
-        difficulties = db.session.query(Question.difficulty).distinct().all()
-        return jsonify({
-            'difficulties': [diff[0] for diff in difficulties]
-        }), 200
+        def build():
+            difficulties = db.session.query(Question.difficulty).distinct().all()
+            return {'difficulties': [diff[0] for diff in difficulties]}, 200
+        
+        return catalog_responses.respond('difficulties', build)
         
     except Exception as e:
         return jsonify({'error': '取得難度等級失敗'}), 500 
\ No newline at end of file
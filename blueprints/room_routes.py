@@ -1,13 +1,25 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app import db, socketio
+from app import db
 from models import GameRoom, GameSession, RoomQuestion, Question, User
+from services.user_cache import user_cache
+from services.room_state import room_states, RoomState
+from services.question_pool import question_pool, resolve_category_ids
+from services.round_scheduler import round_scheduler
+from services.catalog import category_catalog
+from services.payloads import question_payloads
+from services.pagination import encode_cursor, decode_cursor
+from services.room_snapshots import room_snapshots
+from services.room_events import room_events
+from sqlalchemy.orm import joinedload
 from marshmallow import Schema, fields, ValidationError
 from datetime import datetime
 import random
 
 room_bp = Blueprint('rooms', __name__)
 
+MAX_LOBBY_PAGE_SIZE = 100
+
 class RoomCreateSchema(Schema):
     """房間建立驗證 Schema"""
     name = fields.Str(required=True, validate=lambda x: len(x) >= 3)
@@ -57,22 +69,49 @@ def create_room():
 
 @room_bp.route('/', methods=['GET'])
 def get_rooms():
-    """取得房間列表"""
+    """取得房間列表（keyset 分頁）
+    
+    查詢參數：status、limit（最多 100）、cursor（上一頁的 next_cursor）、
+    categories（逗號分隔的分類 ID、名稱或顯示名稱）、has_free_seats。
+    """
     try:
         status = request.args.get('status', 'waiting')
-        limit = request.args.get('limit', type=int, default=20)
+        limit = min(max(request.args.get('limit', type=int, default=20), 1), MAX_LOBBY_PAGE_SIZE)
+        has_free_seats = request.args.get('has_free_seats', 'false').lower() == 'true'
+        categories = _lobby_categories(request.args.get('categories', ''))
+        
+        after = None
+        if request.args.get('cursor'):
+            after = decode_cursor(request.args['cursor'])
+            if not after:
+                return jsonify({'error': '無效的分頁游標'}), 400
         
-        query = GameRoom.query.filter_by(status=status)
-        rooms = query.order_by(GameRoom.created_at.desc()).limit(limit).all()
+        # 多取一筆判斷是否還有下一頁
+        rows = GameRoom.lobby_page(status, limit + 1, after, categories, has_free_seats)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
         
         return jsonify({
-            'rooms': [room.to_dict() for room in rooms],
-            'total': len(rooms)
+            'rooms': [room.to_dict(player_count=player_count) for room, player_count in rows],
+            'total': len(rows),
+            'next_cursor': encode_cursor(rows[-1][0].created_at, rows[-1][0].id) if has_more else None
         }), 200
         
     except Exception as e:
         return jsonify({'error': '取得房間列表失敗'}), 500
 
+def _lobby_categories(value: str) -> list:
+    """將分類 ID 或名稱轉換為房間儲存的顯示名稱"""
+    values = [v.strip() for v in value.split(',') if v.strip()]
+    if not values:
+        return []
+    
+    display_names = set(values)
+    for category in category_catalog.all():
+        if {category['id'], category['name'], category['display_name']} & display_names:
+            display_names.add(category['display_name'])
+    return sorted(display_names)
+
 @room_bp.route('/<room_id>', methods=['GET'])
 def get_room(room_id):
     """取得房間詳細資訊"""
@@ -82,16 +121,10 @@ def get_room(room_id):
         if not room:
             return jsonify({'error': '房間不存在'}), 404
         
-        # 取得玩家資訊
-        players = []
-        for session in room.players:
-            user = User.query.get(session.user_id)
-            if user:
-                player_info = session.to_dict()
-                player_info['username'] = user.username
-                players.append(player_info)
+        # 取得玩家資訊（單一查詢帶出使用者名稱）
+        players = GameSession.room_players(room_id)
         
-        room_data = room.to_dict()
+        room_data = room.to_dict(player_count=len(players))
         room_data['players'] = players
         
         return jsonify({
@@ -101,6 +134,29 @@ def get_room(room_id):
     except Exception as e:
         return jsonify({'error': '取得房間資訊失敗'}), 500
 
+@room_bp.route('/<room_id>/snapshot', methods=['GET'])
+def get_room_snapshot(room_id):
+    """取得房間快照；帶 since（客戶端目前的版本）時盡量只回傳之後的差異"""
+    try:
+        snapshot = room_snapshots.get(room_id)
+        
+        if not snapshot:
+            return jsonify({'error': '房間不存在'}), 404
+        
+        since = request.args.get('since', type=int)
+        deltas = snapshot.deltas_since(since) if since is not None else None
+        if deltas is not None:
+            return jsonify({
+                'room_id': room_id,
+                'version': snapshot.version,
+                'deltas': deltas
+            }), 200
+        
+        return jsonify(snapshot.to_dict()), 200
+        
+    except Exception as e:
+        return jsonify({'error': '取得房間快照失敗'}), 500
+
 @room_bp.route('/<room_id>/join', methods=['POST'])
 @jwt_required()
 def join_room(room_id):
@@ -136,10 +192,19 @@ def join_room(room_id):
         db.session.add(session)
         db.session.commit()
         
+        username = user_cache.get_username(user_id)
+        room_snapshots.apply(room_id, players={user_id: {
+            'username': username,
+            'score': 0,
+            'correct_answers': 0,
+            'total_answers': 0,
+            'left': False
+        }})
+        
         # 透過 WebSocket 通知其他玩家
-        socketio.emit('player_joined', {
+        room_events.emit('player_joined', {
             'user_id': user_id,
-            'username': User.query.get(user_id).username
+            'username': username
         }, room=room_id)
         
         return jsonify({
@@ -171,15 +236,28 @@ def start_game(room_id):
         if len(room.players) < 2:
             return jsonify({'error': '至少需要 2 名玩家'}), 400
         
-        # 取得題目
-        questions = Question.query.filter(
-            Question.category.in_(room.categories)
-        ).order_by(db.func.random()).limit(room.total_rounds).all()
+        # 從題庫索引依分類分層抽題
+        category_ids = resolve_category_ids(room.categories)
+        question_ids = question_pool.sample(room.total_rounds, category_ids=category_ids) if category_ids else []
+        
+        if len(question_ids) < room.total_rounds:
+            return jsonify({'error': '題目數量不足'}), 400
+        
+        questions_by_id = {
+            q.id: q for q in Question.query.options(
+                joinedload(Question.category)
+            ).filter(Question.id.in_(question_ids)).all()
+        }
+        questions = [questions_by_id[qid] for qid in question_ids if qid in questions_by_id]
         
         if len(questions) < room.total_rounds:
             return jsonify({'error': '題目數量不足'}), 400
         
+        # 題目已確定：預先編碼用戶端題目資料
+        question_payloads.build(questions)
+        
         # 建立房間題目關聯
+        rounds = []
         for i, question in enumerate(questions):
             room_question = RoomQuestion(
                 room_id=room.id,
@@ -188,23 +266,38 @@ def start_game(room_id):
                 order_in_round=1
             )
             db.session.add(room_question)
+            rounds.append((room_question, question))
         
         # 更新房間狀態
         room.status = 'in_progress'
         room.started_at = datetime.utcnow()
         room.current_round = 1
         
+        # 在提交前建立記憶體中的房間狀態（提交後 ORM 物件會過期，再讀取會逐筆重新查詢），
+        # 後續答題不再重複查詢
+        db.session.flush()
+        state = RoomState(room, room.players, rounds)
+        
         db.session.commit()
         
+        room_states.add(state)
+        round_scheduler.open_round(state)
+        room_snapshots.apply(room_id, fields={
+            'status': state.status,
+            'current_round': state.current_round
+        })
+        
         # 透過 WebSocket 通知遊戲開始
-        socketio.emit('game_started', {
+        room_events.emit('game_started', {
             'room_id': room.id,
-            'total_rounds': room.total_rounds
+            'total_rounds': room.total_rounds,
+            'time_limit': state.current_round_state().time_limit,
+            'ends_at': state.round_ends_at
         }, room=room_id)
         
         return jsonify({
             'message': '遊戲開始',
-            'room': room.to_dict()
+            'room': room.to_dict(player_count=len(state.players))
         }), 200
         
     except Exception as e:
@@ -228,10 +321,15 @@ def leave_room(room_id):
         session.left_at = datetime.utcnow()
         db.session.commit()
         
+        state = room_states.get(room_id)
+        if state and user_id in state.players:
+            state.players[user_id].left_at = session.left_at
+        room_snapshots.apply(room_id, players={user_id: {'left': True}})
+        
         # 透過 WebSocket 通知其他玩家
-        socketio.emit('player_left', {
+        room_events.emit('player_left', {
             'user_id': user_id,
-            'username': User.query.get(user_id).username
+            'username': user_cache.get_username(user_id)
         }, room=room_id)
         
         return jsonify({
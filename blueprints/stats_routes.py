@@ -0,0 +1,68 @@
+from flask import Blueprint, jsonify
+from app import socketio
+from services.admin import admin_required
+from services.db_pool import db_pool
+from services.fanout import FanoutManager
+from services.user_cache import user_cache
+from services.http_cache import catalog_responses
+from services.room_state import room_states
+from services.room_snapshots import room_snapshots
+from services.room_events import room_events
+from services.password_hasher import password_hasher
+from services.wire_format import wire_formats
+from services.round_scheduler import round_scheduler
+
+stats_bp = Blueprint('stats', __name__)
+
+@stats_bp.route('/caches', methods=['GET'])
+@admin_required
+def get_cache_stats():
+    """取得快取命中統計"""
+    return jsonify({
+        'user_profiles': user_cache.stats(),
+        'catalog_responses': catalog_responses.stats()
+    }), 200
+
+@stats_bp.route('/writes', methods=['GET'])
+@admin_required
+def get_write_stats():
+    """取得答案寫入佇列與緩衝統計"""
+    return jsonify({
+        'answers': room_states.stats()
+    }), 200
+
+@stats_bp.route('/scheduler', methods=['GET'])
+@admin_required
+def get_scheduler_stats():
+    """取得回合排程統計"""
+    return jsonify({
+        'rounds': round_scheduler.stats()
+    }), 200
+
+@stats_bp.route('/fanout', methods=['GET'])
+@admin_required
+def get_fanout_stats():
+    """取得此 worker 的跨 worker 廣播統計"""
+    manager = socketio.server.manager
+    return jsonify({
+        'fanout': manager.stats() if isinstance(manager, FanoutManager) else None,
+        'wire_formats': wire_formats.stats(),
+        'room_snapshots': room_snapshots.stats(),
+        'room_events': room_events.stats()
+    }), 200
+
+@stats_bp.route('/password-hashing', methods=['GET'])
+@admin_required
+def get_password_hashing_stats():
+    """取得此 worker 的密碼雜湊佇列深度與耗時"""
+    return jsonify({
+        'password_hashing': password_hasher.stats()
+    }), 200
+
+@stats_bp.route('/db-pool', methods=['GET'])
+@admin_required
+def get_db_pool_stats():
+    """取得此 worker 的資料庫連線池統計"""
+    return jsonify({
+        'db_pool': db_pool.snapshot()
+    }), 200
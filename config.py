@@ -9,6 +9,87 @@ class Config:
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key-change-in-production'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
     
+    # 資料庫連線池：gevent worker 的並行請求共用此連線池，等待與溢出統計見 /api/_stats/db-pool
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': float(os.environ.get('DB_POOL_TIMEOUT', 30)),  # 秒
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),  # 秒，需小於 MySQL wait_timeout
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    }
+    
+    # 房間狀態引擎：答案由背景任務寫入資料庫
+    ROOM_STATE_ASYNC_WRITES = True
+    ROOM_STATE_WRITE_INTERVAL = 0.05  # 秒
+    
+    # 答案寫回模式：開啟後答案先緩衝，再以批次 INSERT 與彙總 UPDATE 寫入
+    ANSWER_WRITE_BEHIND = os.environ.get('ANSWER_WRITE_BEHIND', 'false').lower() == 'true'
+    ANSWER_BATCH_SIZE = int(os.environ.get('ANSWER_BATCH_SIZE', 500))
+    ANSWER_FLUSH_INTERVAL = float(os.environ.get('ANSWER_FLUSH_INTERVAL', 1.0))  # 秒
+    
+    # 答案批改：多格填空題預設須依序作答，設為 true 時不計順序
+    GRADER_UNORDERED_MULTI_BLANK = os.environ.get('GRADER_UNORDERED_MULTI_BLANK', 'false').lower() == 'true'
+    GRADER_CACHE_SIZE = 50000
+    
+    # 伺服器端回合計時：time_limit 到期或全員作答後自動進入下一回合
+    AUTO_ADVANCE_ROUNDS = True
+    ROUND_SCHEDULER_TICK = 0.05  # 排程器最長輪詢間隔（秒）
+    ROUND_RESULT_DELAY = 3.0  # 全員作答後保留公布答案的時間（秒）
+    
+    # 房間快照（room_delta 差異推送）：保留的房間數與每個房間保留的差異數
+    ROOM_SNAPSHOT_CACHE_SIZE = 5000
+    ROOM_SNAPSHOT_HISTORY = 50
+    
+    # 房間事件合併廣播的時間窗（秒）；作答、準備等事件在時間窗內合併為一筆，設為 0 時直接廣播
+    ROOM_EVENT_COALESCE_WINDOW = float(os.environ.get('ROOM_EVENT_COALESCE_WINDOW', 0.05))
+    
+    # 使用者資料快取（廣播事件用的使用者名稱）
+    USER_CACHE_SIZE = 10000
+    USER_CACHE_TTL = 300  # 秒
+    
+    # 題庫抽題索引重新載入間隔（秒），用於同步其他 worker 新增的題目
+    QUESTION_POOL_TTL = 300
+    
+    # 跨 worker 廣播：local://、redis://host:port 或 unix:///path（RESP 協定）
+    SOCKETIO_MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE')
+    FANOUT_BATCH_INTERVAL = float(os.environ.get('FANOUT_BATCH_INTERVAL', 0.005))  # 秒
+    FANOUT_BATCH_SIZE = int(os.environ.get('FANOUT_BATCH_SIZE', 100))
+    
+    # Socket.IO MessagePack 傳輸格式（需安裝 msgpack）；啟用後客戶端可選用，其餘客戶端仍使用 JSON
+    SOCKETIO_MSGPACK = os.environ.get('SOCKETIO_MSGPACK', 'false').lower() == 'true'
+    
+    # asyncio 模式（asgi.py）：非同步資料庫網址（預設由 SQLALCHEMY_DATABASE_URI 換成非同步驅動）
+    # 與執行 Flask 藍圖的執行緒數
+    ASYNC_DATABASE_URI = os.environ.get('ASYNC_DATABASE_URI')
+    ASYNC_WSGI_THREADS = int(os.environ.get('ASYNC_WSGI_THREADS', 32))
+    
+    # 題目回應快取（預先編碼的用戶端 JSON）上限
+    QUESTION_PAYLOAD_CACHE_SIZE = 50000
+    
+    # 題目批次匯入每批筆數（每批一次 executemany INSERT 並提交）
+    IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', 1000))
+    
+    # 分類目錄快取（含各分類題數）的有效時間（秒）
+    CATEGORY_CATALOG_TTL = 60
+    
+    # 目錄端點（分類、難度、單一題目）的回應快取；max-age 為 0 時要求客戶端每次以 ETag 驗證
+    CATALOG_RESPONSE_CACHE_SIZE = 2048
+    CATALOG_CACHE_MAX_AGE = int(os.environ.get('CATALOG_CACHE_MAX_AGE', 0))
+    
+    # 密碼雜湊：在執行緒池中計算（0 表示直接計算），等待中的工作超過上限時回應 503；
+    # 變更雜湊方法或參數後，使用者下次登入時自動以新參數重新雜湊
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 4))
+    PASSWORD_HASH_MAX_QUEUE = int(os.environ.get('PASSWORD_HASH_MAX_QUEUE', 256))
+    
+    # 管理員（以逗號分隔的使用者名稱），可匯入題目並存取 /api/_metrics、/api/_stats/*；
+    # 預設沒有管理員，需明確設定
+    ADMIN_USERNAMES = [name.strip() for name in os.environ.get('ADMIN_USERNAMES', '').split(',') if name.strip()]
+    
+    # 請求與 SQL 查詢指標；生產環境可調低抽樣比例降低開銷
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_SAMPLE_RATE = float(os.environ.get('METRICS_SAMPLE_RATE', 1.0))
+    
 class DevelopmentConfig(Config):
     """開發環境設定"""
     DEBUG = True
@@ -16,11 +97,18 @@ class DevelopmentConfig(Config):
 class ProductionConfig(Config):
     """生產環境設定"""
     DEBUG = False
+    METRICS_SAMPLE_RATE = float(os.environ.get('METRICS_SAMPLE_RATE', 0.1))
     
 class TestingConfig(Config):
     """測試環境設定"""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_ENGINE_OPTIONS = {}  # 記憶體 SQLite 使用單一連線的 StaticPool
+    ROOM_STATE_ASYNC_WRITES = False
+    AUTO_ADVANCE_ROUNDS = False
+    ROOM_EVENT_COALESCE_WINDOW = 0
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'  # 測試用低成本參數
+    ADMIN_USERNAMES = ['admin']
 
 config = {
     'development': DevelopmentConfig,
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+題目批次匯入腳本
+
+    python import_questions.py questions.jsonl
+    python import_questions.py questions.csv --batch-size 5000
+"""
+import argparse
+import sys
+
+from app import create_app
+from services.importer import read_rows, import_questions
+
+def main():
+    """主函式"""
+    parser = argparse.ArgumentParser(description='以 JSONL 或 CSV 批次匯入題目')
+    parser.add_argument('path', help='題目檔案路徑（- 代表標準輸入）')
+    parser.add_argument('--format', choices=['jsonl', 'csv'], help='檔案格式（預設依副檔名判斷）')
+    parser.add_argument('--batch-size', type=int, help='每批寫入筆數')
+    args = parser.parse_args()
+    
+    fmt = args.format or ('csv' if args.path.lower().endswith('.csv') else 'jsonl')
+    app = create_app()
+    
+    with app.app_context():
+        batch_size = args.batch_size or app.config.get('IMPORT_BATCH_SIZE', 1000)
+        
+        def progress(report):
+            print(f'   已寫入 {report.imported} 筆（{report.rows_per_second:.0f} 筆/秒）')
+        
+        print(f'📥 匯入題目: {args.path}')
+        stream = sys.stdin if args.path == '-' else open(args.path, encoding='utf-8-sig', newline='')
+        try:
+            report = import_questions(read_rows(stream, fmt), batch_size=batch_size, on_batch=progress)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        
+        print(f'✅ 匯入完成：成功 {report.imported} 筆，失敗 {report.failed} 筆，'
+              f'共 {report.elapsed:.2f} 秒（{report.rows_per_second:.0f} 筆/秒）')
+        for error in report.errors[:20]:
+            print(f'   ❌ 第 {error["line"]} 行: {error["error"]}')
+        
+        if report.failed:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
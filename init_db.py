@@ -2,6 +2,24 @@ from app import create_app, db
 from models import User, Question, Category
 from werkzeug.security import generate_password_hash
 import json
+import os
+import secrets
+from services.importer import import_questions
+
+def repair_double_encoded_questions():
+    """修正舊版 init_db 以 json.dumps 寫入、被重複編碼成字串的 options / answer"""
+    repaired = 0
+    for question in Question.query.all():
+        for field in ('options', 'answer'):
+            value = getattr(question, field)
+            if isinstance(value, str) and value.startswith('['):
+                try:
+                    setattr(question, field, json.loads(value))
+                    repaired += 1
+                except ValueError:
+                    pass
+    if repaired:
+        print(f'✅ 已修正 {repaired} 個重複編碼的欄位')
 
 def init_database():
     """初始化資料庫"""
@@ -20,9 +38,13 @@ def init_database():
                     username='admin',
                     email='admin@example.com'
                 )
-                admin_user.set_password('admin123')
+                # 不使用固定的預設密碼；未指定 ADMIN_PASSWORD 時產生隨機密碼
+                password = os.environ.get('ADMIN_PASSWORD') or secrets.token_urlsafe(12)
+                admin_user.set_password(password)
                 db.session.add(admin_user)
                 print('✅ 管理員帳號建立成功')
+                if not os.environ.get('ADMIN_PASSWORD'):
+                    print(f'   admin 的初始密碼：{password}（請登入後變更）')
             else:
                 print('ℹ️  管理員帳號已存在')
             
@@ -78,7 +100,7 @@ def init_database():
                         'difficulty': 'easy',
                         'question_type': 'multiple_choice',
                         'question_text': 'I ___ to the gym every morning.',
-                        'options': json.dumps(['go', 'going', 'gone', 'goes']),
+                        'options': ['go', 'going', 'gone', 'goes'],
                         'answer': 'go',
                         'explanation': '使用現在簡單式表示習慣性動作'
                     },
@@ -87,7 +109,7 @@ def init_database():
                         'difficulty': 'easy',
                         'question_type': 'multiple_choice',
                         'question_text': 'What time do you usually ___ up?',
-                        'options': json.dumps(['wake', 'waking', 'wakes', 'woken']),
+                        'options': ['wake', 'waking', 'wakes', 'woken'],
                         'answer': 'wake',
                         'explanation': '使用動詞原形'
                     },
@@ -96,7 +118,7 @@ def init_database():
                         'difficulty': 'medium',
                         'question_type': 'multiple_choice',
                         'question_text': 'She ___ her homework before dinner.',
-                        'options': json.dumps(['finishes', 'finish', 'finishing', 'finished']),
+                        'options': ['finishes', 'finish', 'finishing', 'finished'],
                         'answer': 'finishes',
                         'explanation': '第三人稱單數現在簡單式'
                     },
@@ -107,7 +129,7 @@ def init_database():
                         'difficulty': 'easy',
                         'question_type': 'multiple_choice',
                         'question_text': 'How do you ___ to work?',
-                        'options': json.dumps(['get', 'getting', 'gets', 'got']),
+                        'options': ['get', 'getting', 'gets', 'got'],
                         'answer': 'get',
                         'explanation': '使用動詞原形'
                     },
@@ -116,7 +138,7 @@ def init_database():
                         'difficulty': 'medium',
                         'question_type': 'multiple_choice',
                         'question_text': 'The train ___ at 3 PM.',
-                        'options': json.dumps(['arrives', 'arrive', 'arriving', 'arrived']),
+                        'options': ['arrives', 'arrive', 'arriving', 'arrived'],
                         'answer': 'arrives',
                         'explanation': '第三人稱單數現在簡單式'
                     },
@@ -127,7 +149,7 @@ def init_database():
                         'difficulty': 'medium',
                         'question_type': 'multiple_choice',
                         'question_text': 'We ___ the meeting tomorrow.',
-                        'options': json.dumps(['will have', 'have', 'having', 'had']),
+                        'options': ['will have', 'have', 'having', 'had'],
                         'answer': 'will have',
                         'explanation': '使用未來式表示計劃'
                     },
@@ -136,7 +158,7 @@ def init_database():
                         'difficulty': 'hard',
                         'question_type': 'multiple_choice',
                         'question_text': 'The project ___ by next month.',
-                        'options': json.dumps(['will be completed', 'completes', 'completing', 'completed']),
+                        'options': ['will be completed', 'completes', 'completing', 'completed'],
                         'answer': 'will be completed',
                         'explanation': '使用未來被動式'
                     },
@@ -147,7 +169,7 @@ def init_database():
                         'difficulty': 'easy',
                         'question_type': 'multiple_choice',
                         'question_text': 'What subjects do you ___?',
-                        'options': json.dumps(['study', 'studying', 'studies', 'studied']),
+                        'options': ['study', 'studying', 'studies', 'studied'],
                         'answer': 'study',
                         'explanation': '使用動詞原形'
                     },
@@ -156,7 +178,7 @@ def init_database():
                         'difficulty': 'medium',
                         'question_type': 'multiple_choice',
                         'question_text': 'The library ___ at 10 PM.',
-                        'options': json.dumps(['closes', 'close', 'closing', 'closed']),
+                        'options': ['closes', 'close', 'closing', 'closed'],
                         'answer': 'closes',
                         'explanation': '第三人稱單數現在簡單式'
                     },
@@ -167,7 +189,7 @@ def init_database():
                         'difficulty': 'medium',
                         'question_type': 'multiple_choice',
                         'question_text': 'You should ___ more water.',
-                        'options': json.dumps(['drink', 'drinking', 'drinks', 'drank']),
+                        'options': ['drink', 'drinking', 'drinks', 'drank'],
                         'answer': 'drink',
                         'explanation': '使用動詞原形'
                     },
@@ -176,7 +198,7 @@ def init_database():
                         'difficulty': 'hard',
                         'question_type': 'multiple_choice',
                         'question_text': 'The doctor ___ the patient carefully.',
-                        'options': json.dumps(['examines', 'examine', 'examining', 'examined']),
+                        'options': ['examines', 'examine', 'examining', 'examined'],
                         'answer': 'examines',
                         'explanation': '第三人稱單數現在簡單式'
                     },
@@ -187,8 +209,8 @@ def init_database():
                         'difficulty': 'medium',
                         'question_type': 'multi_blank',
                         'question_text': 'I usually ___ up at 7 AM, then I ___ breakfast and ___ to work.',
-                        'options': json.dumps(['go', 'eat', 'wake', 'drink', 'run']),
-                        'answer': json.dumps(['wake', 'eat', 'go']),
+                        'options': ['go', 'eat', 'wake', 'drink', 'run'],
+                        'answer': ['wake', 'eat', 'go'],
                         'explanation': '按照時間順序填入動詞'
                     },
                     {
@@ -196,8 +218,8 @@ def init_database():
                         'difficulty': 'medium',
                         'question_type': 'multi_blank',
                         'question_text': 'First, I ___ my ticket, then I ___ the platform and ___ the train.',
-                        'options': json.dumps(['buy', 'board', 'find', 'check', 'wait']),
-                        'answer': json.dumps(['buy', 'find', 'board']),
+                        'options': ['buy', 'board', 'find', 'check', 'wait'],
+                        'answer': ['buy', 'find', 'board'],
                         'explanation': '按照旅行流程填入動詞'
                     },
                     {
@@ -205,8 +227,8 @@ def init_database():
                         'difficulty': 'hard',
                         'question_type': 'multi_blank',
                         'question_text': 'We ___ the proposal, ___ the budget, and ___ the project.',
-                        'options': json.dumps(['approve', 'review', 'start', 'finish', 'discuss']),
-                        'answer': json.dumps(['review', 'approve', 'start']),
+                        'options': ['approve', 'review', 'start', 'finish', 'discuss'],
+                        'answer': ['review', 'approve', 'start'],
                         'explanation': '按照商業流程填入動詞'
                     },
                     {
@@ -214,8 +236,8 @@ def init_database():
                         'difficulty': 'medium',
                         'question_type': 'multi_blank',
                         'question_text': 'Students ___ the classroom, ___ their books, and ___ to the teacher.',
-                        'options': json.dumps(['enter', 'open', 'listen', 'write', 'read']),
-                        'answer': json.dumps(['enter', 'open', 'listen']),
+                        'options': ['enter', 'open', 'listen', 'write', 'read'],
+                        'answer': ['enter', 'open', 'listen'],
                         'explanation': '按照上課流程填入動詞'
                     },
                     {
@@ -223,19 +245,22 @@ def init_database():
                         'difficulty': 'hard',
                         'question_type': 'multi_blank',
                         'question_text': 'The nurse ___ the patient, ___ the temperature, and ___ the doctor.',
-                        'options': json.dumps(['calls', 'checks', 'takes', 'gives', 'helps']),
-                        'answer': json.dumps(['checks', 'takes', 'calls']),
+                        'options': ['calls', 'checks', 'takes', 'gives', 'helps'],
+                        'answer': ['checks', 'takes', 'calls'],
                         'explanation': '按照醫療流程填入動詞'
                     }
                 ]
                 
-                for q_data in sample_questions:
-                    question = Question(**q_data)
-                    db.session.add(question)
+                db.session.commit()
                 
-                print(f'✅ {len(sample_questions)} 個範例題目建立成功')
+                # 以批次匯入流程寫入（同樣經過 QuestionSchema 與答案格式驗證）
+                report = import_questions(enumerate(sample_questions, 1))
+                for error in report.errors:
+                    print(f'❌ 範例題目 {error["line"]} 驗證失敗: {error["error"]}')
+                print(f'✅ {report.imported} 個範例題目建立成功')
             else:
                 print('ℹ️  範例題目已存在')
+                repair_double_encoded_questions()
             
             db.session.commit()
             print('🎉 資料庫初始化完成！')
@@ -0,0 +1,7 @@
+-- 大廳房間列表索引
+-- GET /api/rooms 依 status 篩選並以 (created_at, id) 遞減做 keyset 分頁
+
+CREATE INDEX idx_game_rooms_status_created ON game_rooms(status, created_at, id);
+
+-- 玩家數以 game_sessions.room_id 計算（MySQL 的外鍵已自動建立此索引，其他資料庫請執行）
+-- CREATE INDEX ix_game_sessions_room_id ON game_sessions(room_id);
@@ -2,7 +2,8 @@ from flask_sqlalchemy import SQLAlchemy
 
 db = SQLAlchemy()
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from services.password_hasher import password_hasher
+import json
 import uuid
 
 class User(db.Model):
@@ -20,12 +21,16 @@ class User(db.Model):
     game_sessions = db.relationship('GameSession', backref='user', lazy=True)
     
     def set_password(self, password: str) -> None:
-        """設定密碼"""
-        self.password_hash = generate_password_hash(password)
+        """設定密碼（雜湊在執行緒池中計算）"""
+        self.password_hash = password_hasher.hash(password)
     
     def check_password(self, password: str) -> bool:
-        """驗證密碼"""
-        return check_password_hash(self.password_hash, password)
+        """驗證密碼（雜湊在執行緒池中計算）"""
+        return password_hasher.verify(self.password_hash, password)
+    
+    def password_needs_rehash(self) -> bool:
+        """密碼雜湊的方法或參數是否與目前設定不同"""
+        return password_hasher.needs_rehash(self.password_hash)
     
     def to_dict(self) -> dict:
         """轉換為字典"""
@@ -49,14 +54,18 @@ class Category(db.Model):
     # 關聯
     questions = db.relationship('Question', backref='category', lazy=True)
     
-    def to_dict(self) -> dict:
-        """轉換為字典"""
+    def to_dict(self, question_count: int = None) -> dict:
+        """轉換為字典（未提供題數時以 COUNT 查詢，不載入題目）"""
+        if question_count is None:
+            question_count = db.session.query(db.func.count(Question.id)).filter(
+                Question.category_id == self.id
+            ).scalar()
         return {
             'id': self.id,
             'name': self.name,
             'display_name': self.display_name,
             'description': self.description,
-            'question_count': len(self.questions)
+            'question_count': question_count
         }
 
 class Question(db.Model):
@@ -86,10 +95,20 @@ class Question(db.Model):
             'answer': self.answer,
             'explanation': self.explanation
         }
+    
+    def to_public_dict(self) -> dict:
+        """轉換為作答前可傳給玩家的字典（不含答案與解析）"""
+        data = self.to_dict()
+        del data['answer'], data['explanation']
+        return data
 
 class GameRoom(db.Model):
     """遊戲房間模型"""
     __tablename__ = 'game_rooms'
+    __table_args__ = (
+        # 大廳列表依狀態篩選並以 (created_at, id) 做 keyset 分頁
+        db.Index('idx_game_rooms_status_created', 'status', 'created_at', 'id'),
+    )
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     name = db.Column(db.String(100), nullable=False)
@@ -107,8 +126,8 @@ class GameRoom(db.Model):
     players = db.relationship('GameSession', backref='room', lazy=True)
     questions = db.relationship('RoomQuestion', backref='room', lazy=True)
     
-    def to_dict(self) -> dict:
-        """轉換為字典"""
+    def to_dict(self, player_count: int = None) -> dict:
+        """轉換為字典（已知玩家數時可傳入 player_count，避免載入 players 關聯）"""
         return {
             'id': self.id,
             'name': self.name,
@@ -121,8 +140,41 @@ class GameRoom(db.Model):
             'created_at': self.created_at.isoformat(),
             'started_at': self.started_at.isoformat() if self.started_at else None,
             'ended_at': self.ended_at.isoformat() if self.ended_at else None,
-            'player_count': len(self.players)
+            'player_count': player_count if player_count is not None else len(self.players)
         }
+    
+    @classmethod
+    def lobby_page(cls, status: str = 'waiting', limit: int = 20, after: tuple = None,
+                   categories: list = None, has_free_seats: bool = False) -> list:
+        """大廳房間列表：依 (created_at, id) 遞減做 keyset 分頁，玩家數於同一查詢計算
+        
+        after 為上一頁最後一筆的 (created_at, id)，回傳 [(房間, 玩家數)]。
+        """
+        player_count = db.select(db.func.count(GameSession.id)).where(
+            GameSession.room_id == cls.id
+        ).scalar_subquery()
+        
+        query = db.session.query(cls, player_count).filter(cls.status == status)
+        if after:
+            created_at, room_id = after
+            query = query.filter(db.or_(
+                cls.created_at < created_at,
+                db.and_(cls.created_at == created_at, cls.id < room_id)
+            ))
+        if categories:
+            query = query.filter(db.or_(*[cls._has_category(c) for c in categories]))
+        if has_free_seats:
+            query = query.filter(player_count < cls.max_players)
+        
+        return query.order_by(cls.created_at.desc(), cls.id.desc()).limit(limit).all()
+    
+    @classmethod
+    def _has_category(cls, category: str):
+        """categories JSON 欄位包含指定分類的條件"""
+        if db.session.get_bind().dialect.name == 'mysql':
+            return db.func.json_contains(cls.categories, json.dumps(category)) == 1
+        # 其他資料庫以 JSON 文字比對（與寫入時相同的 json.dumps 編碼）
+        return db.cast(cls.categories, db.Text).contains(json.dumps(category), autoescape=True)
 
 class GameSession(db.Model):
     """遊戲會話模型"""
@@ -130,7 +182,7 @@ class GameSession(db.Model):
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
-    room_id = db.Column(db.String(36), db.ForeignKey('game_rooms.id'), nullable=False)
+    room_id = db.Column(db.String(36), db.ForeignKey('game_rooms.id'), nullable=False, index=True)
     score = db.Column(db.Integer, default=0)
     correct_answers = db.Column(db.Integer, default=0)
     total_answers = db.Column(db.Integer, default=0)
@@ -153,6 +205,34 @@ class GameSession(db.Model):
             'joined_at': self.joined_at.isoformat(),
             'left_at': self.left_at.isoformat() if self.left_at else None
         }
+    
+    @classmethod
+    def room_players(cls, room_id: str) -> list:
+        """以單一查詢取得房間玩家資訊（含使用者名稱與累計答題時間）"""
+        rows = db.session.execute(cls.room_players_query(room_id)).all()
+        return cls.players_from_rows(rows)
+    
+    @classmethod
+    def room_players_query(cls, room_id: str):
+        """房間玩家查詢（同步與非同步 session 共用）"""
+        total_time = db.select(
+            db.func.coalesce(db.func.sum(PlayerAnswer.time_taken), 0.0)
+        ).where(PlayerAnswer.session_id == cls.id).scalar_subquery()
+        
+        return db.select(cls, User.username, total_time).join(
+            User, User.id == cls.user_id
+        ).where(cls.room_id == room_id).order_by(cls.joined_at)
+    
+    @staticmethod
+    def players_from_rows(rows) -> list:
+        players = []
+        for session, username, time_taken in rows:
+            player_info = session.to_dict()
+            player_info['username'] = username
+            player_info['time_taken'] = round(float(time_taken or 0), 2)
+            players.append(player_info)
+        
+        return players
 
 class RoomQuestion(db.Model):
     """房間題目關聯模型"""
@@ -325,7 +325,7 @@ class AdminPanel {
      */
     async loadQuestions() {
         try {
-            const data = await this.apiRequest('/questions?limit=100');
+            const data = await this.apiRequest('/questions?limit=100&fields=id,question,category,difficulty,type');
             this.displayQuestions(data.questions);
         } catch (error) {
             console.error('載入題目失敗:', error);
@@ -339,7 +339,7 @@ class AdminPanel {
         const questionsHtml = questions.map(question => `
             <tr>
                 <td>${question.id}</td>
-                <td>${question.question_text.substring(0, 50)}...</td>
+                <td>${question.question.substring(0, 50)}...</td>
                 <td>${question.category}</td>
                 <td>
                     <span class="badge bg-${this.getDifficultyColor(question.difficulty)}">
@@ -348,7 +348,7 @@ class AdminPanel {
                 </td>
                 <td>
                     <span class="badge bg-info">
-                        ${this.getTypeText(question.question_type)}
+                        ${this.getTypeText(question.type)}
                     </span>
                 </td>
                 <td>
@@ -566,7 +566,7 @@ class AdminPanel {
                 <td>${room.id}</td>
                 <td>${room.name}</td>
                 <td>${room.created_by_username || '未知'}</td>
-                <td>${room.current_players}/${room.max_players}</td>
+                <td>${room.player_count}/${room.max_players}</td>
                 <td>
                     <span class="badge bg-${this.getRoomStatusColor(room.status)}">
                         ${this.getRoomStatusText(room.status)}
@@ -10,6 +10,7 @@ class EnglishGame {
         this.token = localStorage.getItem('token');
         this.currentUser = null;
         this.currentRoom = null;
+        this.roomSnapshot = null;
         this.currentQuestion = null;
         this.gameTimer = null;
         this.timeLeft = 30;
@@ -85,12 +86,18 @@ class EnglishGame {
     /**
      * 連接 WebSocket
      */
-    connectSocket() {
+    async connectSocket() {
+        const { client, wire } = await this.loadSocketClient();
+        
         if (this.socket) {
             this.socket.disconnect();
         }
         
-        this.socket = io('http://localhost:5000');
+        // 連線時帶入 token，伺服器只在連線時驗證一次身分
+        this.socket = client('http://localhost:5000', {
+            auth: this.token ? { token: this.token } : {},
+            query: wire === 'msgpack' ? { wire } : {}
+        });
         
         this.socket.on('connect', () => {
             console.log('WebSocket 已連線');
@@ -118,6 +125,11 @@ class EnglishGame {
             this.handleQuestionUpdated(data);
         });
         
+        // 房間快照差異：版本不連續時重新同步
+        this.socket.on('room_delta', (delta) => {
+            this.handleRoomDelta(delta);
+        });
+        
         this.socket.on('answer_submitted', (data) => {
             this.handleAnswerSubmitted(data);
         });
@@ -130,6 +142,20 @@ class EnglishGame {
             this.handleGameEnded(data);
         });
         
+        // 伺服器端計時器推進回合
+        this.socket.on('next_round', (data) => {
+            this.handleNextRound(data);
+        });
+        
+        this.socket.on('game_finished', (data) => {
+            this.handleGameEnded(data);
+        });
+        
+        // 伺服器在短時間窗內合併的房間事件：依序交給各事件原本的處理器
+        this.socket.on('room_events', (batch) => {
+            this.handleRoomEvents(batch);
+        });
+        
         this.socket.on('chat_message', (data) => {
             this.handleChatMessage(data);
         });
@@ -139,6 +165,53 @@ class EnglishGame {
         });
     }
 
+    /**
+     * 處理合併的房間事件
+     * 帶有 skip_sid 的事件原本不送給發送者，略過自己送出的事件
+     */
+    handleRoomEvents(batch) {
+        batch.events.forEach(({ event, data, skip_sid }) => {
+            if (skip_sid && skip_sid === this.socket.id) {
+                return;
+            }
+            this.socket.listeners(event).forEach(listener => listener(data));
+        });
+    }
+
+    /**
+     * 協商 WebSocket 傳輸格式
+     * 伺服器支援 MessagePack 時載入 msgpack 版的 Socket.IO 客戶端，失敗時使用 JSON
+     */
+    loadSocketClient() {
+        if (!this.socketClient) {
+            const json = { client: io, wire: 'json' };
+            this.socketClient = fetch(`${this.apiBase}/game/wire-formats`)
+                .then(response => response.ok ? response.json() : { formats: [] })
+                .then(data => data.formats.includes('msgpack') ? this.loadMsgpackClient() : null)
+                .then(client => client ? { client, wire: 'msgpack' } : json)
+                .catch(() => json);
+        }
+        return this.socketClient;
+    }
+
+    /**
+     * 載入 msgpack 版的 Socket.IO 客戶端（保留頁面上原本的 JSON 版 io）
+     */
+    loadMsgpackClient() {
+        return new Promise((resolve, reject) => {
+            const jsonClient = window.io;
+            const script = document.createElement('script');
+            script.src = 'https://cdn.socket.io/4.7.2/socket.io.msgpack.min.js';
+            script.onload = () => {
+                const msgpackClient = window.io;
+                window.io = jsonClient;
+                resolve(msgpackClient);
+            };
+            script.onerror = () => reject(new Error('無法載入 MessagePack 客戶端'));
+            document.head.appendChild(script);
+        });
+    }
+
     /**
      * API 請求函式
      */
@@ -272,6 +345,7 @@ class EnglishGame {
             this.token = data.access_token;
             this.currentUser = data.user;
             localStorage.setItem('token', this.token);
+            this.connectSocket();
             
             this.showNotification('登入成功！', 'success');
             $('#loginModal').modal('hide');
@@ -348,6 +422,7 @@ class EnglishGame {
         this.token = null;
         this.currentUser = null;
         this.currentRoom = null;
+        this.roomSnapshot = null;
         localStorage.removeItem('token');
         
         if (this.socket) {
@@ -384,6 +459,7 @@ class EnglishGame {
             });
             
             this.currentRoom = data.room;
+            this.roomSnapshot = null;
             this.showNotification('房間建立成功！', 'success');
             $('#createRoomModal').modal('hide');
             this.joinRoom(this.currentRoom.id);
@@ -417,7 +493,7 @@ class EnglishGame {
                     <div>
                         <h5 class="mb-1">${room.name}</h5>
                         <p class="mb-1 text-muted">
-                            <i class="fas fa-users"></i> ${room.current_players}/${room.max_players} 玩家
+                            <i class="fas fa-users"></i> ${room.player_count}/${room.max_players} 玩家
                             <span class="mx-2">|</span>
                             <i class="fas fa-gamepad"></i> ${room.current_round}/${room.total_rounds} 回合
                         </p>
@@ -452,6 +528,7 @@ class EnglishGame {
             });
             
             this.currentRoom = data.room;
+            this.roomSnapshot = null;
             this.showNotification('成功加入房間！', 'success');
             this.showRoomInterface();
             
@@ -485,25 +562,74 @@ class EnglishGame {
         if (this.currentRoom) {
             $('#roomName').text(this.currentRoom.name);
             $('#roomStatus').text(this.getStatusText(this.currentRoom.status));
-            $('#roomPlayers').text(`${this.currentRoom.current_players}/${this.currentRoom.max_players}`);
+            $('#roomPlayers').text(`${this.currentRoom.player_count}/${this.currentRoom.max_players}`);
             $('#roomRounds').text(`${this.currentRoom.current_round}/${this.currentRoom.total_rounds}`);
         }
     }
 
     /**
-     * 載入房間玩家
+     * 載入房間玩家（房間快照）
+     * 已有快照版本時只取得之後的差異，伺服器不再保留時回傳完整快照
      */
     async loadRoomPlayers() {
         if (!this.currentRoom) return;
         
+        const since = this.roomSnapshot ? `?since=${this.roomSnapshot.version}` : '';
         try {
-            const data = await this.apiRequest(`/rooms/${this.currentRoom.id}/players`);
-            this.displayPlayers(data.players);
+            const data = await this.apiRequest(`/rooms/${this.currentRoom.id}/snapshot${since}`);
+            if (data.snapshot) {
+                this.roomSnapshot = { version: data.version, data: data.snapshot };
+            } else {
+                data.deltas.forEach(delta => this.applyRoomDelta(delta));
+            }
+            this.renderRoomSnapshot();
         } catch (error) {
             console.error('載入玩家失敗:', error);
         }
     }
 
+    /**
+     * 套用房間快照差異（base_version 為 null 時 changes 為完整快照）
+     */
+    applyRoomDelta(delta) {
+        if (delta.base_version === null) {
+            this.roomSnapshot = { version: delta.version, data: delta.changes };
+            return true;
+        }
+        if (!this.roomSnapshot || this.roomSnapshot.version !== delta.base_version) {
+            return false;
+        }
+        
+        const { players, ...fields } = delta.changes;
+        const data = { ...this.roomSnapshot.data, ...fields, players: { ...this.roomSnapshot.data.players } };
+        Object.entries(players || {}).forEach(([userId, values]) => {
+            if (values === null) {
+                delete data.players[userId];
+            } else {
+                data.players[userId] = { ...data.players[userId], ...values };
+            }
+        });
+        this.roomSnapshot = { version: delta.version, data };
+        return true;
+    }
+
+    /**
+     * 依快照更新房間資訊與玩家列表
+     */
+    renderRoomSnapshot() {
+        if (!this.roomSnapshot || !this.currentRoom) return;
+        
+        const { players, ...fields } = this.roomSnapshot.data;
+        const active = Object.entries(players)
+            .filter(([, player]) => !player.left)
+            .map(([userId, player]) => ({ user_id: userId, ...player }))
+            .sort((a, b) => b.score - a.score);
+        
+        Object.assign(this.currentRoom, fields, { player_count: active.length });
+        this.updateRoomInfo();
+        this.displayPlayers(active);
+    }
+
     /**
      * 顯示玩家列表
      */
@@ -575,6 +701,7 @@ class EnglishGame {
             });
             
             this.currentRoom = null;
+            this.roomSnapshot = null;
             this.showNotification('已離開房間', 'info');
             this.showRoomsSection();
             
@@ -601,7 +728,7 @@ class EnglishGame {
         try {
             const data = await this.apiRequest(`/game/${this.currentRoom.id}/current-question`);
             this.displayQuestion(data.question);
-            this.startTimer();
+            this.startTimer(data.question.time_limit);
         } catch (error) {
             console.error('載入題目失敗:', error);
         }
@@ -651,7 +778,7 @@ class EnglishGame {
     async submitAnswer(answer) {
         if (!this.currentRoom || !this.currentQuestion) return;
         
-        const timeTaken = 30 - this.timeLeft;
+        const timeTaken = (this.currentQuestion.time_limit || 30) - this.timeLeft;
         
         try {
             const data = await this.apiRequest(`/game/${this.currentRoom.id}/submit-answer`, {
@@ -733,8 +860,10 @@ class EnglishGame {
     /**
      * 開始計時器
      */
-    startTimer() {
-        this.timeLeft = 30;
+    startTimer(timeLimit = 30) {
+        // 回合由伺服器計時並自動推進，這裡只負責顯示倒數
+        this.stopTimer();
+        this.timeLeft = timeLimit;
         this.updateTimer();
         
         this.gameTimer = setInterval(() => {
@@ -812,12 +941,20 @@ class EnglishGame {
     // WebSocket 事件處理器
     handlePlayerJoined(data) {
         this.showNotification(`${data.username} 加入了房間`, 'info');
-        this.loadRoomPlayers();
     }
 
     handlePlayerLeft(data) {
         this.showNotification(`${data.username} 離開了房間`, 'info');
-        this.loadRoomPlayers();
+    }
+
+    handleRoomDelta(delta) {
+        if (!this.currentRoom || delta.room_id !== this.currentRoom.id) return;
+        
+        if (this.applyRoomDelta(delta)) {
+            this.renderRoomSnapshot();
+        } else {
+            this.loadRoomPlayers();
+        }
     }
 
     handleGameStarted(data) {
@@ -834,6 +971,15 @@ class EnglishGame {
         this.showNotification(`${data.username} 已回答題目`, 'info');
     }
 
+    handleNextRound(data) {
+        if (this.currentRoom) {
+            this.currentRoom.current_round = data.current_round;
+        }
+        this.stopTimer();
+        this.updateRoomInfo();
+        this.loadCurrentQuestion();
+    }
+
     handleRoundEnded(data) {
         this.showNotification('回合結束！', 'info');
         this.stopTimer();
@@ -844,7 +990,6 @@ class EnglishGame {
         this.showNotification('遊戲結束！', 'info');
         this.stopTimer();
         this.updateRoomInfo();
-        this.loadRoomPlayers();
         this.showGameResults(data.rankings);
     }
 
@@ -908,6 +1053,7 @@ class EnglishGame {
      */
     returnToLobby() {
         this.currentRoom = null;
+        this.roomSnapshot = null;
         this.showRoomsSection();
     }
 
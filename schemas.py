@@ -0,0 +1,24 @@
+from marshmallow import Schema, fields
+from typing import Optional
+
+class QuestionSchema(Schema):
+    """題目驗證 Schema（建立題目與批次匯入共用）"""
+    category_id = fields.Str(required=True)
+    difficulty = fields.Str(required=True, validate=lambda x: x in ['easy', 'medium', 'hard'])
+    question_type = fields.Str(required=True, validate=lambda x: x in ['multiple_choice', 'multi_blank'])
+    question_text = fields.Str(required=True)
+    options = fields.List(fields.Str(), required=True)
+    answer = fields.Raw(required=True)  # 可以是字串或列表
+    explanation = fields.Str(required=False)
+
+def answer_error(data: dict) -> Optional[str]:
+    """驗證答案格式，錯誤時回傳錯誤訊息"""
+    if data['question_type'] == 'multiple_choice':
+        if not isinstance(data['answer'], str) or data['answer'] not in data['options']:
+            return '單選題答案必須是選項之一'
+    elif data['question_type'] == 'multi_blank':
+        if not isinstance(data['answer'], list):
+            return '多選題答案必須是列表'
+        if not all(ans in data['options'] for ans in data['answer']):
+            return '多選題答案必須都是選項之一'
+    return None
@@ -0,0 +1 @@
+# 服務套件
@@ -0,0 +1,29 @@
+"""
+管理員權限
+
+管理員由設定 ADMIN_USERNAMES（以逗號分隔的使用者名稱）指定，
+以使用者名稱快取比對，不必每次請求查詢資料庫。
+"""
+from functools import wraps
+
+from flask import current_app, jsonify
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+from services.user_cache import user_cache
+
+
+def is_admin(user_id: str) -> bool:
+    """使用者是否為管理員"""
+    username = user_cache.get_username(user_id) if user_id else None
+    return username is not None and username in current_app.config.get('ADMIN_USERNAMES', ())
+
+
+def admin_required(fn):
+    """需要管理員身分的端點（未登入回傳 401，非管理員回傳 403）"""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        verify_jwt_in_request()
+        if not is_admin(get_jwt_identity()):
+            return jsonify({'error': '需要管理員權限'}), 403
+        return fn(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,127 @@
+"""
+asyncio 模式的同步程式橋接
+
+asyncio 模式（asgi.py）由 python-socketio 的 AsyncServer 處理 WebSocket，
+原生非同步處理器以外的 HTTP 請求仍交給 Flask 藍圖處理：
+
+- WsgiBridge：把 ASGI 的 HTTP 請求轉成 WSGI environ，在執行緒池中執行 Flask
+  應用程式，阻塞的查詢只佔用一條執行緒，不會卡住事件迴圈
+- ThreadsafeServer：取代 Flask-SocketIO 的 server，藍圖與背景任務呼叫
+  socketio.emit() 時把廣播排入事件迴圈；start_background_task() 改用執行緒
+"""
+import asyncio
+import io
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+
+
+class ThreadsafeServer:
+    """提供 Flask-SocketIO 使用的同步介面，實際由 AsyncServer 廣播"""
+
+    def __init__(self, server):
+        self.server = server
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def manager(self):
+        return self.server.manager
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+
+    def emit(self, event: str, *args, **kwargs) -> None:
+        if self.loop is None:
+            raise RuntimeError('事件迴圈尚未啟動')
+        coroutine = self.server.emit(event, *args, **kwargs)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            self.loop.create_task(coroutine)
+        else:
+            asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def start_background_task(self, target: Callable, *args, **kwargs) -> threading.Thread:
+        thread = threading.Thread(target=target, args=args, kwargs=kwargs, daemon=True)
+        thread.start()
+        return thread
+
+    def sleep(self, seconds: float = 0) -> None:
+        time.sleep(seconds)
+
+
+def wsgi_environ(scope: dict, body: bytes) -> dict:
+    """ASGI HTTP scope → WSGI environ"""
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf8').decode('latin1'),
+        'PATH_INFO': scope['path'].encode('utf8').decode('latin1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1] or 80),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': (scope.get('client') or ('', 0))[0],
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin1').upper().replace('-', '_')
+        value = value.decode('latin1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name != 'CONTENT_LENGTH':
+            key = f'HTTP_{name}'
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+class WsgiBridge:
+    """在執行緒池中執行 WSGI 應用程式的 ASGI 應用程式"""
+
+    def __init__(self, wsgi_app, threads: int = 32):
+        self.wsgi_app = wsgi_app
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='wsgi')
+
+    async def __call__(self, scope: dict, receive, send) -> None:
+        if scope['type'] != 'http':
+            return
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body'):
+                break
+
+        environ = wsgi_environ(scope, b''.join(chunks))
+        loop = asyncio.get_running_loop()
+        status, headers, body = await loop.run_in_executor(self.executor, self._run, environ)
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+    def _run(self, environ: dict) -> Tuple[int, List[Tuple[bytes, bytes]], bytes]:
+        response: dict = {}
+
+        def start_response(status: str, headers: List[Tuple[str, str]], exc_info: Any = None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [(name.lower().encode('latin1'), value.encode('latin1'))
+                                   for name, value in headers]
+            return lambda data: None
+
+        result = self.wsgi_app(environ, start_response)
+        try:
+            body = b''.join(result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        return response['status'], response['headers'], body
@@ -0,0 +1,68 @@
+"""
+非同步資料庫存取（asyncio 模式）
+
+asyncio 模式（asgi.py）的原生處理器以 SQLAlchemy 的非同步 engine 查詢，
+沿用 models.py 的模型與同一個資料庫：SQLALCHEMY_DATABASE_URI 的同步驅動
+自動換成對應的非同步驅動（sqlite → aiosqlite、mysql+pymysql → aiomysql），
+也可以用 ASYNC_DATABASE_URI 直接指定。連線池參數沿用 SQLALCHEMY_ENGINE_OPTIONS。
+"""
+from typing import Optional
+
+from flask import Flask
+from sqlalchemy.engine import make_url
+
+try:
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+except ImportError:  # SQLAlchemy 未安裝 asyncio 擴充（greenlet）時無法使用 asyncio 模式
+    create_async_engine = None
+
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'mysql': 'mysql+aiomysql',
+    'mysql+pymysql': 'mysql+aiomysql',
+    'postgresql': 'postgresql+asyncpg',
+    'postgresql+psycopg2': 'postgresql+asyncpg'
+}
+
+
+def async_database_url(url: str) -> str:
+    """同步資料庫網址 → 非同步驅動的網址"""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.drivername)
+    if driver is None:
+        if parsed.get_dialect().is_async:
+            return url
+        raise ValueError(f'不支援的資料庫驅動: {parsed.drivername}')
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+class AsyncDatabase:
+    """非同步 engine 與 session 工廠（每個 worker 一份）"""
+
+    def __init__(self):
+        self.engine: Optional['AsyncEngine'] = None
+        self._sessions = None
+
+    def init_app(self, app: Flask) -> None:
+        """依應用程式設定建立非同步 engine"""
+        if create_async_engine is None:
+            raise RuntimeError('asyncio 模式需要 SQLAlchemy 的 asyncio 擴充（greenlet）')
+        url = app.config.get('ASYNC_DATABASE_URI') or async_database_url(app.config['SQLALCHEMY_DATABASE_URI'])
+        options = {key: value for key, value in app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}).items()
+                   if key != 'poolclass'}
+        self.engine = create_async_engine(url, **options)
+        self._sessions = async_sessionmaker(self.engine, expire_on_commit=False)
+        app.extensions['async_db'] = self
+
+    def session(self) -> 'AsyncSession':
+        """建立新的 AsyncSession（以 async with 使用）"""
+        if self._sessions is None:
+            raise RuntimeError('非同步資料庫尚未初始化')
+        return self._sessions()
+
+    async def dispose(self) -> None:
+        if self.engine is not None:
+            await self.engine.dispose()
+
+
+async_db = AsyncDatabase()
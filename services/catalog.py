@@ -0,0 +1,113 @@
+"""
+題目分類目錄快取
+
+分類清單與各分類題數以單一 GROUP BY 查詢取得後快取，
+列出分類時不必載入每個分類的所有題目。題目或分類變更的交易提交後，
+快取失效並遞增目錄版本（HTTP 回應快取以此版本為鍵）；
+其他 worker 的變更在 TTL 到期後同步。
+"""
+import itertools
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from flask import Flask
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from models import db, Category, Question
+
+
+class CategoryCatalog:
+    """分類目錄（含題數）快取"""
+
+    def __init__(self):
+        self._items: Optional[List[dict]] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self.ttl = 60
+        self.version = 0
+
+    def init_app(self, app: Flask) -> None:
+        """綁定應用程式並清空快取"""
+        self.ttl = app.config.get('CATEGORY_CATALOG_TTL', 60)
+        self.invalidate()
+        app.extensions['category_catalog'] = self
+
+    def all(self) -> List[dict]:
+        """取得所有分類（依建立時間排序），快取過期時重新查詢"""
+        with self._lock:
+            items = self._items
+            if items is not None and time.monotonic() - self._loaded_at <= self.ttl:
+                return items
+
+        version = self.version
+        items = self._load()
+        with self._lock:
+            # 查詢期間目錄已變更時不寫入快取
+            if self.version == version:
+                self._items = items
+                self._loaded_at = time.monotonic()
+        return items
+
+    def lookup(self) -> Dict[str, str]:
+        """分類 ID、名稱與顯示名稱 → 分類 ID 的對照表"""
+        lookup: Dict[str, str] = {}
+        for category in self.all():
+            for key in (category['id'], category['name'], category['display_name']):
+                lookup.setdefault(key, category['id'])
+        return lookup
+
+    def resolve_ids(self, values: Iterable[str]) -> List[str]:
+        """將分類 ID、名稱或顯示名稱轉換為分類 ID（以快取的目錄對照，不另外查詢）"""
+        wanted = [v for v in values if v]
+        if not wanted:
+            return []
+
+        lookup = self.lookup()
+        ids = []
+        for value in wanted:
+            category_id = lookup.get(value)
+            if category_id and category_id not in ids:
+                ids.append(category_id)
+        return ids
+
+    def invalidate(self) -> None:
+        """使快取失效並遞增目錄版本"""
+        with self._lock:
+            self._items = None
+            self.version += 1
+
+    def _load(self) -> List[dict]:
+        counts = db.session.query(
+            Question.category_id, func.count(Question.id).label('question_count')
+        ).group_by(Question.category_id).subquery()
+
+        rows = db.session.query(Category, func.coalesce(counts.c.question_count, 0)).outerjoin(
+            counts, counts.c.category_id == Category.id
+        ).order_by(Category.created_at, Category.id).all()
+
+        return [category.to_dict(question_count=count) for category, count in rows]
+
+
+category_catalog = CategoryCatalog()
+
+
+@event.listens_for(Session, 'before_flush')
+def _mark_catalog_changes(session: Session, flush_context, instances) -> None:
+    """記錄此交易是否變更了題目或分類"""
+    changed = itertools.chain(session.new, session.dirty, session.deleted)
+    if any(isinstance(obj, (Category, Question)) for obj in changed):
+        session.info['catalog_changed'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session: Session) -> None:
+    """交易提交後才使目錄失效，避免其他請求在提交前重新快取舊資料"""
+    if session.info.pop('catalog_changed', False):
+        category_catalog.invalidate()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_catalog_changes(session: Session) -> None:
+    session.info.pop('catalog_changed', None)
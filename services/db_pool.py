@@ -0,0 +1,165 @@
+"""
+資料庫連線池監控
+
+連線池參數（pool_size、max_overflow、pool_recycle、pool_pre_ping、pool_timeout）
+由 SQLALCHEMY_ENGINE_OPTIONS 設定並可由環境變數覆寫。使用 QueuePool 的資料庫
+會改用 TimedQueuePool 記錄取得連線的等待時間，搭配連線池事件統計使用中
+連線數、溢出連線與逾時，作為依 gevent worker_connections 調整連線池的依據。
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from flask import Flask
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+
+class PoolStats:
+    """連線池統計（每個 worker 一份）"""
+
+    def __init__(self, window: int = 1024):
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=window)
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._waits.clear()
+            self.connects = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.in_use = 0
+            self.max_in_use = 0
+            self.overflow_checkouts = 0
+            self.timeouts = 0
+            self.invalidations = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self._waits.append(seconds)
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+
+    def checked_out(self, overflow: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+            if overflow:
+                self.overflow_checkouts += 1
+
+    def checked_in(self) -> None:
+        with self._lock:
+            self.checkins += 1
+            self.in_use = max(self.in_use - 1, 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits)
+            timed = len(waits)
+            return {
+                'connects': self.connects,
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'in_use': self.in_use,
+                'max_in_use': self.max_in_use,
+                'overflow_checkouts': self.overflow_checkouts,
+                'timeouts': self.timeouts,
+                'invalidations': self.invalidations,
+                'wait_avg_ms': round(sum(waits) / timed * 1000, 3) if timed else 0,
+                'wait_p95_ms': round(waits[min(int(timed * 0.95), timed - 1)] * 1000, 3) if timed else 0,
+                'wait_max_ms': round(self.max_wait * 1000, 3)
+            }
+
+
+class TimedQueuePool(QueuePool):
+    """記錄取得連線等待時間的 QueuePool"""
+    stats: Optional[PoolStats] = None
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            if self.stats:
+                self.stats.timeouts += 1
+            raise
+        finally:
+            if self.stats:
+                self.stats.record_wait(time.perf_counter() - start)
+
+    def recreate(self) -> 'TimedQueuePool':
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+def configure_engine_options(app: Flask) -> None:
+    """使用連線池參數的資料庫改用 TimedQueuePool（需在 db.init_app 之前呼叫）"""
+    options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    if 'pool_size' in options:
+        options.setdefault('poolclass', TimedQueuePool)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+
+def instrument(engine: Engine, stats: PoolStats) -> None:
+    """在 engine 的連線池掛上統計事件"""
+    if isinstance(engine.pool, TimedQueuePool):
+        engine.pool.stats = stats
+
+    def on_connect(dbapi_connection, connection_record):
+        stats.connects += 1
+
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        pool = engine.pool
+        overflow = isinstance(pool, QueuePool) and pool.checkedout() > pool.size()
+        stats.checked_out(overflow)
+
+    def on_checkin(dbapi_connection, connection_record):
+        stats.checked_in()
+
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        stats.invalidations += 1
+
+    event.listen(engine, 'connect', on_connect)
+    event.listen(engine, 'checkout', on_checkout)
+    event.listen(engine, 'checkin', on_checkin)
+    event.listen(engine, 'invalidate', on_invalidate)
+
+
+class PoolMonitor:
+    """應用程式資料庫連線池的統計"""
+
+    def __init__(self):
+        self.stats = PoolStats()
+        self._engine: Optional[Engine] = None
+
+    def init_app(self, app: Flask, db) -> None:
+        """掛上連線池事件（需在 db.init_app 之後呼叫）"""
+        self.stats.reset()
+        with app.app_context():
+            self._engine = db.engine
+        instrument(self._engine, self.stats)
+        app.extensions['db_pool'] = self
+
+    def snapshot(self) -> Dict[str, Any]:
+        """連線池設定與統計"""
+        pool = self._engine.pool if self._engine else None
+        data = {'pool_class': type(pool).__name__ if pool else None}
+        if isinstance(pool, QueuePool):
+            data.update({
+                'size': pool.size(),
+                'checked_out': pool.checkedout(),
+                'overflow': pool.overflow(),
+                'timeout': pool.timeout()
+            })
+        data.update(self.stats.snapshot())
+        return data
+
+
+db_pool = PoolMonitor()
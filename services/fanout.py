@@ -0,0 +1,317 @@
+"""
+跨 worker 的 Socket.IO 廣播
+
+Gunicorn 多個 worker 各自持有一部分連線，socketio.emit(..., room=room_id)
+必須經由訊息佇列才能送達其他 worker 上的連線。FanoutManager 為
+python-socketio 的 PubSubManager 子類別，後端可抽換：
+
+- local://                  同一行程內的佇列（單一行程部署與測試）
+- redis://host:port         Redis 協定（RESP）的伺服器，例如 Redis 或 services.fanout_broker
+- unix:///path/to/socket    以 Unix socket 連線的 RESP 伺服器
+
+每個 worker 的廣播訊息會在 FANOUT_BATCH_INTERVAL 內合併為一筆批次發布，
+接收端依批次的發送時間記錄遞送延遲。RESP 後端使用阻塞式 socket，
+在 gevent worker 中需先 monkey patch（Gunicorn 的 gevent worker 會自動處理）。
+"""
+import os
+import queue
+import socket
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+
+import socketio
+
+
+class RespError(Exception):
+    """RESP 伺服器回傳的錯誤"""
+
+
+def encode_command(*parts: bytes) -> bytes:
+    """將指令編碼為 RESP 陣列"""
+    chunks = [b'*%d\r\n' % len(parts)]
+    for part in parts:
+        chunks.append(b'$%d\r\n%s\r\n' % (len(part), part))
+    return b''.join(chunks)
+
+
+def read_reply(reader) -> Any:
+    """從檔案物件讀取一個 RESP 回應"""
+    line = reader.readline()
+    if not line:
+        raise ConnectionError('連線已關閉')
+    kind, body = line[:1], line[1:-2]
+    if kind == b'+':
+        return body.decode()
+    if kind == b'-':
+        raise RespError(body.decode())
+    if kind == b':':
+        return int(body)
+    if kind == b'$':
+        length = int(body)
+        if length < 0:
+            return None
+        data = reader.read(length + 2)
+        if len(data) < length + 2:
+            raise ConnectionError('連線已關閉')
+        return data[:-2]
+    if kind == b'*':
+        length = int(body)
+        if length < 0:
+            return None
+        return [read_reply(reader) for _ in range(length)]
+    raise RespError(f'無法解析的回應: {line!r}')
+
+
+class FanoutBackend:
+    """發布 / 訂閱後端介面"""
+
+    def bind_server(self, server: socketio.Server) -> None:
+        """取得 Socket.IO 伺服器（依非同步模式建立佇列等）"""
+
+    def publish(self, channel: str, payload: bytes) -> None:
+        raise NotImplementedError
+
+    def listen(self, channel: str) -> Iterator[bytes]:
+        """阻塞直到有訊息，逐筆回傳頻道上的訊息"""
+        raise NotImplementedError
+
+
+# 同一行程內的 LocalBackend 共用頻道
+_local_channels: Dict[str, List[Any]] = {}
+_local_lock = threading.Lock()
+
+
+class LocalBackend(FanoutBackend):
+    """同一行程內的發布 / 訂閱"""
+
+    def __init__(self):
+        self.queue_factory: Callable[[], Any] = queue.Queue
+
+    def bind_server(self, server: socketio.Server) -> None:
+        self.queue_factory = server.eio.create_queue
+
+    def publish(self, channel: str, payload: bytes) -> None:
+        with _local_lock:
+            subscribers = list(_local_channels.get(channel, ()))
+        for subscriber in subscribers:
+            subscriber.put(payload)
+
+    def listen(self, channel: str) -> Iterator[bytes]:
+        subscriber = self.queue_factory()
+        with _local_lock:
+            _local_channels.setdefault(channel, []).append(subscriber)
+        try:
+            while True:
+                yield subscriber.get()
+        finally:
+            with _local_lock:
+                _local_channels[channel].remove(subscriber)
+
+
+class RespBackend(FanoutBackend):
+    """Redis 協定（PUBLISH / SUBSCRIBE）後端，支援 TCP 與 Unix socket"""
+
+    def __init__(self, url: str, reconnect_delay: float = 1.0):
+        parsed = urlparse(url)
+        if parsed.scheme == 'unix':
+            self.address = (socket.AF_UNIX, parsed.path)
+        else:
+            self.address = (socket.AF_INET, (parsed.hostname or '127.0.0.1', parsed.port or 6379))
+        self.reconnect_delay = reconnect_delay
+        self._publisher = None
+        self._publish_lock = threading.Lock()
+
+    def _connect(self):
+        family, address = self.address
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            sock.connect(address)
+        except OSError:
+            sock.close()
+            raise
+        return sock, sock.makefile('rb')
+
+    def publish(self, channel: str, payload: bytes) -> None:
+        command = encode_command(b'PUBLISH', channel.encode(), payload)
+        with self._publish_lock:
+            # 連線中斷時重新連線並重送一次
+            for attempt in range(2):
+                try:
+                    if self._publisher is None:
+                        self._publisher = self._connect()
+                    sock, reader = self._publisher
+                    sock.sendall(command)
+                    read_reply(reader)
+                    return
+                except (OSError, ConnectionError):
+                    self._close_publisher()
+                    if attempt:
+                        raise
+
+    def listen(self, channel: str) -> Iterator[bytes]:
+        while True:
+            sock = None
+            try:
+                sock, reader = self._connect()
+                sock.sendall(encode_command(b'SUBSCRIBE', channel.encode()))
+                while True:
+                    reply = read_reply(reader)
+                    if isinstance(reply, list) and len(reply) == 3 and reply[0] == b'message':
+                        yield reply[2]
+            except (OSError, ConnectionError, RespError):
+                time.sleep(self.reconnect_delay)
+            finally:
+                if sock is not None:
+                    sock.close()
+
+    def _close_publisher(self) -> None:
+        if self._publisher is not None:
+            self._publisher[0].close()
+            self._publisher = None
+
+
+class DeliveryMetrics:
+    """單一 worker 的發布與遞送統計"""
+
+    def __init__(self, window: int = 1024):
+        self._latencies = deque(maxlen=window)
+        self.batches_published = 0
+        self.messages_published = 0
+        self.batches_received = 0
+        self.messages_received = 0
+        self.publish_errors = 0
+
+    def published(self, count: int) -> None:
+        self.batches_published += 1
+        self.messages_published += count
+
+    def received(self, latency: float, count: int) -> None:
+        self._latencies.append(max(latency, 0.0))
+        self.batches_received += 1
+        self.messages_received += count
+
+    def snapshot(self) -> Dict[str, Any]:
+        latencies = sorted(self._latencies)
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0
+            return round(latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000, 2)
+
+        return {
+            'batches_published': self.batches_published,
+            'messages_published': self.messages_published,
+            'avg_batch_size': round(self.messages_published / self.batches_published, 2)
+            if self.batches_published else 0,
+            'batches_received': self.batches_received,
+            'messages_received': self.messages_received,
+            'publish_errors': self.publish_errors,
+            'latency_p50_ms': percentile(0.5),
+            'latency_p95_ms': percentile(0.95),
+            'latency_max_ms': round(latencies[-1] * 1000, 2) if latencies else 0
+        }
+
+
+class FanoutManager(socketio.PubSubManager):
+    """以可抽換後端批次發布廣播的 Socket.IO 用戶端管理器"""
+    name = 'fanout'
+
+    def __init__(self, backend: FanoutBackend, channel: str = 'flask-socketio',
+                 batch_interval: float = 0.005, batch_size: int = 100):
+        super().__init__(channel=channel)
+        self.backend = backend
+        self.batch_interval = batch_interval
+        self.batch_size = batch_size
+        self.metrics = DeliveryMetrics()
+        self._pending: List[dict] = []
+        self._pending_lock = threading.Lock()
+
+    def initialize(self) -> None:
+        self.backend.bind_server(self.server)
+        super().initialize()
+        self.server.start_background_task(self._flush_loop)
+
+    def flush(self) -> int:
+        """發布目前累積的訊息，回傳訊息數"""
+        with self._pending_lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return 0
+
+        payload = self.json.dumps({
+            'method': 'batch',
+            'host_id': self.host_id,
+            'sent_at': time.time(),
+            'messages': batch
+        })
+        try:
+            self.backend.publish(self.channel, payload.encode())
+        except Exception as e:
+            self.metrics.publish_errors += 1
+            self._get_logger().error(f'廣播發布失敗: {e}')
+            return 0
+        self.metrics.published(len(batch))
+        return len(batch)
+
+    def stats(self) -> Dict[str, Any]:
+        """此 worker 的廣播統計"""
+        stats = {
+            'backend': type(self.backend).__name__,
+            'host_id': self.host_id,
+            'pid': os.getpid(),
+            'pending': len(self._pending)
+        }
+        stats.update(self.metrics.snapshot())
+        return stats
+
+    def _publish(self, data: dict) -> None:
+        with self._pending_lock:
+            self._pending.append(data)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def _listen(self) -> Iterator[dict]:
+        for payload in self.backend.listen(self.channel):
+            try:
+                batch = self.json.loads(payload)
+            except ValueError:
+                continue
+            # 自己發布的批次已在本機處理過
+            if batch.get('host_id') == self.host_id:
+                continue
+            messages = batch.get('messages', [])
+            self.metrics.received(time.time() - batch.get('sent_at', time.time()), len(messages))
+            yield from messages
+
+    def _flush_loop(self) -> None:
+        while True:
+            self.server.sleep(self.batch_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                self._get_logger().error(f'廣播批次處理失敗: {e}')
+
+
+def create_client_manager(config) -> Optional[FanoutManager]:
+    """依 SOCKETIO_MESSAGE_QUEUE 設定建立用戶端管理器，未設定時回傳 None（單一行程）"""
+    url = config.get('SOCKETIO_MESSAGE_QUEUE')
+    if not url:
+        return None
+
+    if url.startswith('local://'):
+        backend = LocalBackend()
+    elif url.startswith(('redis://', 'unix://')):
+        backend = RespBackend(url)
+    else:
+        raise ValueError(f'不支援的訊息佇列: {url}')
+
+    return FanoutManager(
+        backend,
+        channel=config.get('SOCKETIO_CHANNEL', 'flask-socketio'),
+        batch_interval=config.get('FANOUT_BATCH_INTERVAL', 0.005),
+        batch_size=config.get('FANOUT_BATCH_SIZE', 100)
+    )
@@ -0,0 +1,155 @@
+"""
+本機訊息中繼站
+
+只實作 Redis 協定的 PING / PUBLISH / SUBSCRIBE / UNSUBSCRIBE，
+供沒有 Redis 的開發與測試環境讓多個 worker 互相轉送 Socket.IO 廣播：
+
+    python -m services.fanout_broker --unix /tmp/eng_game_fanout.sock
+    SOCKETIO_MESSAGE_QUEUE=unix:///tmp/eng_game_fanout.sock python start_production.py
+"""
+import argparse
+import os
+import socketserver
+import threading
+from typing import Dict, Set
+
+from services.fanout import RespError, encode_command, read_reply
+
+
+class _Subscriber:
+    """訂閱中的連線（寫入需加鎖，避免多個發布者交錯）"""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.lock = threading.Lock()
+
+    def send(self, data: bytes) -> bool:
+        try:
+            with self.lock:
+                self.sock.sendall(data)
+            return True
+        except OSError:
+            return False
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        broker = self.server
+        subscriber = _Subscriber(self.request)
+        channels: Set[bytes] = set()
+        try:
+            while True:
+                try:
+                    command = read_reply(self.rfile)
+                except ConnectionError:
+                    break
+                if not isinstance(command, list) or not command:
+                    subscriber.send(b'-ERR protocol error\r\n')
+                    break
+
+                name = command[0].upper()
+                if name == b'PING':
+                    subscriber.send(b'+PONG\r\n')
+                elif name == b'PUBLISH' and len(command) == 3:
+                    delivered = broker.publish(command[1], command[2])
+                    subscriber.send(b':%d\r\n' % delivered)
+                elif name == b'SUBSCRIBE':
+                    for channel in command[1:]:
+                        channels.add(channel)
+                        broker.subscribe(channel, subscriber)
+                        subscriber.send(_push(b'subscribe', channel, len(channels)))
+                elif name == b'UNSUBSCRIBE':
+                    for channel in command[1:] or list(channels):
+                        channels.discard(channel)
+                        broker.unsubscribe(channel, subscriber)
+                        subscriber.send(_push(b'unsubscribe', channel, len(channels)))
+                else:
+                    subscriber.send(b'-ERR unknown command\r\n')
+        except RespError:
+            subscriber.send(b'-ERR protocol error\r\n')
+        finally:
+            for channel in channels:
+                broker.unsubscribe(channel, subscriber)
+
+
+def _push(kind: bytes, channel: bytes, count: int) -> bytes:
+    """訂閱確認：[kind, channel, 訂閱數]"""
+    return b'*3\r\n$%d\r\n%s\r\n$%d\r\n%s\r\n:%d\r\n' % (len(kind), kind, len(channel), channel, count)
+
+
+class _BrokerMixin:
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def init_channels(self) -> None:
+        self.channels: Dict[bytes, Set[_Subscriber]] = {}
+        self.channels_lock = threading.Lock()
+
+    def subscribe(self, channel: bytes, subscriber: _Subscriber) -> None:
+        with self.channels_lock:
+            self.channels.setdefault(channel, set()).add(subscriber)
+
+    def unsubscribe(self, channel: bytes, subscriber: _Subscriber) -> None:
+        with self.channels_lock:
+            self.channels.get(channel, set()).discard(subscriber)
+
+    def publish(self, channel: bytes, payload: bytes) -> int:
+        with self.channels_lock:
+            subscribers = list(self.channels.get(channel, ()))
+        message = encode_command(b'message', channel, payload)
+        return sum(1 for subscriber in subscribers if subscriber.send(message))
+
+
+class TCPBroker(_BrokerMixin, socketserver.ThreadingTCPServer):
+    """TCP 中繼站"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 6390):
+        super().__init__((host, port), _Handler)
+        self.init_channels()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'redis://{host}:{port}'
+
+
+class UnixBroker(_BrokerMixin, socketserver.ThreadingUnixStreamServer):
+    """Unix socket 中繼站"""
+
+    def __init__(self, path: str):
+        if os.path.exists(path):
+            os.unlink(path)
+        super().__init__(path, _Handler)
+        self.init_channels()
+
+    @property
+    def url(self) -> str:
+        return f'unix://{self.server_address}'
+
+
+def serve_in_thread(broker) -> threading.Thread:
+    """在背景執行緒啟動中繼站"""
+    thread = threading.Thread(target=broker.serve_forever, daemon=True)
+    thread.start()
+    return thread
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Socket.IO 廣播用的本機 Redis 協定中繼站')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=6390)
+    parser.add_argument('--unix', help='改用 Unix socket 路徑')
+    args = parser.parse_args()
+
+    broker = UnixBroker(args.unix) if args.unix else TCPBroker(args.host, args.port)
+    print(f'📡 廣播中繼站: {broker.url}')
+    try:
+        broker.serve_forever()
+    except KeyboardInterrupt:
+        print('\n🛑 中繼站已停止')
+    finally:
+        broker.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+"""
+答案批改引擎
+
+每題只編譯一次標準化的答案鍵並快取：選項字串經 strip + casefold 後對應到
+選項索引，單選題以索引比對；多格填空題依設定採順序比對（索引逐格打包成
+一個整數）或不計順序比對（索引位元遮罩）。批改時只需查表與一次整數比較，
+不必載入 Question 或比對原始 JSON。
+"""
+import json
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from flask import Flask
+
+from models import db, Question
+
+
+def normalize(value: Any) -> Optional[str]:
+    """標準化答案字串，非字串回傳 None"""
+    if not isinstance(value, str):
+        return None
+    return value.strip().casefold()
+
+
+def decode_legacy(value: Any) -> Any:
+    """還原舊版 init_db 以 json.dumps 寫入、被重複編碼成字串的 options / answer"""
+    if not isinstance(value, str):
+        return value
+    try:
+        decoded = json.loads(value)
+    except ValueError:
+        return value
+    return decoded if isinstance(decoded, (list, str)) else value
+
+
+class AnswerKey:
+    """編譯後的答案鍵"""
+    __slots__ = ('question_type', 'index', 'exact', 'ordered', 'width', 'length', 'expected')
+
+    def __init__(self, question_type: str, options: Sequence[Any], answer: Any, ordered: bool = True):
+        self.question_type = question_type
+        self.ordered = ordered
+        options = decode_legacy(options)
+        if not isinstance(options, (list, tuple)):
+            options = []
+        answer = decode_legacy(answer)
+        self.width = max(len(options), 1).bit_length()
+
+        normalized = [normalize(option) for option in options]
+        # 選項在標準化後重複（例如只差大小寫）時改用原字串比對，避免誤判
+        self.exact = len(set(normalized)) != len(normalized)
+        self.index: Dict[Any, int] = {}
+        for i, option in enumerate(options):
+            self.index.setdefault(option if self.exact else normalized[i], i)
+
+        if question_type == 'multi_blank':
+            values = answer if isinstance(answer, list) else []
+            self.length = len(values)
+            self.expected = self._encode(values)
+        elif question_type == 'multiple_choice':
+            self.length = 1
+            self.expected = self._lookup(answer)
+            if self.expected is None and isinstance(answer, str):
+                # 答案不在選項中（例如選項無法解析）時退回直接比對答案字串
+                self.expected = len(options)
+                self.index.setdefault(answer if self.exact else normalize(answer), self.expected)
+        else:
+            self.length = 0
+            self.expected = None
+
+    def grade(self, answer: Any) -> bool:
+        """批改單一答案"""
+        if self.expected is None:
+            return False
+        if self.question_type == 'multi_blank':
+            if not isinstance(answer, list) or len(answer) != self.length:
+                return False
+            return self._encode(answer) == self.expected
+        return self._lookup(answer) == self.expected
+
+    def grade_many(self, answers: Iterable[Any]) -> List[bool]:
+        """批改同一題的多個答案"""
+        return [self.grade(answer) for answer in answers]
+
+    def _lookup(self, value: Any) -> Optional[int]:
+        if self.exact:
+            return self.index.get(value) if isinstance(value, str) else None
+        return self.index.get(normalize(value))
+
+    def _encode(self, values: Sequence[Any]) -> Optional[int]:
+        """順序比對：索引逐格打包；不計順序：索引位元遮罩"""
+        code = 0
+        for position, value in enumerate(values):
+            i = self._lookup(value)
+            if i is None:
+                return None
+            if self.ordered:
+                code |= (i + 1) << (position * self.width)
+            else:
+                code |= 1 << i
+        return code
+
+
+class Grader:
+    """答案鍵快取（以題目 ID 為鍵）"""
+
+    def __init__(self, max_size: int = 50000):
+        self._keys: Dict[str, AnswerKey] = {}
+        self._lock = threading.Lock()
+        self.max_size = max_size
+        self.unordered_multi_blank = False
+        self.compiled = 0
+
+    def init_app(self, app: Flask) -> None:
+        """綁定應用程式並清空快取"""
+        self.max_size = app.config.get('GRADER_CACHE_SIZE', self.max_size)
+        self.unordered_multi_blank = app.config.get('GRADER_UNORDERED_MULTI_BLANK', False)
+        self.clear()
+        app.extensions['grader'] = self
+
+    def key_for(self, question: Question) -> AnswerKey:
+        """取得（必要時編譯）題目的答案鍵"""
+        key = self._keys.get(question.id)
+        if key is None:
+            key = self._compile(question.id, question.question_type, question.options, question.answer)
+        return key
+
+    def grade(self, question_id: str, answer: Any) -> bool:
+        """批改單一答案（未快取的題目會查詢資料庫）"""
+        return self.grade_batch([(question_id, answer)])[0]
+
+    def grade_batch(self, submissions: Iterable[Tuple[str, Any]]) -> List[bool]:
+        """批改多筆 (題目 ID, 答案)，未快取的題目以單一查詢載入"""
+        submissions = list(submissions)
+        missing = {question_id for question_id, _ in submissions if question_id not in self._keys}
+        if missing:
+            self.load(missing)
+
+        results = []
+        for question_id, answer in submissions:
+            key = self._keys.get(question_id)
+            results.append(key.grade(answer) if key else False)
+        return results
+
+    def load(self, question_ids: Iterable[str]) -> None:
+        """以單一查詢編譯多題的答案鍵（只讀取批改需要的欄位）"""
+        rows = db.session.query(
+            Question.id, Question.question_type, Question.options, Question.answer
+        ).filter(Question.id.in_(list(question_ids))).all()
+        for question_id, question_type, options, answer in rows:
+            self._compile(question_id, question_type, options, answer)
+
+    def clear(self) -> None:
+        """清空快取"""
+        with self._lock:
+            self._keys.clear()
+            self.compiled = 0
+
+    def stats(self) -> dict:
+        """快取統計"""
+        return {
+            'size': len(self._keys),
+            'max_size': self.max_size,
+            'compiled': self.compiled
+        }
+
+    def _compile(self, question_id: str, question_type: str, options: Sequence[Any], answer: Any) -> AnswerKey:
+        key = AnswerKey(question_type, options or [], answer, ordered=not self.unordered_multi_blank)
+        with self._lock:
+            # 超過上限時移除最早編譯的答案鍵
+            while self._keys and len(self._keys) >= self.max_size:
+                self._keys.pop(next(iter(self._keys)))
+            self._keys[question_id] = key
+            self.compiled += 1
+        return key
+
+
+grader = Grader()
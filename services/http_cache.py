@@ -0,0 +1,95 @@
+"""
+目錄端點的 HTTP 快取
+
+分類、難度與單一題目的回應依目錄版本快取為 JSON bytes，並以內容雜湊作為
+強 ETag：同一版本的重複請求不查詢資料庫，客戶端帶 If-None-Match 時回傳 304。
+ETag 由內容計算，不同 worker 的版本號不一致時也不會誤判為未修改。
+"""
+import hashlib
+import threading
+import time
+from typing import Any, Callable, Dict, Tuple
+
+from flask import Flask, Response, jsonify, request
+
+from services.catalog import category_catalog
+from services.payloads import encode
+
+
+class _Entry:
+    __slots__ = ('version', 'loaded_at', 'body', 'etag')
+
+    def __init__(self, version: int, body: bytes):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.body = body
+        self.etag = hashlib.sha1(body).hexdigest()
+
+
+class CatalogResponseCache:
+    """以目錄版本為鍵的回應快取"""
+
+    def __init__(self, max_size: int = 2048):
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        self.max_size = max_size
+        self.max_age = 0
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def init_app(self, app: Flask) -> None:
+        """綁定應用程式並清空快取"""
+        self.max_size = app.config.get('CATALOG_RESPONSE_CACHE_SIZE', self.max_size)
+        self.max_age = app.config.get('CATALOG_CACHE_MAX_AGE', 0)
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.not_modified = 0
+        app.extensions['catalog_responses'] = self
+
+    def respond(self, key: str, build: Callable[[], Tuple[Any, int]]) -> Response:
+        """回傳快取的回應；未命中時呼叫 build 取得 (資料, 狀態碼)，只快取 200"""
+        version = category_catalog.version
+        entry = self._entries.get(key)
+        if entry is None or entry.version != version or \
+                time.monotonic() - entry.loaded_at > category_catalog.ttl:
+            payload, status = build()
+            if status != 200:
+                return jsonify(payload), status
+            entry = _Entry(version, encode(payload))
+            self._store(key, entry)
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        response = Response(entry.body, 200, mimetype='application/json')
+        response.set_etag(entry.etag)
+        if self.max_age:
+            response.cache_control.public = True
+            response.cache_control.max_age = self.max_age
+        else:
+            response.cache_control.no_cache = True
+        response = response.make_conditional(request)
+        if response.status_code == 304:
+            self.not_modified += 1
+        return response
+
+    def stats(self) -> dict:
+        """命中統計"""
+        return {
+            'version': category_catalog.version,
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'not_modified': self.not_modified
+        }
+
+    def _store(self, key: str, entry: _Entry) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            while self._entries and len(self._entries) >= self.max_size:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = entry
+
+
+catalog_responses = CatalogResponseCache()
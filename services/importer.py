@@ -0,0 +1,176 @@
+"""
+題目批次匯入
+
+以產生器逐行讀取 JSONL / CSV，每筆以 QuestionSchema 與答案格式檢查驗證，
+分類由分類目錄快取一次對照，通過的題目累積到 batch_size 筆後以
+executemany INSERT 寫入並提交，記憶體用量只與批次大小有關。
+
+JSONL 每行一個物件；CSV 需有標題列。分類可使用 category（ID、名稱或顯示名稱）
+或 category_id 欄位。CSV 的 options / answer 可為 JSON 陣列或以 | 分隔。
+"""
+import csv
+import json
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from marshmallow import ValidationError
+
+from models import db, Question
+from schemas import QuestionSchema, answer_error
+from services.catalog import category_catalog
+from services.question_pool import question_pool
+
+MAX_REPORTED_ERRORS = 100
+
+
+def read_jsonl(stream: TextIO) -> Iterator[Tuple[int, Any]]:
+    """逐行讀取 JSONL，回傳 (行號, 物件)；無法解析的行回傳 ValueError"""
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as e:
+            yield line_number, e
+
+
+def read_csv(stream: TextIO) -> Iterator[Tuple[int, Any]]:
+    """逐行讀取 CSV，回傳 (行號, 欄位字典)；無法解析的列回傳 ValueError"""
+    reader = csv.DictReader(stream)
+    for row in reader:
+        data = {key: value for key, value in row.items() if key and value not in (None, '')}
+        try:
+            for key in ('options', 'answer'):
+                if key in data:
+                    data[key] = _parse_list(data[key], keep_scalar=(key == 'answer'))
+        except ValueError as e:
+            yield reader.line_num, e
+            continue
+        yield reader.line_num, data
+
+
+def _parse_list(value: str, keep_scalar: bool = False) -> Any:
+    value = value.strip()
+    if value.startswith('['):
+        return json.loads(value)
+    if '|' in value or not keep_scalar:
+        return [part.strip() for part in value.split('|')]
+    return value
+
+
+def read_rows(stream: TextIO, fmt: str) -> Iterator[Tuple[int, Any]]:
+    """依格式（jsonl 或 csv）建立讀取產生器"""
+    if fmt == 'csv':
+        return read_csv(stream)
+    if fmt in ('jsonl', 'ndjson', 'json'):
+        return read_jsonl(stream)
+    raise ValueError(f'不支援的格式: {fmt}')
+
+
+class ImportReport:
+    """匯入結果統計"""
+
+    def __init__(self):
+        self.total = 0
+        self.imported = 0
+        self.failed = 0
+        self.batches = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.started_at = time.perf_counter()
+        self.elapsed = 0.0
+
+    def add_error(self, line: int, message: Any) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'error': message})
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.total / self.elapsed if self.elapsed else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'total': self.total,
+            'imported': self.imported,
+            'failed': self.failed,
+            'batches': self.batches,
+            'elapsed_seconds': round(self.elapsed, 3),
+            'rows_per_second': round(self.rows_per_second, 1),
+            'errors': self.errors
+        }
+
+
+def import_questions(rows: Iterable[Tuple[int, Any]], batch_size: int = 1000,
+                     on_batch: Optional[Callable[[ImportReport], None]] = None) -> ImportReport:
+    """驗證並批次寫入題目，回傳匯入統計"""
+    schema = QuestionSchema()
+    category_ids = category_catalog.lookup()
+    report = ImportReport()
+    batch: List[Dict[str, Any]] = []
+
+    try:
+        for line, data in rows:
+            report.total += 1
+            if isinstance(data, Exception):
+                report.add_error(line, f'無法解析: {data}')
+                continue
+            if not isinstance(data, dict):
+                report.add_error(line, '每筆資料必須是物件')
+                continue
+
+            data = dict(data)
+            category = data.pop('category', None)
+            key = data.get('category_id') or category
+            # 分類需為 ID 或名稱字串，清單或物件無法查表
+            if key is not None and (not isinstance(key, (str, int)) or isinstance(key, bool)):
+                report.add_error(line, '分類格式錯誤')
+                continue
+            category_id = category_ids.get(key)
+            if not category_id:
+                report.add_error(line, '分類不存在')
+                continue
+            data['category_id'] = category_id
+
+            try:
+                question = schema.load(data)
+            except ValidationError as e:
+                report.add_error(line, e.messages)
+                continue
+            error = answer_error(question)
+            if error:
+                report.add_error(line, error)
+                continue
+
+            batch.append(question)
+            if len(batch) >= batch_size:
+                _flush(batch, report, on_batch)
+
+        if batch:
+            _flush(batch, report, on_batch)
+    finally:
+        # Core 批次寫入不經過 ORM 事件，需手動使目錄與抽題索引失效；
+        # 中途失敗時已提交的批次也要失效
+        if report.imported:
+            category_catalog.invalidate()
+            question_pool.invalidate()
+
+    report.elapsed = time.perf_counter() - report.started_at
+    return report
+
+
+def _flush(batch: List[Dict[str, Any]], report: ImportReport,
+           on_batch: Optional[Callable[[ImportReport], None]]) -> None:
+    """以 executemany 寫入一批並提交"""
+    try:
+        db.session.execute(Question.__table__.insert(), batch)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    report.imported += len(batch)
+    report.batches += 1
+    report.elapsed = time.perf_counter() - report.started_at
+    batch.clear()
+    if on_batch:
+        on_batch(report)
@@ -0,0 +1,70 @@
+"""
+房間排行榜
+
+每答一題即以二分搜尋更新玩家位置，排名依分數遞減、累計答題時間遞增排序，
+/rankings 與遊戲結束廣播直接讀取，不必重新載入並排序所有會話。
+"""
+import bisect
+from typing import Dict, Iterable, List, Tuple
+
+RankKey = Tuple[int, float, str]
+
+
+class Leaderboard:
+    """依 (-分數, 累計答題時間, user_id) 排序的排行榜"""
+    __slots__ = ('_keys', '_by_user')
+
+    def __init__(self, entries: Iterable[Tuple[str, int, float]] = ()):
+        self._by_user: Dict[str, RankKey] = {
+            user_id: (-score, total_time, user_id) for user_id, score, total_time in entries
+        }
+        self._keys: List[RankKey] = sorted(self._by_user.values())
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def update(self, user_id: str, score: int, total_time: float) -> None:
+        """更新玩家分數與累計時間"""
+        old_key = self._by_user.get(user_id)
+        if old_key is not None:
+            del self._keys[bisect.bisect_left(self._keys, old_key)]
+
+        new_key = (-score, total_time, user_id)
+        bisect.insort(self._keys, new_key)
+        self._by_user[user_id] = new_key
+
+    def rank(self, user_id: str) -> int:
+        """取得玩家名次（從 1 開始），不在榜上回傳 0"""
+        key = self._by_user.get(user_id)
+        if key is None:
+            return 0
+        return bisect.bisect_left(self._keys, key) + 1
+
+    def top(self, k: int) -> List[Tuple[int, str]]:
+        """前 k 名的 (名次, user_id)"""
+        return [(i + 1, key[2]) for i, key in enumerate(self._keys[:max(k, 0)])]
+
+    def around(self, user_id: str, radius: int) -> List[Tuple[int, str]]:
+        """玩家前後 radius 名的 (名次, user_id)"""
+        rank = self.rank(user_id)
+        if not rank:
+            return []
+        start = max(rank - 1 - radius, 0)
+        end = rank + radius
+        return [(start + i + 1, key[2]) for i, key in enumerate(self._keys[start:end])]
+
+    def ordered(self) -> List[Tuple[int, str]]:
+        """完整排名"""
+        return self.top(len(self._keys))
+
+
+def slice_rankings(rankings: list, mode: str, k: int, user_id: str = None, radius: int = 2) -> list:
+    """對已排序的排名列表套用 top_k / around_me 篩選"""
+    if mode == 'top_k':
+        return rankings[:max(k, 0)]
+    if mode == 'around_me':
+        index = next((i for i, r in enumerate(rankings) if r['user_id'] == user_id), None)
+        if index is None:
+            return []
+        return rankings[max(index - radius, 0):index + radius + 1]
+    return rankings
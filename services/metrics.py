@@ -0,0 +1,209 @@
+"""
+請求與 SQL 查詢指標
+
+以 Flask 的 request_started / request_finished 訊號計時每個請求，並以
+SQLAlchemy 的 before_cursor_execute / after_cursor_execute 事件累計該請求的
+查詢次數與資料庫時間，依端點彙總為延遲直方圖、查詢次數直方圖與計數器，
+以 Prometheus 文字格式匯出。
+
+METRICS_SAMPLE_RATE 小於 1 時只有抽中的請求會掛上計時，未抽中的請求與
+請求外（背景任務）的查詢只多一次 ContextVar 讀取。計數器只包含抽樣的請求。
+"""
+import random
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from flask import Flask, request, request_finished, request_started
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+_current: ContextVar[Optional['_RequestSample']] = ContextVar('request_metrics_sample', default=None)
+
+
+class _RequestSample:
+    """單一抽樣請求的計時與查詢累計"""
+    __slots__ = ('started_at', 'queries', 'db_time', 'query_started_at')
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.query_started_at = 0.0
+
+
+class Histogram:
+    """固定區間的累積直方圖"""
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class EndpointMetrics:
+    """單一端點的彙總指標"""
+    __slots__ = ('latency', 'queries', 'db_time', 'statuses')
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.db_time = 0.0
+        self.statuses: Dict[int, int] = {}
+
+
+class RequestMetrics:
+    """依端點彙總的請求延遲與 SQL 查詢指標"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: Dict[Tuple[str, str], EndpointMetrics] = {}
+        self.sample_rate = 1.0
+        self.enabled = True
+
+    def init_app(self, app: Flask, db) -> None:
+        """掛上請求訊號與 SQL 事件（需在 db.init_app 之後呼叫）"""
+        self.enabled = app.config.get('METRICS_ENABLED', True)
+        self.sample_rate = min(max(app.config.get('METRICS_SAMPLE_RATE', 1.0), 0.0), 1.0)
+        self.clear()
+        app.extensions['request_metrics'] = self
+        if not self.enabled:
+            return
+
+        request_started.connect(self._on_request_started, app)
+        request_finished.connect(self._on_request_finished, app)
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+
+    def _on_request_started(self, sender, **extra) -> None:
+        if self.sample_rate >= 1.0 or random.random() < self.sample_rate:
+            _current.set(_RequestSample())
+        else:
+            _current.set(None)
+
+    def _on_request_finished(self, sender, response, **extra) -> None:
+        sample = _current.get()
+        if sample is None:
+            return
+        _current.set(None)
+        self.record(
+            request.endpoint or 'unmatched', request.method, response.status_code,
+            time.perf_counter() - sample.started_at, sample.queries, sample.db_time
+        )
+
+    def record(self, endpoint: str, method: str, status: int, elapsed: float,
+               queries: int, db_time: float) -> None:
+        """記錄一個請求"""
+        key = (endpoint, method)
+        with self._lock:
+            metrics = self._endpoints.get(key)
+            if metrics is None:
+                metrics = self._endpoints[key] = EndpointMetrics()
+            metrics.latency.observe(elapsed)
+            metrics.queries.observe(queries)
+            metrics.db_time += db_time
+            metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+
+    def render(self) -> str:
+        """以 Prometheus 文字格式輸出"""
+        with self._lock:
+            snapshot = sorted(self._endpoints.items())
+            lines = [
+                '# HELP eng_game_metrics_sample_rate Fraction of requests that are measured.',
+                '# TYPE eng_game_metrics_sample_rate gauge',
+                f'eng_game_metrics_sample_rate {_number(self.sample_rate)}',
+                '# HELP eng_game_http_requests_total Sampled requests by endpoint and status.',
+                '# TYPE eng_game_http_requests_total counter'
+            ]
+            for (endpoint, method), metrics in snapshot:
+                for status, count in sorted(metrics.statuses.items()):
+                    lines.append(f'eng_game_http_requests_total{{{_labels(endpoint, method)},status="{status}"}} {count}')
+
+            lines += [
+                '# HELP eng_game_http_request_duration_seconds Request latency by endpoint.',
+                '# TYPE eng_game_http_request_duration_seconds histogram'
+            ]
+            for (endpoint, method), metrics in snapshot:
+                lines += _histogram_lines('eng_game_http_request_duration_seconds',
+                                         _labels(endpoint, method), metrics.latency)
+
+            lines += [
+                '# HELP eng_game_db_queries_per_request SQL statements issued per request.',
+                '# TYPE eng_game_db_queries_per_request histogram'
+            ]
+            for (endpoint, method), metrics in snapshot:
+                lines += _histogram_lines('eng_game_db_queries_per_request',
+                                         _labels(endpoint, method), metrics.queries)
+
+            lines += [
+                '# HELP eng_game_db_query_seconds_total Time spent executing SQL by endpoint.',
+                '# TYPE eng_game_db_query_seconds_total counter'
+            ]
+            for (endpoint, method), metrics in snapshot:
+                lines.append(f'eng_game_db_query_seconds_total{{{_labels(endpoint, method)}}} {_number(metrics.db_time)}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    sample = _current.get()
+    if sample is not None:
+        sample.query_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    sample = _current.get()
+    if sample is not None:
+        sample.queries += 1
+        sample.db_time += time.perf_counter() - sample.query_started_at
+
+
+def _histogram_lines(name: str, labels: str, histogram: Histogram) -> List[str]:
+    lines = [f'{name}_bucket{{{labels},le="{_number(bound)}"}} {count}'
+             for bound, count in histogram.cumulative()]
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+    lines.append(f'{name}_sum{{{labels}}} {_number(histogram.sum)}')
+    lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+    return lines
+
+
+def _labels(endpoint: str, method: str) -> str:
+    return f'endpoint="{_escape(endpoint)}",method="{_escape(method)}"'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+request_metrics = RequestMetrics()
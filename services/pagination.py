@@ -0,0 +1,37 @@
+"""
+Keyset 分頁
+
+列表依 (created_at, id) 遞減排序，游標為上一頁最後一筆的 (created_at, id)，
+以 URL-safe base64 編碼；下一頁以索引範圍掃描取得，不需要 OFFSET。
+"""
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+
+from models import db
+
+Cursor = Tuple[datetime, str]
+
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    """以最後一筆的 (created_at, id) 產生分頁游標"""
+    raw = f'{created_at.isoformat()}|{row_id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Optional[Cursor]:
+    """解析分頁游標，格式錯誤時回傳 None"""
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|', 1)
+        return datetime.fromisoformat(created_at), row_id
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def after_cursor(created_column, id_column, after: Cursor):
+    """遞減排序時位於游標之後的條件"""
+    created_at, row_id = after
+    return db.or_(
+        created_column < created_at,
+        db.and_(created_column == created_at, id_column < row_id)
+    )
@@ -0,0 +1,181 @@
+"""
+密碼雜湊執行緒池
+
+Werkzeug 的 scrypt／pbkdf2 雜湊每次需數十到數百毫秒 CPU。在 gevent worker 中直接
+計算會阻塞整個 hub，整班同時登入時進行中遊戲的 Socket 廣播也會一起延遲。
+雜湊改交給有上限的作業系統執行緒池（gevent 下使用 gevent 的原生執行緒池，
+呼叫端 greenlet 等待時 hub 仍可處理其他連線；hashlib 計算時會釋放 GIL）：
+
+- PASSWORD_HASH_WORKERS   執行緒數，0 表示在呼叫端直接計算
+- PASSWORD_HASH_MAX_QUEUE 等待中的工作上限，超過時拋出 PasswordHashBusy（回應 503）
+- PASSWORD_HASH_METHOD    Werkzeug 雜湊方法與參數，例如 scrypt:32768:8:1 或 pbkdf2:sha256:600000
+
+變更 PASSWORD_HASH_METHOD 後，舊參數的雜湊會在使用者下次登入成功時重新計算。
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from flask import Flask
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+try:
+    from gevent import monkey
+    from gevent.threadpool import ThreadPool as GeventThreadPool
+except ImportError:  # 未使用 gevent 的部署
+    monkey = None
+
+DEFAULT_METHOD = 'scrypt'
+# Werkzeug 省略參數時使用的預設值
+METHOD_DEFAULTS = {
+    'scrypt': ['scrypt', str(2 ** 15), '8', '1'],
+    'pbkdf2': ['pbkdf2', 'sha256', str(DEFAULT_PBKDF2_ITERATIONS)]
+}
+
+
+class PasswordHashBusy(Exception):
+    """雜湊等待佇列已滿"""
+
+
+def normalize_method(method: str) -> str:
+    """補齊雜湊方法的預設參數（與 Werkzeug 寫入雜湊的前綴相同）"""
+    parts = method.split(':')
+    defaults = METHOD_DEFAULTS.get(parts[0])
+    if not defaults:
+        return method
+    return ':'.join(parts + defaults[len(parts):])
+
+
+class PasswordHasher:
+    """在有上限的執行緒池中計算與驗證密碼雜湊"""
+
+    def __init__(self):
+        # 統計在執行緒池的原生執行緒中更新，需使用未經 monkey patch 的鎖
+        self._lock = monkey.get_original('threading', 'Lock')() if monkey else threading.Lock()
+        self._pool = None
+        self.method = normalize_method(DEFAULT_METHOD)
+        self.workers = 0
+        self.max_queue = 256
+        self._reset_stats()
+
+    def init_app(self, app: Flask) -> None:
+        """綁定應用程式設定（執行緒池在第一次使用時建立，確保 gevent 已完成 monkey patch）"""
+        self.method = normalize_method(app.config.get('PASSWORD_HASH_METHOD', DEFAULT_METHOD))
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', 4)
+        self.max_queue = app.config.get('PASSWORD_HASH_MAX_QUEUE', 256)
+        self._close()
+        self._reset_stats()
+        app.extensions['password_hasher'] = self
+
+    def hash(self, password: str) -> str:
+        """以目前的雜湊參數計算密碼雜湊"""
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        """驗證密碼"""
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """雜湊使用的方法或參數與目前設定不同"""
+        return password_hash.split('$', 1)[0] != self.method
+
+    def record_rehash(self) -> None:
+        with self._lock:
+            self.rehashed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """佇列深度與耗時統計（每個 worker 一份）"""
+        with self._lock:
+            return {
+                'method': self.method,
+                'workers': self.workers,
+                'max_queue': self.max_queue,
+                'queue_depth': self.queued,
+                'max_queue_depth': self.max_queued,
+                'active': self.active,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'rehashed': self.rehashed,
+                'avg_wait_ms': round(self.total_wait / self.completed * 1000, 2) if self.completed else 0.0,
+                'max_wait_ms': round(self.max_wait * 1000, 2),
+                'avg_hash_ms': round(self.total_hash / self.completed * 1000, 2) if self.completed else 0.0
+            }
+
+    def _reset_stats(self) -> None:
+        with self._lock:
+            self.queued = 0
+            self.max_queued = 0
+            self.active = 0
+            self.completed = 0
+            self.rejected = 0
+            self.rehashed = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+            self.total_hash = 0.0
+
+    def _run(self, fn: Callable, *args) -> Any:
+        if self.workers <= 0:
+            return self._timed(fn, args, time.perf_counter())
+
+        with self._lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise PasswordHashBusy('密碼雜湊佇列已滿')
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+        job = {'started': False}
+        try:
+            return self._submit(self._timed, fn, args, time.perf_counter(), job)
+        finally:
+            # 尚未開始執行就結束（例如等待中被中斷）時歸還佇列名額
+            if not job['started']:
+                with self._lock:
+                    self.queued -= 1
+
+    def _timed(self, fn: Callable, args: tuple, submitted: float, job: Optional[dict] = None) -> Any:
+        started = time.perf_counter()
+        with self._lock:
+            if job is not None:
+                job['started'] = True
+                self.queued -= 1
+            self.active += 1
+            wait = started - submitted
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.completed += 1
+                self.total_hash += time.perf_counter() - started
+
+    def _submit(self, fn: Callable, *args) -> Any:
+        pool = self._pool
+        if pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = self._create_pool()
+                pool = self._pool
+        if isinstance(pool, ThreadPoolExecutor):
+            return pool.submit(fn, *args).result()
+        return pool.spawn(fn, *args).get()
+
+    def _create_pool(self):
+        if monkey is not None and monkey.is_module_patched('threading'):
+            return GeventThreadPool(self.workers)
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hash')
+
+    def _close(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is None:
+            return
+        if isinstance(pool, ThreadPoolExecutor):
+            pool.shutdown(wait=False)
+        else:
+            pool.kill()
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,79 @@
+"""
+題目回應快取
+
+start_game 決定房間題目後，即把每題的用戶端版本（不含答案與解析）
+編碼成 JSON bytes 並以題目 ID 快取；current-question 只需查表並補上
+回合與玩家相關的少數欄位，不必重新序列化題目或載入分類。
+"""
+import json
+import threading
+from typing import Dict, Iterable, Optional
+
+from flask import Flask
+
+from models import Question
+
+
+def encode(value) -> bytes:
+    """以緊湊格式編碼 JSON"""
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+class QuestionPayloadCache:
+    """題目 ID → 用戶端 JSON bytes"""
+
+    def __init__(self, max_size: int = 50000):
+        self._payloads: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+        self.max_size = max_size
+
+    def init_app(self, app: Flask) -> None:
+        """綁定應用程式並清空快取"""
+        self.max_size = app.config.get('QUESTION_PAYLOAD_CACHE_SIZE', self.max_size)
+        self.clear()
+        app.extensions['question_payloads'] = self
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+    def build(self, questions: Iterable[Question]) -> None:
+        """預先編碼題目（題目的分類需已載入）"""
+        for question in questions:
+            self.get_or_build(question)
+
+    def get(self, question_id: str) -> Optional[bytes]:
+        """取得已編碼的題目"""
+        return self._payloads.get(question_id)
+
+    def get_or_build(self, question: Question) -> bytes:
+        """取得已編碼的題目，未快取時立即編碼"""
+        payload = self._payloads.get(question.id)
+        if payload is None:
+            payload = encode(question.to_public_dict())
+            with self._lock:
+                # 超過上限時移除最早編碼的題目
+                while self._payloads and len(self._payloads) >= self.max_size:
+                    self._payloads.pop(next(iter(self._payloads)))
+                self._payloads[question.id] = payload
+        return payload
+
+    def clear(self) -> None:
+        """清空快取"""
+        with self._lock:
+            self._payloads.clear()
+
+
+def current_question_body(round_state, answered: bool, ends_at: Optional[float],
+                          current_round: int, total_rounds: int) -> bytes:
+    """組合 current-question 回應（題目部分直接使用快取的 bytes）"""
+    return b''.join((
+        round_state.payload_prefix,
+        b',"answered":', b'true' if answered else b'false',
+        b',"ends_at":', encode(ends_at),
+        b'},"current_round":', str(current_round).encode(),
+        b',"total_rounds":', str(total_rounds).encode(),
+        b'}'
+    ))
+
+
+question_payloads = QuestionPayloadCache()
@@ -0,0 +1,157 @@
+"""
+題庫抽題索引
+
+每個 worker 保留一份題目 ID 索引，依 (category_id, difficulty, question_type)
+分桶存放為緊湊的整數陣列。start_game 與 shuffle 查詢直接從索引抽樣，
+不再對 questions 表格做 ORDER BY RANDOM()。
+"""
+import bisect
+import random
+import threading
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask import Flask
+
+from models import db, Question
+from services.catalog import category_catalog
+
+BucketKey = Tuple[str, str, str]
+
+
+class QuestionPool:
+    """題目 ID 分桶索引（每個 worker 一份）"""
+
+    def __init__(self):
+        self._ids: List[str] = []  # 題目 ID 總表，陣列中存放的是此表的索引
+        self._known = set()
+        self._buckets: Dict[BucketKey, array] = {}
+        self._lock = threading.Lock()
+        self._loaded_at: Optional[float] = None
+        self._ttl = 300
+
+    def init_app(self, app: Flask) -> None:
+        """綁定應用程式"""
+        self._ttl = app.config.get('QUESTION_POOL_TTL', 300)
+        self._loaded_at = None
+        app.extensions['question_pool'] = self
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def reload(self) -> None:
+        """從資料庫重新建立索引（只讀取分桶需要的欄位）"""
+        rows = db.session.query(
+            Question.id, Question.category_id, Question.difficulty, Question.question_type
+        ).all()
+
+        ids: List[str] = []
+        buckets: Dict[BucketKey, array] = {}
+        for question_id, category_id, difficulty, question_type in rows:
+            buckets.setdefault((category_id, difficulty, question_type), array('I')).append(len(ids))
+            ids.append(question_id)
+
+        with self._lock:
+            self._ids = ids
+            self._known = set(ids)
+            self._buckets = buckets
+            self._loaded_at = time.monotonic()
+
+    def ensure_loaded(self) -> None:
+        """首次使用或索引過期時重新載入"""
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self._ttl:
+            self.reload()
+
+    def invalidate(self) -> None:
+        """下次抽題時重新載入索引（批次匯入後使用）"""
+        self._loaded_at = None
+
+    def add(self, question: Question) -> None:
+        """將新建立的題目加入索引"""
+        if self._loaded_at is None:
+            return
+        with self._lock:
+            if question.id in self._known:
+                return
+            key = (question.category_id, question.difficulty, question.question_type)
+            self._buckets.setdefault(key, array('I')).append(len(self._ids))
+            self._ids.append(question.id)
+            self._known.add(question.id)
+
+    def sample(self, k: int, category_ids: Optional[Iterable[str]] = None,
+               difficulties: Optional[Iterable[str]] = None,
+               question_types: Optional[Iterable[str]] = None) -> List[str]:
+        """依分類分層抽出不重複的題目 ID，題數不足時回傳所有符合者"""
+        self.ensure_loaded()
+        category_filter = set(category_ids) if category_ids else None
+        difficulty_filter = set(difficulties) if difficulties else None
+        type_filter = set(question_types) if question_types else None
+
+        with self._lock:
+            ids = self._ids
+            strata: Dict[str, List[array]] = {}
+            for (category_id, difficulty, question_type), bucket in self._buckets.items():
+                if category_filter is not None and category_id not in category_filter:
+                    continue
+                if difficulty_filter is not None and difficulty not in difficulty_filter:
+                    continue
+                if type_filter is not None and question_type not in type_filter:
+                    continue
+                strata.setdefault(category_id, []).append(bucket)
+
+        sizes = {category_id: sum(len(b) for b in buckets) for category_id, buckets in strata.items()}
+        allocation = _allocate(k, sizes)
+
+        picked: List[str] = []
+        for category_id, count in allocation.items():
+            if count:
+                picked.extend(ids[i] for i in _sample_buckets(strata[category_id], count))
+
+        random.shuffle(picked)
+        return picked
+
+
+def _allocate(k: int, sizes: Dict[str, int]) -> Dict[str, int]:
+    """將 k 題平均分配到各分類，分類題數不足時由其他分類補足"""
+    allocation = {category_id: 0 for category_id in sizes}
+    remaining = min(k, sum(sizes.values()))
+    open_categories = [c for c, size in sizes.items() if size > 0]
+    random.shuffle(open_categories)
+
+    while remaining > 0 and open_categories:
+        share, extra = divmod(remaining, len(open_categories))
+        still_open = []
+        for i, category_id in enumerate(open_categories):
+            want = share + (1 if i < extra else 0)
+            take = min(want, sizes[category_id] - allocation[category_id])
+            allocation[category_id] += take
+            remaining -= take
+            if allocation[category_id] < sizes[category_id]:
+                still_open.append(category_id)
+        open_categories = still_open
+
+    return allocation
+
+
+def _sample_buckets(buckets: List[array], count: int) -> List[int]:
+    """從多個分桶串接而成的序列中抽出 count 個不重複元素（O(count)）"""
+    offsets = []
+    total = 0
+    for bucket in buckets:
+        offsets.append(total)
+        total += len(bucket)
+
+    picked = []
+    for position in random.sample(range(total), count):
+        index = bisect.bisect_right(offsets, position) - 1
+        picked.append(buckets[index][position - offsets[index]])
+    return picked
+
+
+def resolve_category_ids(values: Iterable[str]) -> List[str]:
+    """將分類 ID、名稱或顯示名稱轉換為分類 ID（使用分類目錄快取）"""
+    return category_catalog.resolve_ids(values)
+
+
+question_pool = QuestionPool()
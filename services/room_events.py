@@ -0,0 +1,126 @@
+"""
+房間事件合併廣播
+
+作答、準備與加入／離開等高頻事件每位玩家各觸發一次，每次都廣播給整個房間，
+一回合的訊息數隨玩家數平方成長。RoomEventCoalescer 把同一房間在
+ROOM_EVENT_COALESCE_WINDOW 內的事件收集起來，每個時間窗對每個房間只送出一筆：
+
+- 時間窗內只有一個事件時照原本的事件名稱送出（行為與直接廣播相同）
+- 多個事件合併為 room_events：{'room_id', 'events': [{'event', 'data'[, 'skip_sid']}]}，
+  原本排除發送者（include_self=False）的事件帶有 skip_sid，由客戶端自行略過
+
+遊戲開始、下一回合與遊戲結束（CRITICAL_EVENTS）不等待時間窗：送出前先清空該房間
+累積的事件，維持事件順序。時間窗設為 0 時所有事件直接廣播。
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from flask import Flask
+
+CRITICAL_EVENTS = frozenset({'game_started', 'next_round', 'game_finished'})
+BATCH_EVENT = 'room_events'
+
+
+class RoomEventCoalescer:
+    """依房間合併時間窗內的廣播事件"""
+
+    def __init__(self):
+        self._pending: 'OrderedDict[str, List[Dict[str, Any]]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._started = False
+        self._app: Optional[Flask] = None
+        self.window = 0.05
+        self.events_queued = 0
+        self.events_immediate = 0
+        self.messages_sent = 0
+
+    def init_app(self, app: Flask) -> None:
+        """綁定應用程式"""
+        self._app = app
+        self.window = app.config.get('ROOM_EVENT_COALESCE_WINDOW', 0.05)
+        with self._lock:
+            self._pending.clear()
+        self.events_queued = self.events_immediate = self.messages_sent = 0
+        app.extensions['room_events'] = self
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    def emit(self, event: str, data: Any, room: str, skip_sid: Optional[str] = None) -> None:
+        """廣播房間事件；非關鍵事件在時間窗內合併"""
+        if not self.enabled or event in CRITICAL_EVENTS:
+            self.flush(room)
+            self.events_immediate += 1
+            self._send(event, data, room, skip_sid)
+            return
+
+        entry = {'event': event, 'data': data}
+        if skip_sid:
+            entry['skip_sid'] = skip_sid
+        with self._lock:
+            self._pending.setdefault(room, []).append(entry)
+            self.events_queued += 1
+        self.start()
+
+    def flush(self, room: Optional[str] = None) -> int:
+        """送出累積的事件（指定房間或全部），回傳送出的訊息數"""
+        with self._lock:
+            if room is None:
+                batches = list(self._pending.items())
+                self._pending.clear()
+            else:
+                entries = self._pending.pop(room, None)
+                batches = [(room, entries)] if entries else []
+
+        for room_id, entries in batches:
+            if len(entries) == 1:
+                entry = entries[0]
+                self._send(entry['event'], entry['data'], room_id, entry.get('skip_sid'))
+            else:
+                self._send(BATCH_EVENT, {'room_id': room_id, 'events': entries}, room_id)
+        return len(batches)
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(len(entries) for entries in self._pending.values())
+
+    def start(self) -> None:
+        """啟動背景送出任務"""
+        if self._started:
+            return
+        with self._start_lock:
+            if self._started:
+                return
+            from app import socketio
+            socketio.start_background_task(self._loop)
+            self._started = True
+
+    def stats(self) -> Dict[str, Any]:
+        """合併統計（coalesced 為合併後的事件數，messages_sent 為實際廣播數）"""
+        return {
+            'window_ms': round(self.window * 1000, 2),
+            'pending': self.pending(),
+            'coalesced': self.events_queued,
+            'immediate': self.events_immediate,
+            'messages_sent': self.messages_sent
+        }
+
+    def _send(self, event: str, data: Any, room: str, skip_sid: Optional[str] = None) -> None:
+        from app import socketio
+        self.messages_sent += 1
+        socketio.emit(event, data, room=room, skip_sid=skip_sid)
+
+    def _loop(self) -> None:
+        from app import socketio
+        while True:
+            socketio.sleep(self.window or 0.05)
+            try:
+                self.flush()
+            except Exception as e:
+                self._app.logger.error(f'房間事件廣播失敗: {e}')
+
+
+room_events = RoomEventCoalescer()
@@ -0,0 +1,204 @@
+"""
+版本化的房間快照與差異推送
+
+每個房間保留一份快照（狀態、回合與玩家分數），每次變更遞增版本並以
+room_delta 事件廣播與上一版的差異，客戶端不必在每個事件後重新查詢
+房間與排名。客戶端以 base_version 對照自己的版本，不一致時以
+GET /api/rooms/<id>/snapshot?since=<版本> 取得缺少的差異或完整快照。
+
+差異格式：只列出有變動的欄位；players 以 user_id 為鍵，值為變動的欄位，
+玩家被移除時為 null。base_version 為 null 表示 changes 是完整快照。
+
+快照與房間狀態一樣只存在於目前的 worker，版本號在程序內全域遞增，
+快照被淘汰後重建的版本仍大於舊版本，客戶端會因 base_version 不符而重新同步。
+"""
+import itertools
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional
+
+from flask import Flask
+
+from models import db, GameRoom, GameSession
+from services.room_events import room_events
+from services.room_state import PlayerState, room_states
+from services.user_cache import user_cache
+
+_versions = itertools.count(1)
+
+
+def player_fields(player: PlayerState) -> Dict[str, Any]:
+    """房間狀態中的玩家 → 快照欄位"""
+    return {
+        'username': user_cache.get_username(player.user_id),
+        'score': player.score,
+        'correct_answers': player.correct_answers,
+        'total_answers': player.total_answers,
+        'left': player.left_at is not None
+    }
+
+
+def diff(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """計算 new 相對於 old 的差異（巢狀字典遞迴比較，移除的鍵為 None）"""
+    changes = {}
+    for key, value in new.items():
+        before = old.get(key)
+        if isinstance(value, dict) and isinstance(before, dict):
+            nested = diff(before, value)
+            if nested:
+                changes[key] = nested
+        elif key not in old or before != value:
+            changes[key] = value
+    for key in old.keys() - new.keys():
+        changes[key] = None
+    return changes
+
+
+class RoomSnapshot:
+    """單一房間的快照與最近的差異"""
+    __slots__ = ('room_id', 'version', 'data', 'deltas')
+
+    def __init__(self, room_id: str, data: Dict[str, Any], history: int):
+        self.room_id = room_id
+        self.version = next(_versions)
+        self.data = data
+        self.deltas: deque = deque(maxlen=history)
+
+    def deltas_since(self, version: int) -> Optional[List[Dict[str, Any]]]:
+        """自指定版本之後的差異；已不在保留範圍內時回傳 None"""
+        if version == self.version:
+            return []
+        for index, delta in enumerate(self.deltas):
+            if delta['base_version'] == version:
+                return list(itertools.islice(self.deltas, index, None))
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'room_id': self.room_id, 'version': self.version, 'snapshot': self.data}
+
+
+class RoomSnapshotStore:
+    """房間快照（每個 worker 一份，LRU 上限）"""
+
+    def __init__(self, max_rooms: int = 5000, history: int = 50):
+        self._rooms: 'OrderedDict[str, RoomSnapshot]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_rooms = max_rooms
+        self.history = history
+        self.deltas_sent = 0
+
+    def init_app(self, app: Flask) -> None:
+        """綁定應用程式並清空快照"""
+        self.max_rooms = app.config.get('ROOM_SNAPSHOT_CACHE_SIZE', self.max_rooms)
+        self.history = app.config.get('ROOM_SNAPSHOT_HISTORY', self.history)
+        with self._lock:
+            self._rooms.clear()
+            self.deltas_sent = 0
+        app.extensions['room_snapshots'] = self
+
+    def get(self, room_id: str) -> Optional[RoomSnapshot]:
+        """取得房間快照，不在記憶體中時建立（房間不存在回傳 None）"""
+        with self._lock:
+            snapshot = self._rooms.get(room_id)
+            if snapshot:
+                self._rooms.move_to_end(room_id)
+                return snapshot
+
+        data = self._build(room_id)
+        if data is None:
+            return None
+        with self._lock:
+            snapshot = self._rooms.get(room_id)
+            if snapshot is None:
+                snapshot = self._store(RoomSnapshot(room_id, data, self.history))
+            return snapshot
+
+    def apply(self, room_id: str, fields: Optional[Dict[str, Any]] = None,
+              players: Optional[Dict[str, Optional[Dict[str, Any]]]] = None) -> Optional[Dict[str, Any]]:
+        """套用變更（需在資料提交後呼叫），有差異時遞增版本並廣播 room_delta"""
+        with self._lock:
+            snapshot = self._rooms.get(room_id)
+            if snapshot is not None:
+                self._rooms.move_to_end(room_id)
+                delta = self._apply(snapshot, fields or {}, players or {})
+
+        if snapshot is None:
+            # 尚無快照：建立後以完整快照作為第一個差異
+            snapshot = self.get(room_id)
+            if snapshot is None:
+                return None
+            delta = {'room_id': room_id, 'version': snapshot.version,
+                     'base_version': None, 'changes': snapshot.data}
+
+        if delta:
+            self._emit(delta)
+        return delta
+
+    def discard(self, room_id: str) -> None:
+        with self._lock:
+            self._rooms.pop(room_id, None)
+
+    def stats(self) -> dict:
+        return {'rooms': len(self._rooms), 'deltas_sent': self.deltas_sent}
+
+    def _apply(self, snapshot: RoomSnapshot, fields: Dict[str, Any],
+               players: Dict[str, Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        data = dict(snapshot.data, **fields)
+        data['players'] = dict(snapshot.data['players'])
+        for user_id, values in players.items():
+            if values is None:
+                data['players'].pop(user_id, None)
+            else:
+                data['players'][user_id] = dict(data['players'].get(user_id, {}), **values)
+
+        changes = diff(snapshot.data, data)
+        if not changes:
+            return None
+
+        delta = {'room_id': snapshot.room_id, 'version': next(_versions),
+                 'base_version': snapshot.version, 'changes': changes}
+        snapshot.data = data
+        snapshot.version = delta['version']
+        snapshot.deltas.append(delta)
+        return delta
+
+    def _store(self, snapshot: RoomSnapshot) -> RoomSnapshot:
+        self._rooms[snapshot.room_id] = snapshot
+        while len(self._rooms) > self.max_rooms:
+            self._rooms.popitem(last=False)
+        return snapshot
+
+    def _build(self, room_id: str) -> Optional[Dict[str, Any]]:
+        """由進行中的房間狀態或資料庫建立快照內容"""
+        state = room_states.get(room_id)
+        if state:
+            with state.lock:
+                return {
+                    'status': state.status,
+                    'current_round': state.current_round,
+                    'total_rounds': state.total_rounds,
+                    'players': {uid: player_fields(p) for uid, p in state.players.items()}
+                }
+
+        room = db.session.get(GameRoom, room_id)
+        if not room:
+            return None
+        return {
+            'status': room.status,
+            'current_round': room.current_round,
+            'total_rounds': room.total_rounds,
+            'players': {p['user_id']: {
+                'username': p['username'],
+                'score': p['score'],
+                'correct_answers': p['correct_answers'],
+                'total_answers': p['total_answers'],
+                'left': p['left_at'] is not None
+            } for p in GameSession.room_players(room_id)}
+        }
+
+    def _emit(self, delta: Dict[str, Any]) -> None:
+        self.deltas_sent += 1
+        room_events.emit('room_delta', delta, room=delta['room_id'])
+
+
+room_snapshots = RoomSnapshotStore()
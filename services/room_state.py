@@ -0,0 +1,604 @@
+"""
+進行中遊戲的房間狀態引擎
+
+start_game 時將房間一次載入記憶體，之後的取題、答題與回合推進
+都直接讀寫記憶體中的狀態；答案與計分交由背景寫入器持久化到資料庫。
+
+狀態只存在於目前的 worker 程序中，並且是房間的唯一依據：載入後不會再
+與資料庫比對。若請求落在尚未持有該房間的 worker，會從資料庫補載一份獨立
+的狀態，之後兩份狀態各自推進、互不同步。因此部署時需使用單一 worker
+（start_production.py 的預設），或由反向代理以房間為單位做 sticky routing。
+"""
+import atexit
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from flask import Flask, has_app_context
+from sqlalchemy import bindparam
+from sqlalchemy.orm import joinedload
+
+from models import db, GameRoom, GameSession, RoomQuestion, PlayerAnswer, Question
+from services.grading import grader
+from services.leaderboard import Leaderboard
+from services.payloads import question_payloads, encode
+from services.user_cache import user_cache
+
+# 回合截止後仍接受答案的寬限時間（秒），涵蓋網路延遲與排程器輪詢間隔
+ANSWER_GRACE_SECONDS = 1.0
+
+
+class DurableWriteError(Exception):
+    """背景寫入工作失敗，工作已放回佇列等待重試"""
+
+
+class RoomStateError(Exception):
+    """房間狀態操作錯誤（附帶 HTTP 狀態碼）"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+class PlayerState:
+    """玩家在房間中的即時統計"""
+    __slots__ = ('user_id', 'session_id', 'username', 'score', 'correct_answers', 'total_answers',
+                 'total_time', 'joined_at', 'left_at')
+
+    def __init__(self, session: GameSession, total_time: float = 0.0):
+        self.user_id = session.user_id
+        self.session_id = session.id
+        self.username: Optional[str] = None  # 載入房間時填入，排名不必再查詢使用者
+        self.score = session.score or 0
+        self.correct_answers = session.correct_answers or 0
+        self.total_answers = session.total_answers or 0
+        self.total_time = total_time
+        self.joined_at = session.joined_at
+        self.left_at = session.left_at
+
+    def to_ranking(self, room_id: str, rank: int) -> Dict[str, Any]:
+        """轉換為排名資料（欄位與 GameSession.room_players 相同）"""
+        return {
+            'id': self.session_id,
+            'user_id': self.user_id,
+            'room_id': room_id,
+            'score': self.score,
+            'correct_answers': self.correct_answers,
+            'total_answers': self.total_answers,
+            'accuracy': round(self.correct_answers / self.total_answers * 100, 2) if self.total_answers > 0 else 0,
+            'joined_at': self.joined_at.isoformat() if self.joined_at else None,
+            'left_at': self.left_at.isoformat() if self.left_at else None,
+            'username': self.username,
+            'time_taken': round(self.total_time, 2),
+            'rank': rank
+        }
+
+
+class RoundState:
+    """單一回合的題目與已作答名單"""
+    __slots__ = ('number', 'room_question_id', 'question_id', 'question_type', 'answer',
+                 'key', 'explanation', 'time_limit', 'payload_prefix', 'answered')
+
+    def __init__(self, number: int, room_question: RoomQuestion, question: Question):
+        self.number = number
+        self.room_question_id = room_question.id
+        self.question_id = question.id
+        self.question_type = question.question_type
+        self.answer = question.answer
+        self.key = grader.key_for(question)
+        self.explanation = question.explanation
+        self.time_limit = room_question.time_limit or 30
+        # 題目快取的 JSON 去掉結尾的 }，接上回合欄位，回應時再補上玩家相關欄位
+        self.payload_prefix = b''.join((
+            b'{"question":', question_payloads.get_or_build(question)[:-1],
+            b',"room_question_id":', encode(self.room_question_id),
+            b',"time_limit":', encode(self.time_limit)
+        ))
+        self.answered = set()
+
+
+class RoomState:
+    """進行中房間的權威狀態"""
+    __slots__ = ('room_id', 'created_by', 'status', 'current_round', 'total_rounds',
+                 'rounds', 'players', 'leaderboard', 'round_deadline', 'round_ends_at', 'lock')
+
+    def __init__(self, room: GameRoom, sessions: Iterable[GameSession],
+                 rounds: Iterable[Tuple[RoomQuestion, Question]],
+                 total_times: Optional[Dict[str, float]] = None):
+        total_times = total_times or {}
+        self.room_id = room.id
+        self.created_by = room.created_by
+        self.status = room.status
+        self.current_round = room.current_round
+        self.total_rounds = room.total_rounds
+        self.players = {s.user_id: PlayerState(s, total_times.get(s.id, 0.0)) for s in sessions}
+        self.leaderboard = Leaderboard(
+            (p.user_id, p.score, p.total_time) for p in self.players.values()
+        )
+        ordered = sorted(rounds, key=lambda pair: pair[0].round_number)
+        self.rounds = [RoundState(rq.round_number, rq, q) for rq, q in ordered]
+        self.round_deadline: Optional[float] = None  # time.monotonic() 時間，由回合排程器設定
+        self.round_ends_at: Optional[float] = None  # epoch 秒數，提供給客戶端
+        self.lock = threading.Lock()
+
+    def current_round_state(self) -> Optional[RoundState]:
+        """取得當前回合"""
+        index = self.current_round - 1
+        if index < 0 or index >= len(self.rounds):
+            return None
+        return self.rounds[index]
+
+    def has_answered(self, user_id: str) -> bool:
+        """玩家是否已回答當前回合"""
+        round_state = self.current_round_state()
+        return round_state is not None and user_id in round_state.answered
+
+    def all_answered(self) -> bool:
+        """所有玩家是否都已回答當前回合"""
+        round_state = self.current_round_state()
+        return round_state is not None and len(round_state.answered) >= len(self.players)
+
+    def deadline_passed(self) -> bool:
+        """當前回合的作答時間（含寬限）是否已結束"""
+        return self.round_deadline is not None and time.monotonic() > self.round_deadline + ANSWER_GRACE_SECONDS
+
+    def submit_answer(self, user_id: str, answer: Any, time_taken: float) -> Dict[str, Any]:
+        """批改並記錄答案，回傳批改結果"""
+        with self.lock:
+            if self.status != 'in_progress':
+                raise RoomStateError('遊戲未進行中')
+
+            player = self.players.get(user_id)
+            if not player:
+                raise RoomStateError('不在遊戲中')
+
+            round_state = self.current_round_state()
+            if not round_state:
+                raise RoomStateError('題目不存在', 404)
+
+            if user_id in round_state.answered:
+                raise RoomStateError('已回答此題')
+
+            if self.deadline_passed():
+                raise RoomStateError('作答時間已結束')
+
+            is_correct = grade_answer(round_state, answer)
+            score_delta = max(1, int(30 - time_taken)) if is_correct else 0  # 根據答題時間給分
+
+            round_state.answered.add(user_id)
+            player.total_answers += 1
+            player.total_time += time_taken
+            if is_correct:
+                player.correct_answers += 1
+                player.score += score_delta
+            self.leaderboard.update(user_id, player.score, player.total_time)
+
+        return {
+            'player': player,
+            'round': round_state,
+            'is_correct': is_correct,
+            'score_delta': score_delta
+        }
+
+    def rankings(self, mode: str = 'all', k: int = 10, user_id: Optional[str] = None,
+                 radius: int = 2) -> list:
+        """由排行榜取得排名（mode 可為 all、top_k、around_me）"""
+        with self.lock:
+            if mode == 'top_k':
+                ranked = self.leaderboard.top(k)
+            elif mode == 'around_me':
+                ranked = self.leaderboard.around(user_id, radius)
+            else:
+                ranked = self.leaderboard.ordered()
+            return [self.players[uid].to_ranking(self.room_id, rank) for rank, uid in ranked]
+
+
+def grade_answer(round_state: RoundState, answer: Any) -> bool:
+    """以編譯後的答案鍵驗證答案"""
+    return round_state.key.grade(answer)
+
+
+def bind_usernames(state: RoomState) -> None:
+    """整批取得玩家的使用者名稱並存入玩家狀態（asyncio 模式的排名端點沒有資料庫工作階段可用）"""
+    user_cache.prime(state.players)
+    for player in state.players.values():
+        player.username = user_cache.get_username(player.user_id)
+
+
+def persist_answer(session_id: str, room_question_id: str, answer: Any, is_correct: bool,
+                   time_taken: float, score_delta: int, answered_at: datetime) -> None:
+    """將答案與會話統計寫入資料庫（由寫入器呼叫）"""
+    db.session.add(PlayerAnswer(
+        session_id=session_id,
+        room_question_id=room_question_id,
+        answer=answer,
+        is_correct=is_correct,
+        time_taken=time_taken,
+        answered_at=answered_at
+    ))
+    GameSession.query.filter_by(id=session_id).update({
+        GameSession.total_answers: GameSession.total_answers + 1,
+        GameSession.correct_answers: GameSession.correct_answers + (1 if is_correct else 0),
+        GameSession.score: GameSession.score + score_delta
+    }, synchronize_session=False)
+
+
+class AnswerBuffer:
+    """答案寫回緩衝（write-behind 模式）
+
+    批改後的答案先累積在記憶體中，達到筆數上限、時間間隔或回合結束時，
+    以一次批次 INSERT 加上每個會話一次的累加 UPDATE 寫入資料庫。
+    """
+
+    def __init__(self, max_rows: int = 500, interval: float = 1.0):
+        self._rows: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self.max_rows = max_rows
+        self.interval = interval
+        self.flushes = 0
+        self.rows_flushed = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add(self, row: Dict[str, Any]) -> bool:
+        """加入一筆答案，回傳是否已達批次上限"""
+        with self._lock:
+            self._rows.append(row)
+            return len(self._rows) >= self.max_rows
+
+    def is_due(self) -> bool:
+        """是否已超過寫回間隔"""
+        return bool(self._rows) and time.monotonic() - self._last_flush >= self.interval
+
+    def flush(self) -> int:
+        """將緩衝中的答案寫入資料庫，失敗時放回緩衝等待重試"""
+        with self._lock:
+            rows, self._rows = self._rows, []
+            self._last_flush = time.monotonic()
+        if not rows:
+            return 0
+
+        try:
+            write_answer_batch(rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            with self._lock:
+                self._rows[:0] = rows
+            raise
+
+        self.flushes += 1
+        self.rows_flushed += len(rows)
+        return len(rows)
+
+
+def write_answer_batch(rows: List[Dict[str, Any]]) -> None:
+    """批次寫入答案並依會話彙總更新統計"""
+    db.session.execute(
+        PlayerAnswer.__table__.insert(),
+        [{key: value for key, value in row.items() if key != 'score_delta'} for row in rows]
+    )
+
+    totals: Dict[str, List[int]] = {}
+    for row in rows:
+        counters = totals.setdefault(row['session_id'], [0, 0, 0])
+        counters[0] += 1
+        counters[1] += 1 if row['is_correct'] else 0
+        counters[2] += row['score_delta']
+
+    sessions = GameSession.__table__
+    db.session.execute(
+        sessions.update().where(sessions.c.id == bindparam('b_session_id')).values(
+            total_answers=sessions.c.total_answers + bindparam('b_total'),
+            correct_answers=sessions.c.correct_answers + bindparam('b_correct'),
+            score=sessions.c.score + bindparam('b_score')
+        ),
+        [
+            {'b_session_id': session_id, 'b_total': total, 'b_correct': correct, 'b_score': score}
+            for session_id, (total, correct, score) in totals.items()
+        ]
+    )
+
+
+class DurableWriter:
+    """背景持久化寫入器
+
+    工作先放入佇列，由 socketio 背景任務定期取出並在應用程式上下文中提交；
+    ROOM_STATE_ASYNC_WRITES 關閉時（例如測試環境）則在呼叫端同步執行。
+    失敗的工作放回佇列，下次寫入時重試。
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._drain_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._app = None
+        self._async = True
+        self._interval = 0.05
+        self._worker_started = False
+        self._periodic: List[Callable[[], None]] = []
+        self.failures = 0
+
+    def init_app(self, app: Flask) -> None:
+        """綁定應用程式"""
+        self._app = app
+        self._async = app.config.get('ROOM_STATE_ASYNC_WRITES', True)
+        self._interval = app.config.get('ROOM_STATE_WRITE_INTERVAL', 0.05)
+
+    @property
+    def pending(self) -> int:
+        """佇列中尚未寫入的工作數"""
+        return self._queue.qsize()
+
+    def submit(self, job: Callable[..., None], *args: Any) -> None:
+        """提交持久化工作"""
+        if not self._async:
+            if not self._run(job, args):
+                self._queue.put((job, args))
+            return
+
+        self._queue.put((job, args))
+        self.start()
+
+    def add_periodic(self, hook: Callable[[], None]) -> None:
+        """註冊每次背景輪詢時執行的檢查"""
+        if hook not in self._periodic:
+            self._periodic.append(hook)
+
+    def drain(self) -> None:
+        """同步寫入所有待處理工作（遊戲結束時確保資料完整）
+
+        有工作失敗時放回佇列並拋出 DurableWriteError。
+        """
+        failed = []
+        with self._drain_lock:
+            while True:
+                try:
+                    job, args = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if not self._run(job, args):
+                    failed.append((job, args))
+            for item in failed:
+                self._queue.put(item)
+        if failed:
+            raise DurableWriteError(f'{len(failed)} 個持久化工作失敗，已放回佇列')
+
+    def start(self) -> None:
+        """啟動背景寫入任務（同步模式下不啟動）"""
+        if not self._async or self._worker_started:
+            return
+        with self._start_lock:
+            if self._worker_started:
+                return
+            from app import socketio
+            socketio.start_background_task(self._worker_loop)
+            self._worker_started = True
+
+    def _worker_loop(self) -> None:
+        from app import socketio
+        while True:
+            try:
+                self.drain()
+            except DurableWriteError:
+                pass  # 失敗的工作已記錄並放回佇列，下次輪詢重試
+            for hook in self._periodic:
+                self._run(hook, ())
+            socketio.sleep(self._interval)
+
+    def _run(self, job: Callable[..., None], args: Tuple[Any, ...]) -> bool:
+        if has_app_context():
+            return self._execute(job, args)
+        with self._app.app_context():
+            return self._execute(job, args)
+
+    def _execute(self, job: Callable[..., None], args: Tuple[Any, ...]) -> bool:
+        """執行並提交一個工作，回傳是否成功"""
+        try:
+            job(*args)
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            self.failures += 1
+            self._app.logger.error(f'持久化工作失敗 {job.__name__}: {e}')
+            return False
+
+
+class RoomStateRegistry:
+    """房間狀態註冊表（每個 worker 一份）"""
+
+    def __init__(self):
+        self._rooms: Dict[str, RoomState] = {}
+        self._lock = threading.Lock()
+        self._app = None
+        self._exit_registered = False
+        self.writer = DurableWriter()
+        self.answers = AnswerBuffer()
+        self.write_behind = False
+
+    def init_app(self, app: Flask) -> None:
+        """綁定應用程式"""
+        self._app = app
+        self.writer.init_app(app)
+        self.write_behind = app.config.get('ANSWER_WRITE_BEHIND', False)
+        self.answers.max_rows = app.config.get('ANSWER_BATCH_SIZE', 500)
+        self.answers.interval = app.config.get('ANSWER_FLUSH_INTERVAL', 1.0)
+        self.writer.add_periodic(self._flush_due_answers)
+        if not self._exit_registered:
+            atexit.register(self.shutdown)
+            self._exit_registered = True
+        app.extensions['room_states'] = self
+
+    def get(self, room_id: str) -> Optional[RoomState]:
+        """取得記憶體中的房間狀態"""
+        return self._rooms.get(room_id)
+
+    def get_or_load(self, room_id: str) -> Optional[RoomState]:
+        """取得房間狀態，若不在記憶體中則從資料庫補載"""
+        state = self._rooms.get(room_id)
+        if state:
+            return state
+        return self.load(room_id)
+
+    def register(self, room: GameRoom, sessions: Iterable[GameSession],
+                 rounds: Iterable[Tuple[RoomQuestion, Question]]) -> RoomState:
+        """以已取得的物件建立房間狀態（start_game 使用，不需再查詢）"""
+        return self.add(RoomState(room, sessions, rounds))
+
+    def add(self, state: RoomState) -> RoomState:
+        """加入已建立的房間狀態"""
+        bind_usernames(state)
+        with self._lock:
+            self._rooms[state.room_id] = state
+        return state
+
+    def load(self, room_id: str) -> Optional[RoomState]:
+        """從資料庫載入進行中的房間"""
+        room = GameRoom.query.get(room_id)
+        if not room or room.status != 'in_progress':
+            return None
+
+        sessions = GameSession.query.filter_by(room_id=room_id).all()
+        room_questions = RoomQuestion.query.options(
+            joinedload(RoomQuestion.question).joinedload(Question.category)
+        ).filter_by(room_id=room_id).all()
+        answered = db.session.query(
+            PlayerAnswer.room_question_id, PlayerAnswer.session_id, PlayerAnswer.time_taken
+        ).join(GameSession, PlayerAnswer.session_id == GameSession.id).filter(
+            GameSession.room_id == room_id
+        ).all()
+
+        total_times: Dict[str, float] = {}
+        for _, session_id, time_taken in answered:
+            total_times[session_id] = total_times.get(session_id, 0.0) + (time_taken or 0)
+
+        state = RoomState(room, sessions, [(rq, rq.question) for rq in room_questions], total_times)
+        user_by_session = {p.session_id: p.user_id for p in state.players.values()}
+        answered_by_round = {r.room_question_id: r.answered for r in state.rounds}
+        for room_question_id, session_id, _ in answered:
+            if room_question_id in answered_by_round and session_id in user_by_session:
+                answered_by_round[room_question_id].add(user_by_session[session_id])
+
+        bind_usernames(state)
+        with self._lock:
+            return self._rooms.setdefault(room_id, state)
+
+    def discard(self, room_id: str) -> None:
+        """移除房間狀態"""
+        with self._lock:
+            self._rooms.pop(room_id, None)
+
+    def record_answer(self, state: RoomState, user_id: str, answer: Any,
+                      time_taken: float) -> Dict[str, Any]:
+        """批改答案並排入背景持久化"""
+        result = state.submit_answer(user_id, answer, time_taken)
+
+        if self.write_behind:
+            is_full = self.answers.add({
+                'id': str(uuid.uuid4()),
+                'session_id': result['player'].session_id,
+                'room_question_id': result['round'].room_question_id,
+                'answer': answer,
+                'is_correct': result['is_correct'],
+                'time_taken': time_taken,
+                'answered_at': datetime.utcnow(),
+                'score_delta': result['score_delta']
+            })
+            if is_full:
+                self.writer.submit(self.answers.flush)
+            self.writer.start()
+            return result
+
+        self.writer.submit(
+            persist_answer,
+            result['player'].session_id,
+            result['round'].room_question_id,
+            answer,
+            result['is_correct'],
+            time_taken,
+            result['score_delta'],
+            datetime.utcnow()
+        )
+        return result
+
+    def advance(self, state: RoomState, require_all_answered: bool = True,
+                expected_round: Optional[int] = None) -> bool:
+        """進入下一回合，回傳遊戲是否已結束"""
+        with state.lock:
+            if state.status != 'in_progress':
+                raise RoomStateError('遊戲未進行中')
+            if expected_round is not None and state.current_round != expected_round:
+                raise RoomStateError('回合已結束')
+            # 作答時間已結束時不再等待未作答的玩家（未啟用回合排程器時由房主推進）
+            if require_all_answered and not state.all_answered() and not state.deadline_passed():
+                raise RoomStateError('還有玩家未答題')
+
+            is_finished = state.current_round >= state.total_rounds
+            if is_finished:
+                state.status = 'finished'
+                values = {'status': 'finished', 'ended_at': datetime.utcnow()}
+            else:
+                state.current_round += 1
+                values = {'current_round': state.current_round}
+
+        if not is_finished:
+            if self.write_behind:
+                self.writer.submit(self.answers.flush)
+            GameRoom.query.filter_by(id=state.room_id).update(values)
+            db.session.commit()
+            return False
+
+        try:
+            # 遊戲結束前確保所有答案都已寫入
+            self.writer.drain()
+            self.answers.flush()
+            GameRoom.query.filter_by(id=state.room_id).update(values)
+            db.session.commit()
+        except Exception:
+            # 寫入失敗時恢復為進行中，讓之後的推進可以重試
+            db.session.rollback()
+            with state.lock:
+                state.status = 'in_progress'
+            raise
+
+        self.discard(state.room_id)
+        return True
+
+    def stats(self) -> dict:
+        """寫入佇列與緩衝統計"""
+        return {
+            'write_behind': self.write_behind,
+            'pending_jobs': self.writer.pending,
+            'failed_jobs': self.writer.failures,
+            'buffered_answers': len(self.answers),
+            'flushes': self.answers.flushes,
+            'rows_flushed': self.answers.rows_flushed
+        }
+
+    def shutdown(self) -> None:
+        """程序結束前寫入所有待處理資料"""
+        if not self._app:
+            return
+        with self._app.app_context():
+            try:
+                self.writer.drain()
+            except DurableWriteError as e:
+                self._app.logger.error(f'結束前寫入工作失敗: {e}')
+            try:
+                self.answers.flush()
+            except Exception as e:
+                self._app.logger.error(f'結束前寫入答案失敗: {e}')
+
+    def _flush_due_answers(self) -> None:
+        if self.answers.is_due():
+            self.answers.flush()
+
+
+room_states = RoomStateRegistry()
@@ -0,0 +1,178 @@
+"""
+伺服器端回合計時排程器
+
+所有房間的回合截止時間放在同一個 heap 中，由單一背景任務輪詢；
+回合在 time_limit 到期、或所有玩家作答後的短暫公布時間結束時自動推進，
+並由伺服器廣播 next_round / game_finished。
+"""
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import Flask
+
+from models import db
+from services.room_state import room_states, RoomState, RoomStateError
+from services.room_events import room_events
+from services.room_snapshots import room_snapshots
+
+
+class RoundScheduler:
+    """所有房間共用的回合截止時間 heap"""
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, str, int]] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._app: Optional[Flask] = None
+        self._started = False
+        self.enabled = True
+        self.tick = 0.05
+        self.result_delay = 3.0
+        self.rounds_closed = 0
+        self.max_drift = 0.0
+        self.total_drift = 0.0
+
+    def init_app(self, app: Flask) -> None:
+        """綁定應用程式"""
+        self._app = app
+        self.enabled = app.config.get('AUTO_ADVANCE_ROUNDS', True)
+        self.tick = app.config.get('ROUND_SCHEDULER_TICK', 0.05)
+        self.result_delay = app.config.get('ROUND_RESULT_DELAY', 3.0)
+        with self._lock:
+            self._heap.clear()
+        self.rounds_closed = 0
+        self.max_drift = self.total_drift = 0.0
+        app.extensions['round_scheduler'] = self
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def open_round(self, state: RoomState) -> None:
+        """開始當前回合的計時"""
+        round_state = state.current_round_state()
+        if not round_state:
+            return
+        now = time.time()
+        state.round_deadline = time.monotonic() + round_state.time_limit
+        state.round_ends_at = now + round_state.time_limit
+        if self.enabled:
+            self._push(state.round_deadline, state.room_id, state.current_round)
+
+    def close_early(self, state: RoomState) -> None:
+        """所有玩家都已作答：保留公布答案的時間後結束回合"""
+        if not self.enabled:
+            return
+        # 同一回合的多個最後作答請求可能同時到達，檢查與更新截止時間需在房間鎖內完成
+        with state.lock:
+            if state.round_deadline is None:
+                return
+            deadline = time.monotonic() + self.result_delay
+            if deadline >= state.round_deadline:
+                return
+            state.round_deadline = deadline
+            round_number = state.current_round
+        self._push(deadline, state.room_id, round_number)
+
+    def run_due(self, now: Optional[float] = None) -> int:
+        """結束所有已到期的回合，回傳處理數"""
+        now = time.monotonic() if now is None else now
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                due.append(heapq.heappop(self._heap))
+
+        closed = 0
+        for deadline, _, room_id, round_number in due:
+            state = room_states.get(room_id)
+            # 回合已被提前結束或重新排程的舊項目直接略過
+            if (not state or state.status != 'in_progress' or state.current_round != round_number
+                    or state.round_deadline != deadline):
+                continue
+            try:
+                advance_round(state, require_all_answered=False, expected_round=round_number)
+            except RoomStateError:
+                continue
+            except Exception as e:
+                # 單一房間失敗不影響同一批到期的其他房間
+                db.session.rollback()
+                self._app.logger.error(f'房間 {room_id} 回合推進失敗: {e}')
+                continue
+            drift = max(now - deadline, 0.0)
+            self.max_drift = max(self.max_drift, drift)
+            self.total_drift += drift
+            self.rounds_closed += 1
+            closed += 1
+        return closed
+
+    def start(self) -> None:
+        """啟動背景計時任務"""
+        if self._started or not self.enabled:
+            return
+        with self._start_lock:
+            if self._started:
+                return
+            from app import socketio
+            socketio.start_background_task(self._loop)
+            self._started = True
+
+    def stats(self) -> Dict[str, Any]:
+        """排程統計"""
+        return {
+            'enabled': self.enabled,
+            'scheduled': len(self._heap),
+            'rounds_closed': self.rounds_closed,
+            'max_drift_ms': round(self.max_drift * 1000, 2),
+            'avg_drift_ms': round(self.total_drift / self.rounds_closed * 1000, 2) if self.rounds_closed else 0
+        }
+
+    def _push(self, deadline: float, room_id: str, round_number: int) -> None:
+        with self._lock:
+            heapq.heappush(self._heap, (deadline, next(self._seq), room_id, round_number))
+        self.start()
+
+    def _loop(self) -> None:
+        from app import socketio
+        while True:
+            try:
+                with self._app.app_context():
+                    self.run_due()
+            except Exception as e:
+                self._app.logger.error(f'回合排程執行失敗: {e}')
+
+            with self._lock:
+                wait = self._heap[0][0] - time.monotonic() if self._heap else self.tick
+            socketio.sleep(min(max(wait, 0.0), self.tick))
+
+
+def advance_round(state: RoomState, require_all_answered: bool = True,
+                  expected_round: Optional[int] = None) -> Dict[str, Any]:
+    """推進回合並廣播 next_round / game_finished"""
+    is_finished = room_states.advance(state, require_all_answered, expected_round)
+    room_snapshots.apply(state.room_id, fields={
+        'status': state.status,
+        'current_round': state.current_round
+    })
+
+    if is_finished:
+        rankings = state.rankings()
+        room_events.emit('game_finished', {
+            'rankings': rankings
+        }, room=state.room_id)
+        return {'finished': True, 'rankings': rankings}
+
+    round_scheduler.open_round(state)
+    round_state = state.current_round_state()
+    room_events.emit('next_round', {
+        'current_round': state.current_round,
+        'total_rounds': state.total_rounds,
+        'time_limit': round_state.time_limit if round_state else None,
+        'ends_at': state.round_ends_at
+    }, room=state.room_id)
+    return {'finished': False, 'current_round': state.current_round}
+
+
+round_scheduler = RoundScheduler()
@@ -0,0 +1,134 @@
+"""
+使用者資料快取
+
+廣播事件只需要使用者名稱，不必每次都查詢 users 表格。
+快取為行程內共用的 LRU（有容量上限與 TTL），房間載入時整批預先填入，
+使用者資料更新或刪除時自動失效。
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from flask import Flask
+from sqlalchemy import event
+
+from models import db, User
+
+
+class UserProfileCache:
+    """使用者名稱 LRU 快取"""
+
+    def __init__(self, max_size: int = 10000, ttl: float = 300):
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def init_app(self, app: Flask) -> None:
+        """綁定應用程式並清空快取"""
+        self.max_size = app.config.get('USER_CACHE_SIZE', self.max_size)
+        self.ttl = app.config.get('USER_CACHE_TTL', self.ttl)
+        self.clear()
+        app.extensions['user_cache'] = self
+
+    def get_username(self, user_id: str) -> Optional[str]:
+        """取得使用者名稱，未命中時查詢資料庫並寫入快取"""
+        username = self._lookup(user_id)
+        if username is not None:
+            return username
+
+        user = db.session.get(User, user_id)
+        if not user:
+            return None
+        self.put(user.id, user.username)
+        return user.username
+
+    async def aget_username(self, user_id: str, session) -> Optional[str]:
+        """取得使用者名稱（asyncio 模式），未命中時以 AsyncSession 查詢"""
+        username = self._lookup(user_id)
+        if username is not None:
+            return username
+
+        username = await session.scalar(db.select(User.username).where(User.id == user_id))
+        if username is None:
+            return None
+        self.put(user_id, username)
+        return username
+
+    def prime(self, user_ids: Iterable[str]) -> None:
+        """整批預先載入尚未快取的使用者"""
+        user_ids = set(user_ids)
+        missing = [user_id for user_id in user_ids if self._peek(user_id) is None]
+        with self._lock:
+            self.hits += len(user_ids) - len(missing)
+            self.misses += len(missing)
+        if not missing:
+            return
+
+        rows = db.session.query(User.id, User.username).filter(User.id.in_(missing)).all()
+        for user_id, username in rows:
+            self.put(user_id, username)
+
+    def put(self, user_id: str, username: str) -> None:
+        """寫入快取"""
+        with self._lock:
+            self._entries[user_id] = (username, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id: str) -> None:
+        """使快取項目失效"""
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        """清空快取與統計"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        """命中統計"""
+        total = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / total, 4) if total else 0
+        }
+
+    def _lookup(self, user_id: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and entry[1] > time.monotonic():
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[0]
+            if entry:
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+
+    def _peek(self, user_id: str) -> Optional[str]:
+        entry = self._entries.get(user_id)
+        if entry and entry[1] > time.monotonic():
+            return entry[0]
+        return None
+
+
+user_cache = UserProfileCache()
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_user(mapper, connection, target: User) -> None:
+    """使用者資料變更時使快取失效"""
+    user_cache.invalidate(target.id)
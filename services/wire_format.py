@@ -0,0 +1,144 @@
+"""
+Socket.IO 傳輸格式協商（JSON / MessagePack）
+
+伺服器啟用 SOCKETIO_MSGPACK 且已安裝 msgpack 時，客戶端可在連線網址帶入
+?wire=msgpack 改用 MessagePack（socket.io 的 msgpack 版客戶端）；其他客戶端
+照常使用 JSON，兩種客戶端可在同一房間。
+
+廣播時 python-socketio 只編碼一次 JSON 封包再逐一送給房間成員；送給
+MessagePack 客戶端前才轉換，並把轉換結果掛在該封包上，同一次廣播只轉換一次。
+客戶端送來的 MessagePack 封包轉回 JSON 封包後交給原本的處理流程。
+含二進位附件的事件不轉換（本專案的事件都不含二進位資料）。
+"""
+import threading
+from typing import List, Set
+from urllib.parse import parse_qs
+
+from engineio import packet as eio_packet
+from flask import Flask
+from socketio import packet
+
+try:
+    from socketio.msgpack_packet import MsgPackPacket
+except ImportError:  # 未安裝 msgpack 時只提供 JSON
+    MsgPackPacket = None
+
+WIRE_QUERY_PARAM = 'wire'
+
+
+class WireFormats:
+    """依連線選擇 Socket.IO 封包格式"""
+
+    def __init__(self):
+        self.enabled = False
+        self._msgpack_sids: Set[str] = set()
+        self._lock = threading.Lock()
+        self.translated = 0
+
+    def init_app(self, app: Flask, server) -> None:
+        """在 socketio.init_app 之後掛上格式轉換"""
+        self.enabled = bool(app.config.get('SOCKETIO_MSGPACK')) and MsgPackPacket is not None
+        with self._lock:
+            self._msgpack_sids.clear()
+            self.translated = 0
+        app.extensions['wire_formats'] = self
+        if self.enabled:
+            self._install(server)
+
+    def formats(self) -> List[str]:
+        """伺服器支援的格式（客戶端連線前查詢）"""
+        return ['json', 'msgpack'] if self.enabled else ['json']
+
+    def uses_msgpack(self, eio_sid: str) -> bool:
+        return eio_sid in self._msgpack_sids
+
+    def stats(self) -> dict:
+        return {
+            'formats': self.formats(),
+            'msgpack_clients': len(self._msgpack_sids),
+            'translated_packets': self.translated
+        }
+
+    def _install(self, server) -> None:
+        """包裝伺服器的連線與收送方法，並重新註冊 Engine.IO 事件（每個伺服器只包裝一次）"""
+        if getattr(server, '_wire_formats_installed', False):
+            return
+        server._wire_formats_installed = True
+        handle_connect = server._handle_eio_connect
+        handle_message = server._handle_eio_message
+        handle_disconnect = server._handle_eio_disconnect
+        send_packet = server._send_packet
+        send_eio_packet = server._send_eio_packet
+
+        def on_connect(eio_sid, environ):
+            query = parse_qs(environ.get('QUERY_STRING', ''))
+            if self.enabled and query.get(WIRE_QUERY_PARAM, [''])[0] == 'msgpack':
+                with self._lock:
+                    self._msgpack_sids.add(eio_sid)
+            return handle_connect(eio_sid, environ)
+
+        def on_message(eio_sid, data):
+            if eio_sid in self._msgpack_sids and isinstance(data, bytes) \
+                    and eio_sid not in server._binary_packet:
+                for encoded in _to_json(MsgPackPacket(encoded_packet=data), server.packet_class):
+                    handle_message(eio_sid, encoded)
+                return
+            handle_message(eio_sid, data)
+
+        def on_disconnect(eio_sid, *args):
+            try:
+                return handle_disconnect(eio_sid, *args)
+            finally:
+                with self._lock:
+                    self._msgpack_sids.discard(eio_sid)
+
+        def send(eio_sid, pkt):
+            if eio_sid in self._msgpack_sids:
+                server.eio.send(eio_sid, _to_msgpack(pkt))
+                return
+            send_packet(eio_sid, pkt)
+
+        def send_eio(eio_sid, eio_pkt):
+            if eio_sid in self._msgpack_sids:
+                eio_pkt = self._translate(eio_pkt, server.packet_class)
+            send_eio_packet(eio_sid, eio_pkt)
+
+        server._handle_eio_connect = on_connect
+        server._handle_eio_message = on_message
+        server._handle_eio_disconnect = on_disconnect
+        server._send_packet = send
+        server._send_eio_packet = send_eio
+        server.eio.on('connect', on_connect)
+        server.eio.on('message', on_message)
+        server.eio.on('disconnect', on_disconnect)
+
+    def _translate(self, eio_pkt, packet_class):
+        """把預先編碼的 JSON 廣播封包轉成 MessagePack（每個封包只轉換一次）"""
+        translated = getattr(eio_pkt, '_msgpack', None)
+        if translated is not None:
+            return translated
+        if eio_pkt.packet_type != eio_packet.MESSAGE or not isinstance(eio_pkt.data, str):
+            return eio_pkt
+
+        pkt = packet_class(encoded_packet=eio_pkt.data)
+        if pkt.attachment_count:
+            return eio_pkt
+        translated = eio_packet.Packet(eio_packet.MESSAGE, _to_msgpack(pkt))
+        eio_pkt._msgpack = translated
+        with self._lock:
+            self.translated += 1
+        return translated
+
+
+def _to_msgpack(pkt) -> bytes:
+    packet_type = {packet.BINARY_EVENT: packet.EVENT, packet.BINARY_ACK: packet.ACK}.get(
+        pkt.packet_type, pkt.packet_type)
+    return MsgPackPacket(packet_type, data=pkt.data, namespace=pkt.namespace, id=pkt.id).encode()
+
+
+def _to_json(pkt, packet_class) -> list:
+    encoded = packet_class(pkt.packet_type, data=pkt.data, namespace=pkt.namespace, id=pkt.id).encode()
+    return encoded if isinstance(encoded, list) else [encoded]
+
+
+wire_formats = WireFormats()
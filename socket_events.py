@@ -1,16 +1,70 @@
+from flask import request
 from flask_socketio import emit, join_room, leave_room
-from app import socketio, db
-from models import User, GameRoom, GameSession
+from app import socketio
+from models import GameSession
 from flask_jwt_extended import decode_token
+from services.room_events import room_events
+from services.room_state import room_states
+from services.user_cache import user_cache
+from typing import NamedTuple, Optional
+
+class SocketIdentity(NamedTuple):
+    """連線綁定的使用者身分"""
+    user_id: str
+    username: str
+
+# sid → 已驗證的使用者身分（連線時驗證一次，之後的事件直接使用）
+connected_users = {}
+
+def authenticate_token(token: str) -> Optional[SocketIdentity]:
+    """驗證 JWT token 並取得使用者身分"""
+    try:
+        payload = decode_token(token)
+        user_id = payload['sub']
+    except Exception:
+        return None
+    
+    username = user_cache.get_username(user_id)
+    if username is None:
+        return None
+    
+    return SocketIdentity(user_id, username)
+
+def current_identity(data: dict) -> Optional[SocketIdentity]:
+    """取得目前連線的使用者身分
+    
+    連線時未提供 token 的舊版客戶端，會在第一次帶 token 的事件中驗證並綁定。
+    """
+    identity = connected_users.get(request.sid)
+    if identity:
+        return identity
+    
+    token = (data or {}).get('token')
+    if not token:
+        return None
+    
+    identity = authenticate_token(token)
+    if identity:
+        connected_users[request.sid] = identity
+    return identity
 
 @socketio.on('connect')
-def handle_connect():
+def handle_connect(auth=None):
     """處理連線事件"""
+    token = (auth or {}).get('token')
+    
+    if token:
+        identity = authenticate_token(token)
+        if not identity:
+            raise ConnectionRefusedError('無效的 token')
+        connected_users[request.sid] = identity
+    
     print('Client connected')
 
 @socketio.on('disconnect')
 def handle_disconnect():
     """處理斷線事件"""
+    connected_users.pop(request.sid, None)
     print('Client disconnected')
 
 @socketio.on('join_room')
@@ -18,33 +72,27 @@ def handle_join_room(data):
     """處理加入房間事件"""
     try:
         room_id = data.get('room_id')
-        token = data.get('token')
         
-        if not room_id or not token:
+        if not room_id:
             emit('error', {'message': '缺少必要參數'})
             return
         
-        # 驗證 JWT token
-        try:
-            payload = decode_token(token)
-            user_id = payload['sub']
-        except:
+        identity = current_identity(data)
+        if not identity:
             emit('error', {'message': '無效的 token'})
             return
         
-        # 檢查房間是否存在
-        room = GameRoom.query.get(room_id)
-        if not room:
-            emit('error', {'message': '房間不存在'})
-            return
-        
-        # 檢查使用者是否在房間中
-        session = GameSession.query.filter_by(
-            user_id=user_id, 
-            room_id=room_id
-        ).first()
-        
-        if not session:
+        # 檢查使用者是否在房間中（進行中的房間直接查記憶體狀態）
+        state = room_states.get(room_id)
+        if state:
+            is_member = identity.user_id in state.players
+        else:
+            is_member = GameSession.query.filter_by(
+                user_id=identity.user_id,
+                room_id=room_id
+            ).first() is not None
+        
+        if not is_member:
             emit('error', {'message': '不在房間中'})
             return
         
@@ -52,14 +100,13 @@ def handle_join_room(data):
         join_room(room_id)
         
         # 通知其他玩家
-        user = User.query.get(user_id)
-        emit('player_joined_socket', {
-            'user_id': user_id,
-            'username': user.username
-        }, room=room_id, include_self=False)
-        
-        print(f'User {user.username} joined room {room_id}')
+        room_events.emit('player_joined_socket', {
+            'user_id': identity.user_id,
+            'username': identity.username
+        }, room=room_id, skip_sid=request.sid)
         
+        print(f'User {identity.username} joined room {room_id}')
+    
     except Exception as e:
         emit('error', {'message': '加入房間失敗'})
         print(f'Error joining room: {e}')
@@ -69,17 +116,13 @@ def handle_leave_room(data):
     """處理離開房間事件"""
     try:
         room_id = data.get('room_id')
-        token = data.get('token')
         
-        if not room_id or not token:
+        if not room_id:
             emit('error', {'message': '缺少必要參數'})
             return
         
-        # 驗證 JWT token
-        try:
-            payload = decode_token(token)
-            user_id = payload['sub']
-        except:
+        identity = current_identity(data)
+        if not identity:
             emit('error', {'message': '無效的 token'})
             return
         
@@ -87,14 +130,13 @@ def handle_leave_room(data):
         leave_room(room_id)
         
         # 通知其他玩家
-        user = User.query.get(user_id)
-        emit('player_left_socket', {
-            'user_id': user_id,
-            'username': user.username
-        }, room=room_id, include_self=False)
-        
-        print(f'User {user.username} left room {room_id}')
+        room_events.emit('player_left_socket', {
+            'user_id': identity.user_id,
+            'username': identity.username
+        }, room=room_id, skip_sid=request.sid)
         
+        print(f'User {identity.username} left room {room_id}')
+    
     except Exception as e:
         emit('error', {'message': '離開房間失敗'})
         print(f'Error leaving room: {e}')
@@ -104,34 +146,29 @@ def handle_submit_answer(data):
     """處理答案提交事件（WebSocket 版本）"""
     try:
         room_id = data.get('room_id')
-        token = data.get('token')
         answer = data.get('answer')
         time_taken = data.get('time_taken')
         
-        if not all([room_id, token, answer, time_taken is not None]):
+        if not all([room_id, answer, time_taken is not None]):
             emit('error', {'message': '缺少必要參數'})
             return
         
-        # 驗證 JWT token
-        try:
-            payload = decode_token(token)
-            user_id = payload['sub']
-        except:
+        identity = current_identity(data)
+        if not identity:
             emit('error', {'message': '無效的 token'})
             return
         
         # 這裡可以添加答案驗證邏輯
         # 為了簡化，我們只發送通知給其他玩家
         
-        user = User.query.get(user_id)
-        emit('answer_submitted_socket', {
-            'user_id': user_id,
-            'username': user.username,
+        room_events.emit('answer_submitted_socket', {
+            'user_id': identity.user_id,
+            'username': identity.username,
             'time_taken': time_taken
-        }, room=room_id, include_self=False)
-        
-        print(f'User {user.username} submitted answer in room {room_id}')
+        }, room=room_id, skip_sid=request.sid)
         
+        print(f'User {identity.username} submitted answer in room {room_id}')
+    
     except Exception as e:
         emit('error', {'message': '提交答案失敗'})
         print(f'Error submitting answer: {e}')
@@ -141,28 +178,23 @@ def handle_ready_for_next(data):
     """處理準備下一題事件"""
     try:
         room_id = data.get('room_id')
-        token = data.get('token')
         
-        if not room_id or not token:
+        if not room_id:
             emit('error', {'message': '缺少必要參數'})
             return
         
-        # 驗證 JWT token
-        try:
-            payload = decode_token(token)
-            user_id = payload['sub']
-        except:
+        identity = current_identity(data)
+        if not identity:
             emit('error', {'message': '無效的 token'})
             return
         
-        user = User.query.get(user_id)
-        emit('player_ready', {
-            'user_id': user_id,
-            'username': user.username
-        }, room=room_id, include_self=False)
-        
-        print(f'User {user.username} is ready for next question in room {room_id}')
+        room_events.emit('player_ready', {
+            'user_id': identity.user_id,
+            'username': identity.username
+        }, room=room_id, skip_sid=request.sid)
         
+        print(f'User {identity.username} is ready for next question in room {room_id}')
+    
     except Exception as e:
         emit('error', {'message': '準備下一題失敗'})
-        print(f'Error ready for next: {e}') 
\ No newline at end of file
+        print(f'Error ready for next: {e}')
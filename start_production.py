@@ -39,8 +39,12 @@ def check_requirements():
 def create_gunicorn_config():
     """建立 Gunicorn 配置檔案"""
     config_content = '''# Gunicorn 配置檔案
+import os
+
 bind = "0.0.0.0:5000"
-workers = 4
+# 進行中遊戲的房間狀態只存在於持有它的 worker，預設單一 worker；
+# 多個 worker 需由反向代理依房間 id 做 sticky routing（見 README）
+workers = int(os.environ.get("GUNICORN_WORKERS", "1"))
 worker_class = "gevent"
 worker_connections = 1000
 max_requests = 1000
@@ -52,6 +56,11 @@ accesslog = "logs/access.log"
 errorlog = "logs/error.log"
 loglevel = "info"
 capture_output = True
+
+def worker_exit(server, worker):
+    # worker 結束前寫入緩衝中的答案
+    from services.room_state import room_states
+    room_states.shutdown()
 '''
     
     config_path = Path("gunicorn.conf.py")
@@ -118,6 +127,17 @@ def main():
     # 設定環境變數
     os.environ.setdefault('FLASK_ENV', 'production')
     
+    # 多個 worker 需要訊息佇列才能互相轉送 WebSocket 廣播
+    if not os.environ.get('SOCKETIO_MESSAGE_QUEUE'):
+        print("⚠️  未設定 SOCKETIO_MESSAGE_QUEUE，房間廣播無法送達其他 worker 上的連線")
+        print("   可使用 Redis，或執行: python -m services.fanout_broker --unix /tmp/eng_game_fanout.sock")
+        print("   並設定 SOCKETIO_MESSAGE_QUEUE=unix:///tmp/eng_game_fanout.sock")
+    
+    # 房間狀態存在各 worker 的記憶體中，多個 worker 必須依房間做 sticky routing
+    if int(os.environ.get('GUNICORN_WORKERS', '1')) > 1:
+        print("⚠️  GUNICORN_WORKERS > 1：反向代理必須依房間 id 將同一房間的請求導向同一個 worker，")
+        print("   否則不同 worker 會各自持有房間狀態，回合與分數會不一致")
+    
     # 檢查必要條件
     if not check_requirements():
         sys.exit(1)
@@ -0,0 +1,98 @@
+"""測試共用 fixture"""
+import os
+import sys
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from models import User, Category, Question, GameRoom, GameSession
+
+
+@pytest.fixture
+def app():
+    """建立測試用應用程式與資料庫"""
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    """Flask 測試用戶端"""
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    """建立使用者並回傳 (user, 認證標頭)"""
+    def _make_user(username: str):
+        user = User(username=username, email=f'{username}@example.com', password_hash='x')
+        db.session.add(user)
+        db.session.commit()
+        token = create_access_token(identity=user.id)
+        return user, {'Authorization': f'Bearer {token}'}
+    return _make_user
+
+
+@pytest.fixture
+def category(app):
+    """建立含題目的分類"""
+    category = Category(name='daily_conversation', display_name='日常生活（Daily Conversation）')
+    db.session.add(category)
+    db.session.flush()
+    for i in range(10):
+        db.session.add(Question(
+            category_id=category.id,
+            difficulty='easy',
+            question_type='multiple_choice',
+            question_text=f'Question {i} ___.',
+            options=['go', 'goes', 'going', 'gone'],
+            answer='go',
+            explanation='現在簡單式'
+        ))
+    db.session.commit()
+    return category
+
+
+@pytest.fixture
+def make_room(app):
+    """建立房間並讓指定使用者加入"""
+    def _make_room(host: User, players: list, total_rounds: int = 3):
+        room = GameRoom(
+            name='測試房間',
+            total_rounds=total_rounds,
+            categories=['日常生活（Daily Conversation）'],
+            created_by=host.id
+        )
+        db.session.add(room)
+        db.session.flush()
+        for player in [host] + list(players):
+            db.session.add(GameSession(user_id=player.id, room_id=room.id))
+        db.session.commit()
+        return room
+    return _make_room
+
+
+@pytest.fixture
+def capture_queries(app):
+    """執行函式並回傳期間送出的 SQL 敘述"""
+    def _capture_queries(fn):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            fn()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+        return statements
+    return _capture_queries
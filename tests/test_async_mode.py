@@ -0,0 +1,106 @@
+"""asyncio 模式（asgi.py）測試"""
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip('aiosqlite')
+
+from app import db
+from asgi import create_asgi_app
+from benchmarks.async_mode import asgi_request
+from config import TestingConfig
+from services.async_db import async_database_url, async_db
+from services.room_state import room_states
+from services.user_cache import user_cache
+
+
+@pytest.fixture
+def asgi_app(monkeypatch, tmp_path):
+    # 非同步 engine 需與同步 engine 共用資料，改用檔案 SQLite
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'game.db'}")
+    return create_asgi_app('testing')
+
+
+@pytest.fixture
+def app(asgi_app):
+    app = asgi_app.flask_app
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_async_database_url_swaps_driver():
+    assert async_database_url('sqlite:///game.db') == 'sqlite+aiosqlite:///game.db'
+    assert async_database_url('mysql+pymysql://root:pw@127.0.0.1/eng_game') == \
+        'mysql+aiomysql://root:pw@127.0.0.1/eng_game'
+
+
+def test_native_routes_match_flask_responses(asgi_app, client, make_user, make_room):
+    host, host_headers = make_user('host')
+    guest, _ = make_user('guest')
+    room_id = make_room(host, [guest]).id
+    db.session.commit()
+
+    paths = [f'/api/rooms/{room_id}', '/api/rooms/missing',
+             f'/api/game/{room_id}/rankings', f'/api/game/{room_id}/rankings?mode=top_k&k=1',
+             f'/api/game/{room_id}/rankings?mode=around_me&radius=1',
+             f'/api/game/{room_id}/rankings?mode=bogus',
+             f'/api/rooms/{room_id}/snapshot']  # 交給 Flask 藍圖
+
+    async def fetch_all():
+        try:
+            return [await asgi_request(asgi_app, 'GET', path, headers=host_headers) for path in paths]
+        finally:
+            await async_db.dispose()
+
+    for path, (status, body) in zip(paths, asyncio.run(fetch_all())):
+        expected = client.get(path, headers=host_headers)
+        assert (status, body) == (expected.status_code, expected.get_json()), path
+
+
+def test_blueprint_broadcasts_go_through_async_server(asgi_app, monkeypatch, make_user, make_room):
+    host, _ = make_user('host')
+    guest, guest_headers = make_user('guest')
+    room_id = make_room(host, []).id
+    db.session.commit()
+    emitted = []
+
+    async def record(event, data=None, **kwargs):
+        emitted.append((event, kwargs.get('to')))
+
+    monkeypatch.setattr(asgi_app.sio, 'emit', record)
+
+    async def join():
+        status, _ = await asgi_request(asgi_app, 'POST', f'/api/rooms/{room_id}/join', headers=guest_headers)
+        await asyncio.sleep(0)
+        await async_db.dispose()
+        return status
+
+    assert asyncio.run(join()) == 200
+    assert emitted == [('room_delta', room_id), ('player_joined', room_id)]
+
+
+def test_in_memory_rankings_do_not_query_usernames(asgi_app, make_user, make_room):
+    host, host_headers = make_user('host')
+    guest, _ = make_user('guest')
+    room = make_room(host, [guest])
+    room.status = 'in_progress'
+    room.current_round = 1
+    db.session.commit()
+    room_id = room.id
+    assert room_states.get_or_load(room_id)
+    user_cache.clear()
+
+    # 在沒有應用程式上下文的執行緒中呼叫，與 ASGI 伺服器的事件迴圈相同
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(response=asyncio.run(
+        asgi_request(asgi_app, 'GET', f'/api/game/{room_id}/rankings', headers=host_headers))))
+    thread.start()
+    thread.join()
+
+    status, body = result['response']
+    assert status == 200
+    assert sorted(r['username'] for r in body['rankings']) == ['guest', 'host']
@@ -0,0 +1,65 @@
+"""分類目錄快取測試"""
+from services.catalog import category_catalog
+
+
+def test_categories_listing_uses_one_query_and_cache(client, category, capture_queries):
+    responses = []
+    first = capture_queries(lambda: responses.append(client.get('/api/questions/categories')))
+    second = capture_queries(lambda: responses.append(client.get('/api/questions/categories')))
+
+    assert len(first) == 1
+    assert len(second) == 0
+    body = responses[0].json
+    assert body['categories'] == [category.display_name]
+    assert body['details'][0]['question_count'] == 10
+
+
+def test_create_question_invalidates_catalog(client, category, make_user):
+    _, headers = make_user('author')
+    assert category_catalog.all()[0]['question_count'] == 10
+
+    response = client.post('/api/questions/', headers=headers, json={
+        'category_id': category.id,
+        'difficulty': 'easy',
+        'question_type': 'multiple_choice',
+        'question_text': 'She ___ to school.',
+        'options': ['go', 'goes'],
+        'answer': 'goes'
+    })
+
+    assert response.status_code == 201
+    assert category_catalog.all()[0]['question_count'] == 11
+
+
+def test_catalog_endpoints_revalidate_with_etag(client, category, capture_queries):
+    first = client.get('/api/questions/difficulties')
+    etag = first.headers['ETag']
+
+    responses = []
+    statements = capture_queries(lambda: responses.append(
+        client.get('/api/questions/difficulties', headers={'If-None-Match': etag})
+    ))
+
+    assert first.json == {'difficulties': ['easy']}
+    assert 'no-cache' in first.headers['Cache-Control']
+    assert responses[0].status_code == 304
+    assert statements == []
+
+
+def test_question_change_bumps_catalog_version(client, category, make_user):
+    _, headers = make_user('author')
+    etag = client.get('/api/questions/categories').headers['ETag']
+
+    client.post('/api/questions/', headers=headers, json={
+        'category_id': category.id,
+        'difficulty': 'hard',
+        'question_type': 'multiple_choice',
+        'question_text': 'They ___ home.',
+        'options': ['go', 'goes'],
+        'answer': 'go'
+    })
+    response = client.get('/api/questions/categories', headers={'If-None-Match': etag})
+
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert sorted(client.get('/api/questions/difficulties').json['difficulties']) == ['easy', 'hard']
@@ -0,0 +1,76 @@
+"""資料庫連線池監控測試"""
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from services.db_pool import PoolStats, TimedQueuePool, instrument
+
+
+@pytest.fixture
+def pool_engine(tmp_path):
+    """單一連線、不允許溢出的檔案 SQLite engine"""
+    stats = PoolStats()
+    engine = create_engine(
+        f'sqlite:///{tmp_path / "pool.db"}',
+        poolclass=TimedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05
+    )
+    instrument(engine, stats)
+    yield engine, stats
+    engine.dispose()
+
+
+def test_checkout_and_checkin_are_counted(pool_engine):
+    engine, stats = pool_engine
+    with engine.connect() as conn:
+        conn.execute(text('SELECT 1'))
+        assert stats.snapshot()['in_use'] == 1
+
+    snapshot = stats.snapshot()
+    assert snapshot['connects'] == 1
+    assert snapshot['checkouts'] == 1
+    assert snapshot['checkins'] == 1
+    assert snapshot['in_use'] == 0
+    assert snapshot['max_in_use'] == 1
+    assert snapshot['overflow_checkouts'] == 0
+
+
+def test_exhausted_pool_records_timeout_and_wait(pool_engine):
+    engine, stats = pool_engine
+    with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+    snapshot = stats.snapshot()
+    assert snapshot['timeouts'] == 1
+    assert snapshot['wait_max_ms'] >= 50
+
+
+def test_overflow_checkouts_are_counted(tmp_path):
+    stats = PoolStats()
+    engine = create_engine(f'sqlite:///{tmp_path / "pool.db"}',
+                           poolclass=TimedQueuePool, pool_size=1, max_overflow=1)
+    instrument(engine, stats)
+    with engine.connect(), engine.connect():
+        pass
+    engine.dispose()
+
+    assert stats.snapshot()['overflow_checkouts'] == 1
+    assert stats.snapshot()['max_in_use'] == 2
+
+
+def test_stats_survive_pool_recreate(pool_engine):
+    engine, stats = pool_engine
+    engine.dispose()
+    assert isinstance(engine.pool, TimedQueuePool)
+    assert engine.pool.stats is stats
+
+
+def test_db_pool_endpoint(client, make_user):
+    _, headers = make_user('alice')
+    _, admin_headers = make_user('admin')
+    assert client.get('/api/_stats/fanout', headers=headers).status_code == 403
+    assert client.get('/api/_stats/db-pool', headers=headers).status_code == 403
+
+    response = client.get('/api/_stats/db-pool', headers=admin_headers)
+
+    assert response.status_code == 200
+    assert response.get_json()['db_pool']['checkouts'] >= 1
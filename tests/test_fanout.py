@@ -0,0 +1,80 @@
+"""跨 worker 廣播測試"""
+import queue
+import threading
+import time
+
+import pytest
+
+from services import fanout
+from services.fanout import FanoutManager, LocalBackend, RespBackend
+from services.fanout_broker import TCPBroker, serve_in_thread
+
+
+@pytest.fixture
+def broker():
+    broker = TCPBroker(port=0)
+    serve_in_thread(broker)
+    yield broker
+    broker.shutdown()
+    broker.server_close()
+
+
+def _subscribers(backend_name, broker, channel):
+    if backend_name == 'local':
+        return len(fanout._local_channels.get(channel, ()))
+    return len(broker.channels.get(channel.encode(), ()))
+
+
+def _start_listener(manager):
+    received = queue.Queue()
+
+    def run():
+        for message in manager._listen():
+            received.put(message)
+
+    threading.Thread(target=run, daemon=True).start()
+    return received
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+@pytest.mark.parametrize('backend_name', ['local', 'resp'])
+def test_room_broadcasts_are_batched_across_workers(backend_name, broker):
+    channel = f'test-{backend_name}'
+
+    def make_backend():
+        return LocalBackend() if backend_name == 'local' else RespBackend(broker.url)
+
+    sender = FanoutManager(make_backend(), channel=channel, batch_size=10)
+    receiver = FanoutManager(make_backend(), channel=channel)
+    received = _start_listener(receiver)
+    _wait_for(lambda: _subscribers(backend_name, broker, channel) == 1)
+
+    for round_number in (1, 2):
+        sender._publish({'method': 'emit', 'event': 'next_round', 'room': 'room-1',
+                         'data': [{'current_round': round_number}], 'host_id': sender.host_id})
+    assert received.empty()
+    assert sender.flush() == 2
+
+    messages = [received.get(timeout=2), received.get(timeout=2)]
+    assert [m['data'][0]['current_round'] for m in messages] == [1, 2]
+    assert sender.stats()['batches_published'] == 1
+    stats = receiver.stats()
+    assert stats['batches_received'] == 1
+    assert stats['messages_received'] == 2
+    assert stats['latency_max_ms'] >= 0
+
+
+def test_full_batch_is_published_immediately():
+    sender = FanoutManager(LocalBackend(), channel='test-full', batch_size=2)
+
+    sender._publish({'method': 'emit', 'event': 'a'})
+    sender._publish({'method': 'emit', 'event': 'b'})
+
+    assert sender.metrics.messages_published == 2
+    assert sender.flush() == 0
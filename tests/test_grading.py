@@ -0,0 +1,74 @@
+"""答案批改引擎測試"""
+import json
+
+from app import db
+from models import Question
+from services.grading import AnswerKey, grader
+
+
+def test_single_choice_is_casefolded():
+    key = AnswerKey('multiple_choice', ['go', 'goes', 'going'], 'goes')
+
+    assert key.grade(' GOES ')
+    assert not key.grade('go')
+    assert not key.grade('went')
+    assert not key.grade(None)
+
+
+def test_multi_blank_ordered_and_unordered():
+    options = ['in', 'on', 'at', 'by']
+    ordered = AnswerKey('multi_blank', options, ['on', 'at'])
+    unordered = AnswerKey('multi_blank', options, ['on', 'at'], ordered=False)
+
+    assert ordered.grade(['On', 'at'])
+    assert not ordered.grade(['at', 'on'])
+    assert unordered.grade(['at', 'on'])
+    assert not unordered.grade(['at'])
+    assert not unordered.grade(['at', 'in'])
+
+
+def test_options_differing_only_by_case_compare_exactly():
+    key = AnswerKey('multiple_choice', ['May', 'may'], 'may')
+
+    assert key.grade('may')
+    assert not key.grade('May')
+
+
+def test_grade_batch_loads_missing_keys_in_one_query(category, capture_queries):
+    ids = [q.id for q in Question.query.limit(3)]
+    db.session.expire_all()
+
+    results = []
+    statements = capture_queries(lambda: results.extend(grader.grade_batch(
+        [(ids[0], 'go'), (ids[1], 'goes'), (ids[2], 'GO'), (ids[0], 'gone')]
+    )))
+
+    assert results == [True, False, True, False]
+    assert len(statements) == 1
+    assert capture_queries(lambda: grader.grade(ids[1], 'go')) == []
+
+
+def test_legacy_json_encoded_options_and_answer():
+    options = ['go', 'going', 'gone', 'goes']
+    key = AnswerKey('multiple_choice', json.dumps(options), json.dumps('go'))
+    assert key.grade('go')
+    assert not key.grade('goes')
+
+    blanks = AnswerKey('multi_blank', json.dumps(['in', 'on', 'at']), json.dumps(['on', 'at']))
+    assert blanks.grade(['on', 'at'])
+    assert not blanks.grade(['at', 'on'])
+
+    # 選項無法解析時退回直接比對答案字串
+    fallback = AnswerKey('multiple_choice', 'not json', 'go')
+    assert fallback.grade(' Go ')
+    assert not fallback.grade('went')
+
+
+def test_grader_handles_legacy_rows(category):
+    question = Question(category_id=category.id, difficulty='easy', question_type='multiple_choice',
+                        question_text='Legacy ___.', options=json.dumps(['go', 'goes']), answer=json.dumps('goes'))
+    db.session.add(question)
+    db.session.commit()
+
+    assert grader.grade(question.id, 'goes')
+    assert not grader.grade(question.id, 'go')
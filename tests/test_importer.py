@@ -0,0 +1,94 @@
+"""題目批次匯入測試"""
+import io
+import json
+
+import pytest
+
+from models import Question
+from services.catalog import category_catalog
+from services.importer import import_questions
+
+
+def _jsonl(*rows):
+    return '\n'.join(row if isinstance(row, str) else json.dumps(row) for row in rows)
+
+
+def test_jsonl_import_validates_and_batches(app, client, category, make_user, capture_queries):
+    _, headers = make_user('admin')
+    app.config['IMPORT_BATCH_SIZE'] = 2
+    valid = {'category': category.name, 'difficulty': 'easy', 'question_type': 'multiple_choice',
+             'question_text': 'He ___ late.', 'options': ['is', 'are'], 'answer': 'is'}
+    body = _jsonl(
+        valid, valid, valid,
+        dict(valid, answer='was'),
+        dict(valid, category='unknown'),
+        '{not json'
+    )
+
+    responses = []
+    statements = capture_queries(lambda: responses.append(client.post(
+        '/api/questions/import', headers=headers, data=body, content_type='application/x-ndjson'
+    )))
+
+    report = responses[0].json['report']
+    assert (report['imported'], report['failed'], report['batches']) == (3, 3, 2)
+    assert [e['line'] for e in report['errors']] == [4, 5, 6]
+    assert len([s for s in statements if s.startswith('INSERT INTO questions')]) == 2
+    assert Question.query.count() == 13
+    assert client.get('/api/questions/categories').json['details'][0]['question_count'] == 13
+
+
+def test_csv_upload_accepts_pipe_separated_lists(client, category, make_user):
+    _, headers = make_user('admin')
+    csv_data = (
+        'category,difficulty,question_type,question_text,options,answer\n'
+        f'{category.display_name},hard,multi_blank,We ___ and ___.,eat|drink|run,eat|drink\n'
+        f'{category.display_name},easy,multiple_choice,I ___ here.,"[""am"", ""is""]",am\n'
+    )
+
+    response = client.post('/api/questions/import', headers=headers, data={
+        'file': (io.BytesIO(csv_data.encode()), 'bank.csv')
+    }, content_type='multipart/form-data')
+
+    assert response.json['report']['imported'] == 2
+    imported = Question.query.filter_by(difficulty='hard').one()
+    assert imported.options == ['eat', 'drink', 'run']
+    assert imported.answer == ['eat', 'drink']
+
+
+def test_import_requires_admin(client, category, make_user):
+    _, headers = make_user('bob')
+    body = json.dumps({'category': category.name, 'difficulty': 'easy', 'question_type': 'multiple_choice',
+                       'question_text': 'I ___ home.', 'options': ['go', 'goes'], 'answer': 'go'})
+
+    response = client.post('/api/questions/import', headers=headers, data=body,
+                           content_type='application/x-ndjson')
+    assert response.status_code == 403
+    assert Question.query.filter_by(question_text='I ___ home.').count() == 0
+
+
+def test_unhashable_category_is_a_row_error(app, category):
+    valid = {'category': category.name, 'difficulty': 'easy', 'question_type': 'multiple_choice',
+             'question_text': 'She ___ here.', 'options': ['is', 'are'], 'answer': 'is'}
+    rows = [(1, valid), (2, dict(valid, category=[category.name])), (3, dict(valid, category_id={'id': 1}))]
+
+    report = import_questions(rows)
+
+    assert (report.imported, report.failed) == (1, 2)
+    assert [e['error'] for e in report.errors] == ['分類格式錯誤', '分類格式錯誤']
+
+
+def test_committed_batches_invalidate_catalog_when_import_fails(app, category):
+    valid = {'category': category.name, 'difficulty': 'easy', 'question_type': 'multiple_choice',
+             'question_text': 'They ___ here.', 'options': ['is', 'are'], 'answer': 'are'}
+
+    def rows():
+        yield 1, valid
+        raise OSError('connection reset')
+
+    version = category_catalog.version
+    with pytest.raises(OSError):
+        import_questions(rows(), batch_size=1)
+
+    assert category_catalog.version == version + 1
+    assert Question.query.filter_by(question_text='They ___ here.').count() == 1
@@ -0,0 +1,39 @@
+"""房間排行榜測試"""
+from services.leaderboard import Leaderboard
+
+
+def test_updates_keep_order_and_tie_break_by_time():
+    board = Leaderboard([('a', 0, 0.0), ('b', 0, 0.0), ('c', 0, 0.0)])
+
+    board.update('a', 20, 10.0)
+    board.update('b', 20, 6.0)
+    board.update('c', 25, 30.0)
+
+    assert board.ordered() == [(1, 'c'), (2, 'b'), (3, 'a')]
+    assert board.rank('a') == 3
+    assert board.top(1) == [(1, 'c')]
+    assert board.around('a', 1) == [(2, 'b'), (3, 'a')]
+
+
+def test_rankings_endpoint_reads_live_leaderboard(client, make_user, make_room, category, capture_queries):
+    host, host_headers = make_user('host')
+    guest, guest_headers = make_user('guest')
+    room = make_room(host, [guest], total_rounds=3)
+    room_id = room.id
+    assert client.post(f'/api/rooms/{room_id}/start', headers=host_headers).status_code == 200
+
+    client.post(f'/api/game/{room_id}/submit-answer', headers=host_headers,
+                json={'answer': 'go', 'time_taken': 10})
+    client.post(f'/api/game/{room_id}/submit-answer', headers=guest_headers,
+                json={'answer': 'go', 'time_taken': 2})
+
+    responses = []
+    statements = capture_queries(
+        lambda: responses.append(client.get(f'/api/game/{room_id}/rankings?mode=top_k&k=1'))
+    )
+    assert statements == []
+    assert [r['username'] for r in responses[0].json['rankings']] == ['guest']
+
+    around = client.get(f'/api/game/{room_id}/rankings?mode=around_me&radius=0', headers=host_headers)
+    assert around.json['rankings'][0]['rank'] == 2
+    assert client.get(f'/api/game/{room_id}/rankings?mode=around_me').status_code == 401
@@ -0,0 +1,21 @@
+"""負載基準測試流程測試"""
+from benchmarks.load import Recorder, percentile, run, seed
+
+
+def test_percentile_nearest_rank():
+    ordered = [float(i) for i in range(1, 101)]
+
+    assert percentile(ordered, 50) == 50.0
+    assert percentile(ordered, 99) == 99.0
+    assert percentile([], 95) == 0.0
+
+
+def test_full_game_flow_has_no_errors(app):
+    seed(5)
+    recorder = Recorder()
+    run(app, recorder, rooms=1, players=2, rounds=2)
+
+    operations = recorder.report()
+    assert all(stats['errors'] == 0 for stats in operations.values())
+    assert operations['POST /api/game/<id>/submit-answer']['count'] == 4
+    assert operations['GET /api/game/<id>/rankings']['count'] == 2
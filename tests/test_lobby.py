@@ -0,0 +1,63 @@
+"""大廳房間列表（keyset 分頁）測試"""
+from datetime import datetime, timedelta
+
+from app import db
+from models import GameRoom, GameSession
+
+
+def _make_rooms(host, count, categories=('日常生活（Daily Conversation）',), max_players=10):
+    base = datetime(2024, 1, 1)
+    rooms = []
+    for i in range(count):
+        room = GameRoom(name=f'房間{i}', categories=list(categories), created_by=host.id,
+                        max_players=max_players, created_at=base + timedelta(minutes=i))
+        db.session.add(room)
+        rooms.append(room)
+    db.session.flush()
+    for room in rooms:
+        db.session.add(GameSession(user_id=host.id, room_id=room.id))
+    db.session.commit()
+    return rooms
+
+
+def test_lobby_pages_follow_cursor_without_overlap(client, make_user):
+    host, _ = make_user('host')
+    rooms = _make_rooms(host, 5)
+
+    first = client.get('/api/rooms/?limit=2').json
+    second = client.get(f"/api/rooms/?limit=2&cursor={first['next_cursor']}").json
+    third = client.get(f"/api/rooms/?limit=2&cursor={second['next_cursor']}").json
+
+    listed = [r['id'] for page in (first, second, third) for r in page['rooms']]
+    assert listed == [room.id for room in reversed(rooms)]
+    assert third['next_cursor'] is None
+    assert first['rooms'][0]['player_count'] == 1
+
+
+def test_lobby_query_count_is_constant(client, make_user, capture_queries):
+    host, _ = make_user('host')
+    _make_rooms(host, 12)
+    db.session.expire_all()
+
+    statements = capture_queries(lambda: client.get('/api/rooms/?limit=10'))
+
+    assert len(statements) == 1
+
+
+def test_lobby_filters_category_and_free_seats(client, make_user, category):
+    host, _ = make_user('host')
+    guest, _ = make_user('guest')
+    travel, full = _make_rooms(host, 2, categories=('旅遊與交通（Travel & Transport）',), max_players=2)
+    db.session.add(GameSession(user_id=guest.id, room_id=full.id))
+    db.session.commit()
+    daily, = _make_rooms(host, 1)
+
+    by_name = client.get(f'/api/rooms/?categories={category.name}').json['rooms']
+    free = client.get('/api/rooms/?has_free_seats=true').json['rooms']
+
+    assert [r['id'] for r in by_name] == [daily.id]
+    assert {r['id'] for r in free} == {daily.id, travel.id}
+
+
+def test_lobby_rejects_invalid_cursor(client):
+    assert client.get('/api/rooms/?cursor=bad').status_code == 400
@@ -0,0 +1,47 @@
+"""請求與 SQL 查詢指標測試"""
+from services.metrics import request_metrics
+
+
+def _metric(text: str, prefix: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            return float(line.rsplit(' ', 1)[1])
+    raise AssertionError(f'找不到指標 {prefix}')
+
+
+def test_metrics_require_admin(client, make_user):
+    _, headers = make_user('alice')
+
+    assert client.get('/api/_metrics').status_code == 401
+    assert client.get('/api/_metrics', headers=headers).status_code == 403
+
+
+def test_no_admins_unless_configured(app, client, make_user):
+    app.config['ADMIN_USERNAMES'] = []
+    _, headers = make_user('admin')
+    assert client.get('/api/_metrics', headers=headers).status_code == 403
+
+
+def test_metrics_count_requests_and_queries(client, make_user, category):
+    _, headers = make_user('admin')
+    for _ in range(3):
+        assert client.get('/api/questions/?limit=5').status_code == 200
+
+    response = client.get('/api/_metrics', headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+
+    text = response.get_data(as_text=True)
+    labels = 'endpoint="questions.get_questions",method="GET"'
+    assert _metric(text, f'eng_game_http_requests_total{{{labels},status="200"}}') == 3
+    assert _metric(text, f'eng_game_http_request_duration_seconds_count{{{labels}}}') == 3
+    assert _metric(text, f'eng_game_db_queries_per_request_sum{{{labels}}}') >= 3
+    assert _metric(text, f'eng_game_db_query_seconds_total{{{labels}}}') > 0
+    assert _metric(text, f'eng_game_http_request_duration_seconds_bucket{{{labels},le="+Inf"}}') == 3
+
+
+def test_zero_sample_rate_skips_requests(client, category):
+    request_metrics.sample_rate = 0.0
+    client.get('/api/questions/?limit=5')
+
+    assert 'questions.get_questions' not in request_metrics.render()
@@ -0,0 +1,73 @@
+"""密碼雜湊執行緒池與登入時重新雜湊測試"""
+from werkzeug.security import generate_password_hash
+
+from app import db
+from models import User
+from services.password_hasher import PasswordHashBusy, normalize_method, password_hasher
+
+
+def _login(client, password='secret-password'):
+    return client.post('/api/auth/login', json={'username': 'alice', 'password': password})
+
+
+def test_normalize_method_fills_werkzeug_defaults():
+    assert normalize_method('scrypt') == 'scrypt:32768:8:1'
+    assert normalize_method('scrypt:16384') == 'scrypt:16384:8:1'
+    assert normalize_method('pbkdf2:sha256:1000') == 'pbkdf2:sha256:1000'
+
+
+def test_login_rehashes_outdated_hash(app, client):
+    user = User(username='alice', email='alice@example.com',
+                password_hash=generate_password_hash('secret-password', method='pbkdf2:sha256:500'))
+    db.session.add(user)
+    db.session.commit()
+    assert user.password_needs_rehash()
+
+    assert _login(client, 'wrong-password').status_code == 401
+    assert user.password_hash.startswith('pbkdf2:sha256:500$')
+
+    assert _login(client).status_code == 200
+    db.session.refresh(user)
+    assert user.password_hash.startswith('pbkdf2:sha256:1000$')
+    assert not user.password_needs_rehash()
+
+    assert _login(client).status_code == 200
+    stats = password_hasher.stats()
+    assert stats['rehashed'] == 1
+    assert stats['completed'] == 4  # 3 次驗證 + 1 次重新雜湊
+    assert stats['queue_depth'] == 0
+
+
+def test_full_queue_returns_503(app, client, make_user, monkeypatch):
+    _, headers = make_user('admin')
+    client.post('/api/auth/register', json={
+        'username': 'alice', 'email': 'alice@example.com', 'password': 'secret-password'
+    })
+    monkeypatch.setattr(password_hasher, 'max_queue', 0)
+
+    response = _login(client)
+    assert response.status_code == 503
+
+    stats = client.get('/api/_stats/password-hashing', headers=headers).get_json()['password_hashing']
+    assert stats['rejected'] == 1
+    assert stats['workers'] == 4
+    assert stats['max_queue_depth'] == 1
+
+
+def test_login_succeeds_when_rehash_fails(app, client, monkeypatch):
+    user = User(username='alice', email='alice@example.com',
+                password_hash=generate_password_hash('secret-password', method='pbkdf2:sha256:500'))
+    db.session.add(user)
+    db.session.commit()
+
+    def busy(password):
+        raise PasswordHashBusy('密碼雜湊佇列已滿')
+
+    monkeypatch.setattr(password_hasher, 'hash', busy)
+    response = _login(client)
+    assert response.status_code == 200
+    assert response.json['access_token']
+
+    db.session.expire_all()
+    assert db.session.get(User, user.id).password_hash.startswith('pbkdf2:sha256:500$')
+    assert password_hasher.stats()['rehashed'] == 0
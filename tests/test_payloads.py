@@ -0,0 +1,45 @@
+"""題目回應快取測試"""
+from app import db
+from services.payloads import question_payloads
+
+
+def _started_room(client, make_user, make_room, total_rounds):
+    host, headers = make_user('host')
+    guest, _ = make_user('guest')
+    room = make_room(host, [guest], total_rounds=total_rounds)
+    room_id = room.id
+    db.session.expire_all()
+    return room_id, headers
+
+
+def test_start_game_query_count_does_not_grow_with_rounds(client, make_user, make_room, category,
+                                                          capture_queries):
+    room_id, headers = _started_room(client, make_user, make_room, total_rounds=8)
+
+    responses = []
+    statements = capture_queries(lambda: responses.append(
+        client.post(f'/api/rooms/{room_id}/start', headers=headers)
+    ))
+
+    assert responses[0].status_code == 200
+    assert len(statements) <= 10
+    assert len(question_payloads) == 8
+
+
+def test_current_question_is_served_from_cache_without_answer(client, make_user, make_room, category,
+                                                              capture_queries):
+    room_id, headers = _started_room(client, make_user, make_room, total_rounds=2)
+    client.post(f'/api/rooms/{room_id}/start', headers=headers)
+
+    responses = []
+    statements = capture_queries(lambda: responses.append(
+        client.get(f'/api/game/{room_id}/current-question', headers=headers)
+    ))
+
+    body = responses[0].json
+    assert statements == []
+    assert body['current_round'] == 1
+    assert body['question']['options'] == ['go', 'goes', 'going', 'gone']
+    assert body['question']['answered'] is False
+    assert 'answer' not in body['question']
+    assert 'explanation' not in body['question']
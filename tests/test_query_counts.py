@@ -0,0 +1,61 @@
+"""房間詳細資訊與排名的查詢次數回歸測試"""
+from app import db
+from models import PlayerAnswer
+
+
+def _count_queries(capture_queries, client, url):
+    responses = []
+    statements = capture_queries(lambda: responses.append(client.get(url)))
+    assert responses[0].status_code == 200
+    return len(statements)
+
+
+def _room_with_players(make_user, make_room, prefix, player_count):
+    host, _ = make_user(f'{prefix}host')
+    players = [make_user(f'{prefix}player{i}')[0] for i in range(player_count - 1)]
+    room = make_room(host, players)
+    room_id = room.id
+    db.session.expire_all()
+    return room_id
+
+
+def test_room_detail_query_count_is_constant(client, make_user, make_room, capture_queries):
+    small = _room_with_players(make_user, make_room, 'a', 2)
+    large = _room_with_players(make_user, make_room, 'b', 12)
+
+    small_count = _count_queries(capture_queries, client, f'/api/rooms/{small}')
+    large_count = _count_queries(capture_queries, client, f'/api/rooms/{large}')
+
+    assert small_count == large_count
+    assert large_count <= 2
+    assert client.get(f'/api/rooms/{large}').json['room']['player_count'] == 12
+
+
+def test_rankings_query_count_is_constant(client, make_user, make_room, capture_queries):
+    small = _room_with_players(make_user, make_room, 'a', 2)
+    large = _room_with_players(make_user, make_room, 'b', 12)
+
+    small_count = _count_queries(capture_queries, client, f'/api/game/{small}/rankings')
+    large_count = _count_queries(capture_queries, client, f'/api/game/{large}/rankings')
+
+    assert small_count == large_count
+    assert large_count <= 2
+
+
+def test_rankings_tie_break_by_total_time(client, make_user, make_room, capture_queries):
+    host, _ = make_user('host')
+    guest, _ = make_user('guest')
+    room = make_room(host, [guest])
+    room_id = room.id
+    for session in room.players:
+        session.score = 10
+        db.session.add(PlayerAnswer(session_id=session.id, room_question_id='rq',
+                                    answer='go', is_correct=True,
+                                    time_taken=3.0 if session.user_id == guest.id else 8.0))
+    db.session.commit()
+
+    rankings = client.get(f'/api/game/{room_id}/rankings').json['rankings']
+
+    assert [r['username'] for r in rankings] == ['guest', 'host']
+    assert [r['rank'] for r in rankings] == [1, 2]
+    assert rankings[0]['time_taken'] == 3.0
@@ -0,0 +1,58 @@
+"""題庫抽題索引測試"""
+from app import db
+from models import Category, Question, RoomQuestion
+from services.question_pool import question_pool
+
+
+def _add_questions(category, count, difficulty='easy'):
+    for i in range(count):
+        db.session.add(Question(category_id=category.id, difficulty=difficulty,
+                                question_type='multiple_choice', question_text=f'{category.name} {i}',
+                                options=['a', 'b'], answer='a'))
+    db.session.commit()
+
+
+def test_sample_is_stratified_and_unique(app):
+    daily = Category(name='daily', display_name='Daily')
+    travel = Category(name='travel', display_name='Travel')
+    db.session.add_all([daily, travel])
+    db.session.commit()
+    _add_questions(daily, 20)
+    _add_questions(travel, 3)
+    question_pool.reload()
+
+    picked = question_pool.sample(10, category_ids=[daily.id, travel.id])
+    categories = [db.session.get(Question, qid).category_id for qid in picked]
+
+    assert len(picked) == len(set(picked)) == 10
+    assert categories.count(travel.id) == 3  # 題數不足的分類全數入選，其餘由其他分類補足
+    assert question_pool.sample(50, category_ids=[travel.id], difficulties=['easy'])
+    assert question_pool.sample(5, difficulties=['hard']) == []
+
+
+def test_start_game_draws_from_pool(client, make_user, make_room, category):
+    host, host_headers = make_user('host')
+    guest, _ = make_user('guest')
+    room = make_room(host, [guest], total_rounds=5)
+    room_id = room.id
+
+    response = client.post(f'/api/rooms/{room_id}/start', headers=host_headers)
+
+    assert response.status_code == 200
+    rounds = RoomQuestion.query.filter_by(room_id=room_id).all()
+    assert len({r.question_id for r in rounds}) == 5
+
+
+def test_created_question_joins_pool(client, make_user, category):
+    _, headers = make_user('admin')
+    question_pool.reload()
+    size = len(question_pool)
+
+    response = client.post('/api/questions/', headers=headers, json={
+        'category_id': category.id, 'difficulty': 'hard', 'question_type': 'multiple_choice',
+        'question_text': 'New ___.', 'options': ['x', 'y'], 'answer': 'x'
+    })
+
+    assert response.status_code == 201
+    assert len(question_pool) == size + 1
+    assert question_pool.sample(5, difficulties=['hard']) == [response.json['question']['id']]
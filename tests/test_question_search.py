@@ -0,0 +1,62 @@
+"""題目搜尋（分類解析、keyset 分頁與欄位投影）測試"""
+from datetime import datetime, timedelta
+
+from app import db
+from models import Question
+
+
+def _spread_created_at(category):
+    base = datetime(2024, 1, 1)
+    questions = Question.query.filter_by(category_id=category.id).order_by(Question.question_text).all()
+    for i, question in enumerate(questions):
+        question.created_at = base + timedelta(minutes=i)
+    db.session.commit()
+    return [q.id for q in reversed(questions)]
+
+
+def test_pages_follow_cursor_with_projection(client, category):
+    expected = _spread_created_at(category)
+
+    pages, cursor = [], None
+    while True:
+        url = '/api/questions/?limit=4&fields=id,question'
+        body = client.get(url + (f'&cursor={cursor}' if cursor else '')).json
+        pages.append(body['questions'])
+        cursor = body['next_cursor']
+        if not cursor:
+            break
+
+    assert [len(page) for page in pages] == [4, 4, 2]
+    assert [q['id'] for page in pages for q in page] == expected
+    assert set(pages[0][0]) == {'id', 'question'}
+
+
+def test_projection_skips_unrequested_columns(client, category, capture_queries):
+    client.get('/api/questions/categories')  # 預先載入分類目錄
+
+    statements = capture_queries(lambda: client.get(
+        f'/api/questions/?categories={category.display_name}&fields=id,category'
+    ))
+
+    assert len(statements) == 1
+    assert 'questions.options' not in statements[0]
+    assert 'questions.answer' not in statements[0]
+
+
+def test_category_names_resolve_without_extra_queries(client, category, capture_queries):
+    client.get('/api/questions/categories')
+
+    responses = []
+    statements = capture_queries(lambda: responses.append(client.get(
+        f'/api/questions/?categories={category.name},{category.display_name}&limit=20'
+    )))
+
+    assert len(responses[0].json['questions']) == 10
+    assert len(statements) == 1
+
+
+def test_unknown_field_is_rejected(client):
+    response = client.get('/api/questions/?fields=id,secret')
+
+    assert response.status_code == 400
+    assert response.json['details'] == ['secret']
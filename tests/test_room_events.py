@@ -0,0 +1,80 @@
+"""房間事件合併廣播測試"""
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import socketio
+from services.room_events import room_events
+
+
+@pytest.fixture
+def coalescing(monkeypatch):
+    """啟用時間窗但不啟動背景任務，由測試自行 flush"""
+    monkeypatch.setattr(room_events, 'window', 60)
+    monkeypatch.setattr(room_events, '_started', True)
+    return room_events
+
+
+def _connect(app, user, room_id):
+    socket_client = socketio.test_client(app, auth={'token': create_access_token(identity=user.id)})
+    socket_client.emit('join_room', {'room_id': room_id})
+    room_events.flush(room_id)
+    socket_client.get_received()
+    return socket_client
+
+
+def test_events_in_window_are_sent_as_one_batch(app, client, make_user, make_room, category, coalescing):
+    host, host_headers = make_user('host')
+    guest, guest_headers = make_user('guest')
+    room = make_room(host, [guest])
+    room_id = room.id
+    host_socket = _connect(app, host, room_id)
+    guest_socket = _connect(app, guest, room_id)
+    client.post(f'/api/rooms/{room_id}/start', headers=host_headers)
+    host_socket.get_received()
+    guest_socket.get_received()
+
+    client.post(f'/api/game/{room_id}/submit-answer', headers=guest_headers,
+                json={'answer': 'go', 'time_taken': 2})
+    guest_socket.emit('submit_answer_socket', {'room_id': room_id, 'answer': 'go', 'time_taken': 2})
+    guest_socket.emit('ready_for_next', {'room_id': room_id})
+    assert host_socket.get_received() == []
+    assert coalescing.pending() == 4
+
+    assert coalescing.flush() == 1
+    [message] = host_socket.get_received()
+    assert message['name'] == 'room_events'
+    batch = message['args'][0]
+    assert batch['room_id'] == room_id
+    assert [entry['event'] for entry in batch['events']] == [
+        'room_delta', 'answer_submitted', 'answer_submitted_socket', 'player_ready'
+    ]
+    guest_sid = socketio.server.manager.sid_from_eio_sid(guest_socket.eio_sid, '/')
+    assert [entry.get('skip_sid') for entry in batch['events']] == [None, None, guest_sid, guest_sid]
+    assert coalescing.pending() == 0
+    host_socket.disconnect()
+    guest_socket.disconnect()
+
+
+def test_single_event_keeps_name_and_critical_events_flush_first(app, client, make_user, make_room,
+                                                                 category, coalescing):
+    host, host_headers = make_user('host')
+    guest, guest_headers = make_user('guest')
+    room = make_room(host, [])
+    room_id = room.id
+    host_socket = _connect(app, host, room_id)
+
+    guest_socket = socketio.test_client(app, auth={'token': create_access_token(identity=guest.id)})
+    guest_socket.emit('ready_for_next', {'room_id': room_id})
+    coalescing.flush(room_id)
+    [ready] = host_socket.get_received()
+    assert ready['name'] == 'player_ready'
+    assert ready['args'][0]['user_id'] == guest.id
+
+    client.post(f'/api/rooms/{room_id}/join', headers=guest_headers)
+    client.post(f'/api/rooms/{room_id}/start', headers=host_headers)
+    received = host_socket.get_received()
+    assert [m['name'] for m in received] == ['room_events', 'game_started']
+    assert [e['event'] for e in received[0]['args'][0]['events']] == ['room_delta', 'player_joined', 'room_delta']
+    assert coalescing.stats()['immediate'] == 1
+    host_socket.disconnect()
+    guest_socket.disconnect()
@@ -0,0 +1,71 @@
+"""房間快照與差異推送測試"""
+from flask_jwt_extended import create_access_token
+
+from app import socketio
+from services.room_snapshots import diff
+
+
+def _deltas(socket_client):
+    return [m['args'][0] for m in socket_client.get_received() if m['name'] == 'room_delta']
+
+
+def test_diff_only_lists_changed_fields():
+    old = {'status': 'waiting', 'players': {'a': {'score': 0, 'left': False}, 'b': {'score': 5}}}
+    new = {'status': 'waiting', 'players': {'a': {'score': 10, 'left': False}}}
+
+    assert diff(old, new) == {'players': {'a': {'score': 10}, 'b': None}}
+    assert diff(new, new) == {}
+
+
+def test_join_and_answer_push_compact_deltas(app, client, make_user, make_room, category):
+    host, host_headers = make_user('host')
+    guest, guest_headers = make_user('guest')
+    room = make_room(host, [])
+    room_id = room.id
+
+    snapshot = client.get(f'/api/rooms/{room_id}/snapshot').get_json()
+    assert list(snapshot['snapshot']['players']) == [host.id]
+    version = snapshot['version']
+
+    listener = socketio.test_client(app, auth={'token': create_access_token(identity=host.id)})
+    listener.emit('join_room', {'room_id': room_id})
+    listener.get_received()
+
+    client.post(f'/api/rooms/{room_id}/join', headers=guest_headers)
+    [joined] = _deltas(listener)
+    assert joined['base_version'] == version
+    assert joined['changes'] == {'players': {guest.id: {
+        'username': 'guest', 'score': 0, 'correct_answers': 0, 'total_answers': 0, 'left': False
+    }}}
+
+    client.post(f'/api/rooms/{room_id}/start', headers=host_headers)
+    [started] = _deltas(listener)
+    assert started['base_version'] == joined['version']
+    assert started['changes'] == {'status': 'in_progress', 'current_round': 1}
+
+    client.post(f'/api/game/{room_id}/submit-answer', headers=guest_headers,
+                json={'answer': 'go', 'time_taken': 2})
+    [answered] = _deltas(listener)
+    assert answered['changes'] == {'players': {guest.id: {
+        'score': 28, 'correct_answers': 1, 'total_answers': 1
+    }}}
+    listener.disconnect()
+
+
+def test_snapshot_since_returns_missing_deltas_or_full_snapshot(client, make_user, make_room):
+    host, _ = make_user('host')
+    guest, guest_headers = make_user('guest')
+    room = make_room(host, [])
+    room_id = room.id
+    version = client.get(f'/api/rooms/{room_id}/snapshot').get_json()['version']
+
+    client.post(f'/api/rooms/{room_id}/join', headers=guest_headers)
+    client.post(f'/api/rooms/{room_id}/leave', headers=guest_headers)
+
+    behind = client.get(f'/api/rooms/{room_id}/snapshot?since={version}').get_json()
+    assert [d['changes']['players'][guest.id] for d in behind['deltas']][1] == {'left': True}
+    assert behind['deltas'][-1]['version'] == behind['version']
+
+    unknown = client.get(f'/api/rooms/{room_id}/snapshot?since=0').get_json()
+    assert unknown['snapshot']['players'][guest.id]['left'] is True
+    assert client.get('/api/rooms/missing/snapshot').status_code == 404
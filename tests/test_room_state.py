@@ -0,0 +1,193 @@
+"""房間狀態引擎測試"""
+import pytest
+
+from app import db
+from models import GameRoom, GameSession, PlayerAnswer, Question, RoomQuestion
+from services import room_state as room_state_module
+from services.room_state import DurableWriteError, room_states
+
+
+def _start_in_db(room, total_rounds):
+    """直接在資料庫建立回合題目並將房間設為進行中"""
+    questions = Question.query.limit(total_rounds).all()
+    for i, question in enumerate(questions):
+        db.session.add(RoomQuestion(room_id=room.id, question_id=question.id,
+                                    round_number=i + 1, order_in_round=1))
+    room.status = 'in_progress'
+    room.current_round = 1
+    db.session.commit()
+
+
+def test_answers_are_served_from_memory(client, make_user, make_room, category, capture_queries):
+    host, host_headers = make_user('host')
+    guest, guest_headers = make_user('guest')
+    room = make_room(host, [guest], total_rounds=2)
+    room_id = room.id
+    _start_in_db(room, 2)
+
+    # 第一次請求載入狀態，之後讀取題目不再查詢房間相關表格
+    assert client.get(f'/api/game/{room_id}/current-question', headers=host_headers).status_code == 200
+    statements = capture_queries(
+        lambda: client.get(f'/api/game/{room_id}/current-question', headers=guest_headers)
+    )
+    assert not any('game_rooms' in s or 'room_questions' in s for s in statements)
+
+    response = client.post(f'/api/game/{room_id}/submit-answer', headers=host_headers,
+                           json={'answer': 'go', 'time_taken': 5})
+    assert response.status_code == 200
+    assert response.json['is_correct'] is True
+
+    response = client.post(f'/api/game/{room_id}/submit-answer', headers=host_headers,
+                           json={'answer': 'go', 'time_taken': 5})
+    assert response.status_code == 400
+
+    state = room_states.get(room_id)
+    assert state.players[host.id].score == 25
+    assert PlayerAnswer.query.count() == 1
+    assert GameSession.query.filter_by(user_id=host.id).first().score == 25
+
+
+def test_next_round_and_finish(client, make_user, make_room, category):
+    host, host_headers = make_user('host')
+    guest, guest_headers = make_user('guest')
+    room = make_room(host, [guest], total_rounds=2)
+    room_id = room.id
+    _start_in_db(room, 2)
+
+    client.post(f'/api/game/{room_id}/submit-answer', headers=host_headers,
+                json={'answer': 'go', 'time_taken': 1})
+    assert client.post(f'/api/game/{room_id}/next-round', headers=host_headers).status_code == 400
+
+    client.post(f'/api/game/{room_id}/submit-answer', headers=guest_headers,
+                json={'answer': 'gone', 'time_taken': 1})
+    assert client.post(f'/api/game/{room_id}/next-round', headers=guest_headers).status_code == 403
+
+    response = client.post(f'/api/game/{room_id}/next-round', headers=host_headers)
+    assert response.status_code == 200
+    assert response.json['current_round'] == 2
+    assert db.session.get(GameRoom, room_id).current_round == 2
+
+    for headers in (host_headers, guest_headers):
+        client.post(f'/api/game/{room_id}/submit-answer', headers=headers,
+                    json={'answer': 'go', 'time_taken': 10})
+    response = client.post(f'/api/game/{room_id}/next-round', headers=host_headers)
+    assert response.status_code == 200
+    assert [r['username'] for r in response.json['rankings']] == ['host', 'guest']
+    assert room_states.get(room_id) is None
+
+    db.session.expire_all()
+    assert db.session.get(GameRoom, room_id).status == 'finished'
+    assert PlayerAnswer.query.count() == 4
+
+
+def test_async_writer_drains_pending_answers(app, client, make_user, make_room, category):
+    host, host_headers = make_user('host')
+    guest, _ = make_user('guest')
+    room = make_room(host, [guest], total_rounds=1)
+    room_id = room.id
+    _start_in_db(room, 1)
+
+    writer = room_states.writer
+    writer._async = True
+    writer._worker_started = True  # 不啟動背景任務，改由 drain 手動寫入
+    try:
+        client.post(f'/api/game/{room_id}/submit-answer', headers=host_headers,
+                    json={'answer': 'go', 'time_taken': 2})
+        assert writer.pending == 1
+        assert PlayerAnswer.query.count() == 0
+
+        writer.drain()
+        assert writer.pending == 0
+        assert PlayerAnswer.query.count() == 1
+    finally:
+        writer._async = False
+        writer._worker_started = False
+
+
+def test_write_behind_flushes_in_batches(app, client, make_user, make_room, category, capture_queries):
+    host, host_headers = make_user('host')
+    guest, guest_headers = make_user('guest')
+    room = make_room(host, [guest], total_rounds=2)
+    room_id = room.id
+    _start_in_db(room, 2)
+
+    room_states.write_behind = True
+    try:
+        for headers in (host_headers, guest_headers):
+            client.post(f'/api/game/{room_id}/submit-answer', headers=headers,
+                        json={'answer': 'go', 'time_taken': 4})
+        assert len(room_states.answers) == 2
+        assert PlayerAnswer.query.count() == 0
+
+        # 回合結束時以一次批次寫入
+        statements = capture_queries(
+            lambda: client.post(f'/api/game/{room_id}/next-round', headers=host_headers)
+        )
+        inserts = [s for s in statements if s.startswith('INSERT INTO player_answers')]
+        assert len(inserts) == 1
+        assert PlayerAnswer.query.count() == 2
+        db.session.expire_all()
+        assert GameSession.query.filter_by(user_id=guest.id).first().score == 26
+
+        client.post(f'/api/game/{room_id}/submit-answer', headers=host_headers,
+                    json={'answer': 'go', 'time_taken': 4})
+        room_states.shutdown()
+        assert len(room_states.answers) == 0
+        assert PlayerAnswer.query.count() == 3
+    finally:
+        room_states.write_behind = False
+
+
+def test_failed_final_flush_keeps_game_in_progress(client, make_user, make_room, category, monkeypatch):
+    host, host_headers = make_user('host')
+    room = make_room(host, [], total_rounds=1)
+    room_id = room.id
+    _start_in_db(room, 1)
+    client.post(f'/api/game/{room_id}/submit-answer', headers=host_headers,
+                json={'answer': 'go', 'time_taken': 1})
+    state = room_states.get(room_id)
+
+    def fail():
+        raise RuntimeError('database unavailable')
+
+    monkeypatch.setattr(room_states.answers, 'flush', fail)
+    with pytest.raises(RuntimeError):
+        room_states.advance(state)
+    assert state.status == 'in_progress'
+    assert room_states.get(room_id) is state
+
+    monkeypatch.undo()
+    assert room_states.advance(state) is True
+    db.session.expire_all()
+    assert db.session.get(GameRoom, room_id).status == 'finished'
+
+
+def test_failed_answer_write_is_retried_before_finishing(client, make_user, make_room, category, monkeypatch):
+    host, host_headers = make_user('host')
+    room = make_room(host, [], total_rounds=1)
+    room_id = room.id
+    _start_in_db(room, 1)
+    original = room_state_module.persist_answer
+    database = {'available': False}
+
+    def persist(*args):
+        if not database['available']:
+            raise RuntimeError('database unavailable')
+        original(*args)
+
+    monkeypatch.setattr(room_state_module, 'persist_answer', persist)
+    response = client.post(f'/api/game/{room_id}/submit-answer', headers=host_headers,
+                           json={'answer': 'go', 'time_taken': 1})
+    assert response.status_code == 200
+    assert room_states.writer.pending == 1
+
+    state = room_states.get(room_id)
+    with pytest.raises(DurableWriteError):
+        room_states.advance(state)
+    assert state.status == 'in_progress'
+    assert room_states.writer.pending == 1
+
+    database['available'] = True
+    assert room_states.advance(state) is True
+    assert room_states.writer.pending == 0
+    assert PlayerAnswer.query.count() == 1
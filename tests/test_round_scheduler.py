@@ -0,0 +1,120 @@
+"""回合計時排程器測試"""
+import time
+
+import pytest
+
+from services.room_state import room_states
+from services import round_scheduler as round_scheduler_module
+from services.round_scheduler import round_scheduler
+
+
+@pytest.fixture
+def scheduler(app):
+    """啟用排程器但不啟動背景任務，改由測試手動推進時間"""
+    round_scheduler.enabled = True
+    round_scheduler._started = True
+    yield round_scheduler
+    round_scheduler.enabled = False
+    round_scheduler._started = False
+
+
+def _start(client, make_user, make_room, total_rounds):
+    host, host_headers = make_user('host')
+    guest, guest_headers = make_user('guest')
+    room = make_room(host, [guest], total_rounds=total_rounds)
+    room_id = room.id
+    assert client.post(f'/api/rooms/{room_id}/start', headers=host_headers).status_code == 200
+    return room_id, host_headers, guest_headers
+
+
+def test_round_closes_when_time_limit_expires(client, make_user, make_room, category, scheduler):
+    room_id, host_headers, _ = _start(client, make_user, make_room, 2)
+    state = room_states.get(room_id)
+
+    assert scheduler.run_due(time.monotonic() + 29) == 0
+    assert scheduler.run_due(time.monotonic() + 31) == 1
+    assert state.current_round == 2
+
+    response = client.post(f'/api/game/{room_id}/submit-answer', headers=host_headers,
+                           json={'answer': 'go', 'time_taken': 1})
+    assert response.status_code == 200
+
+    scheduler.run_due(time.monotonic() + 31)
+    assert state.status == 'finished'
+    assert room_states.get(room_id) is None
+
+
+def test_round_closes_early_when_everyone_answered(client, make_user, make_room, category, scheduler):
+    room_id, host_headers, guest_headers = _start(client, make_user, make_room, 2)
+    state = room_states.get(room_id)
+
+    for headers in (host_headers, guest_headers):
+        client.post(f'/api/game/{room_id}/submit-answer', headers=headers,
+                    json={'answer': 'go', 'time_taken': 1})
+
+    assert len(scheduler) == 2  # 原本的截止時間成為過期項目，執行時略過
+    scheduler.run_due(time.monotonic() + scheduler.result_delay + 0.1)
+    assert state.current_round == 2
+    assert scheduler.stats()['rounds_closed'] == 1
+
+
+def test_late_answer_is_rejected(client, make_user, make_room, category, scheduler):
+    room_id, host_headers, _ = _start(client, make_user, make_room, 2)
+    room_states.get(room_id).round_deadline = time.monotonic() - 5
+
+    response = client.post(f'/api/game/{room_id}/submit-answer', headers=host_headers,
+                           json={'answer': 'go', 'time_taken': 35})
+
+    assert response.status_code == 400
+    assert response.json['error'] == '作答時間已結束'
+
+
+def test_failing_room_does_not_block_other_rooms(client, make_user, make_room, category, scheduler, monkeypatch):
+    room_id, _, _ = _start(client, make_user, make_room, 2)
+    other, other_headers = make_user('other')
+    other_guest, _ = make_user('other_guest')
+    other_room_id = make_room(other, [other_guest], total_rounds=2).id
+    assert client.post(f'/api/rooms/{other_room_id}/start', headers=other_headers).status_code == 200
+    original = round_scheduler_module.advance_round
+
+    def advance(state, **kwargs):
+        if state.room_id == room_id:
+            raise RuntimeError('database unavailable')
+        return original(state, **kwargs)
+
+    monkeypatch.setattr(round_scheduler_module, 'advance_round', advance)
+    assert scheduler.run_due(time.monotonic() + 31) == 1
+    assert room_states.get(room_id).current_round == 1
+    assert room_states.get(other_room_id).current_round == 2
+    assert scheduler.stats()['rounds_closed'] == 1
+
+
+def test_scheduler_stats_require_admin(client, make_user):
+    _, headers = make_user('host')
+    _, admin_headers = make_user('admin')
+
+    assert client.get('/api/_stats/scheduler', headers=headers).status_code == 403
+    response = client.get('/api/_stats/scheduler', headers=admin_headers)
+    assert response.status_code == 200
+    assert 'rounds_closed' in response.get_json()['rounds']
+
+
+def test_host_can_advance_after_deadline_without_scheduler(client, make_user, make_room, category):
+    assert not round_scheduler.enabled
+    room_id, host_headers, guest_headers = _start(client, make_user, make_room, 2)
+    state = room_states.get(room_id)
+    client.post(f'/api/game/{room_id}/submit-answer', headers=host_headers,
+                json={'answer': 'go', 'time_taken': 1})
+    assert client.post(f'/api/game/{room_id}/next-round', headers=host_headers).status_code == 400
+
+    # 時間到了但沒有排程器推進回合：未作答的玩家不能再作答，房主可以推進
+    state.round_deadline = time.monotonic() - 5
+    response = client.post(f'/api/game/{room_id}/submit-answer', headers=guest_headers,
+                           json={'answer': 'go', 'time_taken': 35})
+    assert response.status_code == 400
+
+    response = client.post(f'/api/game/{room_id}/next-round', headers=host_headers)
+    assert response.status_code == 200
+    assert state.current_round == 2
+    assert client.post(f'/api/game/{room_id}/submit-answer', headers=guest_headers,
+                       json={'answer': 'go', 'time_taken': 1}).status_code == 200
@@ -0,0 +1,18 @@
+"""序列化基準測試的快速路徑測試"""
+from benchmarks.serialization import SERIALIZERS, measure, seed
+
+
+def test_fast_path_matches_to_dict(app):
+    seed(20, categories=2, players_per_room=4)
+
+    for name in SERIALIZERS:
+        result = measure(name, repeat=1)
+        assert result['same_output'], name
+
+
+def test_lazy_loads_are_counted(app):
+    seed(20, categories=2, players_per_room=4)
+
+    assert measure('Question', repeat=1)['lazy_loads'] == 2
+    assert measure('GameRoom', repeat=1)['lazy_loads'] == 5
+    assert measure('GameSession', repeat=1)['lazy_loads'] == 0
@@ -0,0 +1,48 @@
+"""WebSocket 連線驗證測試"""
+from flask_jwt_extended import create_access_token
+
+from app import socketio
+
+
+def test_connect_binds_identity_once(app, make_user, make_room, capture_queries):
+    host, _ = make_user('host')
+    guest, _ = make_user('guest')
+    room = make_room(host, [guest])
+    room_id = room.id
+
+    host_client = socketio.test_client(app, auth={'token': create_access_token(identity=host.id)})
+    guest_client = socketio.test_client(app, auth={'token': create_access_token(identity=guest.id)})
+    assert host_client.is_connected() and guest_client.is_connected()
+
+    host_client.emit('join_room', {'room_id': room_id})
+    guest_client.emit('join_room', {'room_id': room_id})
+    host_client.get_received()
+
+    statements = capture_queries(lambda: guest_client.emit('ready_for_next', {'room_id': room_id}))
+
+    assert statements == []
+    received = host_client.get_received()
+    assert received[0]['name'] == 'player_ready'
+    assert received[0]['args'][0]['username'] == 'guest'
+    host_client.disconnect()
+    guest_client.disconnect()
+
+
+def test_invalid_token_is_refused(app):
+    client = socketio.test_client(app, auth={'token': 'not-a-token'})
+
+    assert not client.is_connected()
+
+
+def test_legacy_event_token_binds_on_first_use(app, make_user, make_room):
+    host, _ = make_user('host')
+    room = make_room(host, [])
+    token = create_access_token(identity=host.id)
+
+    client = socketio.test_client(app)
+    client.emit('join_room', {'room_id': room.id})
+    assert client.get_received()[0]['name'] == 'error'
+
+    client.emit('join_room', {'room_id': room.id, 'token': token})
+    client.emit('leave_room', {'room_id': room.id})
+    assert not any(message['name'] == 'error' for message in client.get_received())
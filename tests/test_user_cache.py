@@ -0,0 +1,48 @@
+"""使用者資料快取測試"""
+from app import db
+from services.user_cache import UserProfileCache, user_cache
+
+
+def test_lru_evicts_oldest_entry():
+    cache = UserProfileCache(max_size=2)
+    cache.put('a', 'alice')
+    cache.put('b', 'bob')
+    cache._lookup('a')
+    cache.put('c', 'carol')
+
+    assert cache._peek('b') is None
+    assert cache._peek('a') == 'alice'
+    assert cache.stats()['evictions'] == 1
+
+
+def test_expired_entry_is_a_miss():
+    cache = UserProfileCache(ttl=-1)
+    cache.put('a', 'alice')
+
+    assert cache._lookup('a') is None
+    assert cache.stats()['misses'] == 1
+
+
+def test_update_invalidates_entry(app, make_user):
+    user, _ = make_user('alice')
+    assert user_cache.get_username(user.id) == 'alice'
+
+    user.username = 'alicia'
+    db.session.commit()
+
+    assert user_cache.get_username(user.id) == 'alicia'
+
+
+def test_prime_serves_emit_sites_without_queries(client, make_user, make_room, capture_queries):
+    host, host_headers = make_user('host')
+    guest, _ = make_user('guest')
+    make_room(host, [guest])
+    user_cache.prime([host.id, guest.id])
+
+    statements = capture_queries(lambda: [user_cache.get_username(host.id), user_cache.get_username(guest.id)])
+
+    assert statements == []
+    assert client.get('/api/_stats/caches', headers=host_headers).status_code == 403
+    _, admin_headers = make_user('admin')
+    stats = client.get('/api/_stats/caches', headers=admin_headers).json['user_profiles']
+    assert stats['hits'] >= 2
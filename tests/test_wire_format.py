@@ -0,0 +1,89 @@
+"""Socket.IO 傳輸格式協商測試"""
+import json
+
+import pytest
+from flask_jwt_extended import create_access_token
+from werkzeug.test import EnvironBuilder
+
+from app import socketio
+from services.wire_format import wire_formats
+
+msgpack = pytest.importorskip('msgpack')
+from socketio import packet  # noqa: E402
+from socketio.msgpack_packet import MsgPackPacket  # noqa: E402
+
+
+@pytest.fixture
+def wire(app, monkeypatch):
+    """啟用 MessagePack 並記錄送出的 Engine.IO 訊息"""
+    app.config['SOCKETIO_MSGPACK'] = True
+    server = socketio.server
+    wire_formats.init_app(app, server)
+    server.async_handlers = False
+
+    sent = []
+    monkeypatch.setattr(server.eio, 'send', lambda sid, data: sent.append((sid, data)))
+    monkeypatch.setattr(server.eio, 'send_packet', lambda sid, pkt: sent.append((sid, pkt.data)))
+
+    def connect(eio_sid, token, wire_format='json'):
+        query = 'wire=msgpack' if wire_format == 'msgpack' else ''
+        environ = EnvironBuilder('/socket.io/', query_string=query).get_environ()
+        environ['flask.app'] = app
+        server._handle_eio_connect(eio_sid, environ)
+        pkt_class = MsgPackPacket if wire_format == 'msgpack' else server.packet_class
+        server._handle_eio_message(eio_sid, pkt_class(packet.CONNECT, data={'token': token}).encode())
+
+    def emit(eio_sid, wire_format, event, data):
+        pkt_class = MsgPackPacket if wire_format == 'msgpack' else server.packet_class
+        server._handle_eio_message(eio_sid, pkt_class(packet.EVENT, data=[event, data]).encode())
+
+    yield server, sent, connect, emit
+    for eio_sid in ('a', 'b', 'c'):
+        if eio_sid in server.environ:
+            server._handle_eio_disconnect(eio_sid, server.reason.CLIENT_DISCONNECT)
+
+
+def test_formats_endpoint(client, wire):
+    assert client.get('/api/game/wire-formats').get_json() == {'formats': ['json', 'msgpack']}
+
+
+def test_mixed_clients_receive_their_own_format(app, wire, make_user, make_room):
+    server, sent, connect, emit = wire
+    host, _ = make_user('host')
+    guest, _ = make_user('guest')
+    third, _ = make_user('third')
+    room = make_room(host, [guest, third])
+
+    connect('a', create_access_token(identity=host.id), 'msgpack')
+    connect('b', create_access_token(identity=guest.id), 'msgpack')
+    connect('c', create_access_token(identity=third.id))
+    for eio_sid, wire_format in (('a', 'msgpack'), ('b', 'msgpack'), ('c', 'json')):
+        emit(eio_sid, wire_format, 'join_room', {'room_id': room.id})
+    assert isinstance(sent[0][1], bytes)  # msgpack 客戶端的 CONNECT 回應
+    sent.clear()
+    translated = wire_formats.stats()['translated_packets']
+
+    socketio.emit('answer_submitted', {'user_id': host.id, 'is_correct': True}, room=room.id)
+
+    received = dict(sent)
+    for eio_sid in ('a', 'b'):
+        pkt = MsgPackPacket(encoded_packet=received[eio_sid])
+        assert pkt.data == ['answer_submitted', {'user_id': host.id, 'is_correct': True}]
+    assert json.loads(received['c'][1:]) == ['answer_submitted', {'user_id': host.id, 'is_correct': True}]
+    assert received['a'] is received['b']
+    assert wire_formats.stats()['translated_packets'] == translated + 1
+    assert wire_formats.stats()['msgpack_clients'] == 2
+
+
+def test_disabled_server_ignores_msgpack_request(app, client):
+    assert client.get('/api/game/wire-formats').get_json() == {'formats': ['json']}
+    assert not wire_formats.enabled
+
+
+def test_init_app_installs_wrappers_once(app, wire):
+    server = wire[0]
+    handlers = (server._handle_eio_connect, server._handle_eio_message, server._send_packet)
+
+    wire_formats.init_app(app, server)
+
+    assert (server._handle_eio_connect, server._handle_eio_message, server._send_packet) == handlers